@@ -0,0 +1,182 @@
+import random
+import zlib
+
+REPO = "privacy-scaling-explorations/acceleration-program"
+HTML_URL = f"https://github.com/{REPO}/issues"
+API_URL = f"https://api.github.com/repos/{REPO}/issues"
+
+COMPLEXITIES = ["Easy", "Medium", "Hard"]
+TASK_LABELS = [[], [], ["wip"], ["self proposed open task"], ["umbrella task"], ["enhancement"]]
+LOGINS = [f"user{i}" for i in range(50)]
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MONTH_LONG = ["January", "February", "March", "April", "May", "June", "July",
+              "August", "September", "October", "November", "December"]
+# (unit, hours per unit); durations are picked so that hours * FTE is a whole number
+UNITS = [("weeks", 40), ("week", 40), ("months", 160), ("days", 8), ("hours", 1)]
+FTES = ["1", "0.5", "0.25"]
+FILLER = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. "
+
+
+def format_date(rng, day, month):
+    if rng.random() < 0.5:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(day, "th")
+        return f"{MONTH_NAMES[month]} {day}{suffix}, 2024"
+    return f"{MONTH_LONG[month]} {day}, 2024"
+
+
+def make_issue(number, title, body, state, creator, assignee=None, labels=()):
+    return {
+        "number": number,
+        "url": f"{API_URL}/{number}",
+        "html_url": f"{HTML_URL}/{number}",
+        "title": title,
+        "body": body,
+        "state": state,
+        "updated_at": f"2024-01-01T00:00:{number % 60:02d}Z",
+        "user": {"login": creator},
+        "assignee": {"login": assignee} if assignee else None,
+        "labels": [{"name": label} for label in labels],
+        "comments": 0,
+    }
+
+
+def rest_user(login):
+    url = f"https://api.github.com/users/{login}"
+    return {
+        "login": login, "id": zlib.crc32(login.encode()), "node_id": f"MDQ6VXNlcj{login}",
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{login}?v=4", "gravatar_id": "",
+        "url": url, "html_url": f"https://github.com/{login}", "followers_url": f"{url}/followers",
+        "following_url": f"{url}/following{{/other_user}}", "gists_url": f"{url}/gists{{/gist_id}}",
+        "starred_url": f"{url}/starred{{/owner}}{{/repo}}", "subscriptions_url": f"{url}/subscriptions",
+        "organizations_url": f"{url}/orgs", "repos_url": f"{url}/repos", "events_url": f"{url}/events{{/privacy}}",
+        "received_events_url": f"{url}/received_events", "type": "User", "user_view_type": "public",
+        "site_admin": False,
+    }
+
+
+def rest_payload(issue):
+    """
+    A synthetic issue with the rest of the fields the REST API returns, for ingest benchmarks.
+    """
+    number = issue["number"]
+    url = issue.get("url", f"{API_URL}/{number}")
+    assignee = rest_user(issue["assignee"]["login"]) if issue.get("assignee") else None
+    return {
+        **issue,
+        "repository_url": f"https://api.github.com/repos/{REPO}",
+        "labels_url": f"{url}/labels{{/name}}", "comments_url": f"{url}/comments",
+        "events_url": f"{url}/events", "timeline_url": f"{url}/timeline",
+        "id": 2000000000 + number, "node_id": f"I_kwDOKsynthetic{number}",
+        "user": rest_user(issue["user"]["login"]),
+        "labels": [
+            {"id": 6000000000 + i, "node_id": f"LA_kwDO{label['name']}", "url": f"https://api.github.com/repos/{REPO}/labels/{label['name']}",
+             "name": label["name"], "color": "ededed", "default": False, "description": None}
+            for i, label in enumerate(issue.get("labels", []))
+        ],
+        "assignee": assignee, "assignees": [assignee] if assignee else [],
+        "milestone": None, "locked": False, "active_lock_reason": None,
+        "created_at": "2024-01-01T00:00:00Z", "closed_at": None, "author_association": "NONE",
+        "type": None, "sub_issues_summary": {"total": 0, "completed": 0, "percent_completed": 0},
+        "closed_by": None, "performed_via_github_app": None, "state_reason": None,
+        "reactions": {
+            "url": f"{url}/reactions", "total_count": 0, "+1": 0, "-1": 0, "laugh": 0,
+            "hooray": 0, "confused": 0, "heart": 0, "rocket": 0, "eyes": 0,
+        },
+    }
+
+
+def make_task(rng, number):
+    complexity = rng.choice(COMPLEXITIES)
+    body = (
+        f"### Description\r\n{FILLER * rng.randint(1, 10)}\r\n"
+        f"### Project Complexity: {complexity}\r\n"
+    )
+    return make_issue(
+        number,
+        f"Task {number}: synthetic task",
+        body,
+        rng.choice(["open", "open", "closed"]),
+        rng.choice(LOGINS),
+        rng.choice([None, rng.choice(LOGINS)]),
+        rng.choice(TASK_LABELS),
+    )
+
+
+def make_proposal_body(rng, task_number, milestones, filler_repeat):
+    sections = []
+    total_hours = 0
+    total_weeks = 0
+    for index in range(1, milestones + 1):
+        unit, unit_hours = rng.choice(UNITS)
+        value = rng.choice([4, 8, 12]) if unit == "hours" else rng.randint(1, 6)
+        fte = rng.choice(FTES)
+        total_hours += value * unit_hours * float(fte)
+        total_weeks += max(1, value * unit_hours // 40)
+        date = format_date(rng, rng.randint(1, 28), rng.randint(0, 11))
+        date_line = f"- **Starting Date:** {date}" if rng.random() < 0.5 else f"- **Estimated delivery date:** {date}"
+        sections.append(
+            f"### Milestone {index}\r\n"
+            f"- **Estimated Duration:** {value} {unit}\r\n"
+            f"- **FTE:** {fte}\r\n"
+            f"{date_line}\r\n"
+            f"- **Deliverables:** {FILLER * filler_repeat}\r\n"
+        )
+    header = (
+        f"### Task\r\n{HTML_URL}/{task_number}\r\n"
+        f"### Overview\r\n{FILLER * filler_repeat}\r\n"
+        f"- **Total Estimated Duration:** {total_weeks} weeks\r\n"
+        f"- **Full-time equivalent (FTE):** 1\r\n"
+        f"- **Total Estimated Working Hours:** {int(total_hours)} hours\r\n"
+    )
+    return header + "".join(sections)
+
+
+def generate_corpus(size, seed=0, proposal_ratio=0.6, adversarial_ratio=0.01):
+    """
+    `size` synthetic issues shaped like the REST issues endpoint, oldest first.
+    Every proposal links to an earlier task. A small share is adversarial: very long bodies
+    or hundreds of Milestone headers.
+    """
+    rng = random.Random(seed)
+    issues = []
+    task_numbers = []
+    for number in range(1, size + 1):
+        if not task_numbers or rng.random() >= proposal_ratio:
+            issues.append(make_task(rng, number))
+            task_numbers.append(number)
+            continue
+
+        milestones, filler_repeat = rng.randint(1, 6), rng.randint(1, 5)
+        if rng.random() < adversarial_ratio:
+            if rng.random() < 0.5:
+                filler_repeat = 2000
+            else:
+                milestones = 300
+        body = make_proposal_body(rng, rng.choice(task_numbers), milestones, filler_repeat)
+        issues.append(
+            make_issue(number, f"Proposal: synthetic proposal {number}", body, rng.choice(["open", "closed"]), rng.choice(LOGINS))
+        )
+
+    # drawn separately so the issues themselves do not depend on the comments
+    comment_rng = random.Random(seed + 1)
+    for issue in issues:
+        if issue["title"].startswith("Proposal"):
+            issue["comments"] = comment_rng.choice([0, 0, 1, 2, 3])
+    return issues
+
+
+def make_comments(issue):
+    """
+    The `comments` of a synthetic issue, derived from its number: reviewer remarks and,
+    now and then, the applicant posting a deliverable repository.
+    """
+    rng = random.Random(issue["number"])
+    applicant = issue["user"]["login"]
+    comments = []
+    for i in range(issue.get("comments", 0)):
+        if rng.random() < 0.4:
+            login, body = applicant, f"Deliverable: https://github.com/{applicant}/deliverable-{issue['number']}"
+        else:
+            login, body = rng.choice(LOGINS), "Thanks, looks good. " + FILLER
+        comments.append({"user": {"login": login}, "body": body, "created_at": f"2024-02-{i + 1:02d}T12:00:00Z"})
+    return comments
@@ -0,0 +1,55 @@
+"""
+Fetch throughput against the local GitHub stand-in, per worker count.
+
+    poetry run python -m bench.fetch_benchmark --issues 5000 --latency 0.05 --workers 1 4 8 16
+"""
+import argparse
+import json
+import time
+
+from bench.corpus import generate_corpus
+from bench.gh_standin import Faults, StandIn, start_server
+from src import fetcher
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark get_issues pagination against a local stand-in.")
+    parser.add_argument("--issues", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--secondary-every", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_fetch_results.json")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.issues, args.seed)
+    fetcher.http_cache.enabled = False
+    results = []
+    for workers in args.workers:
+        faults = Faults(args.latency, args.rate_limit_every, 1, args.secondary_every, 1, args.error_rate, args.seed)
+        standin = StandIn(faults, corpus=corpus)
+        server, base_url = start_server(standin)
+        session = fetcher.create_session(workers)
+        start = time.perf_counter()
+        items = fetcher.fetch_all_pages(f"{base_url}/repos/o/r/issues", {"state": "all"}, session, workers)
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+        results.append({
+            "workers": workers,
+            "issues": len(items) if items is not None else None,
+            "complete": items is not None and len(items) == len(corpus),
+            "seconds": elapsed,
+            "pages_per_second": standin.stats["requests"] / elapsed,
+            **standin.stats,
+        })
+        print(f"workers={workers:<3} {elapsed:8.3f}s complete={results[-1]['complete']} {standin.stats}")
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"latency": args.latency, "corpus": len(corpus), "results": results}, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
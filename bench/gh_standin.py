@@ -0,0 +1,227 @@
+"""
+Local stand-in for the GitHub API, for offline fetch benchmarks.
+
+Serves either a cassette recorded with GH_RECORD_CASSETTE or a synthetic corpus, and can
+inject latency, primary rate limits (403 + X-RateLimit-Reset), secondary limits
+(403 + Retry-After) and 5xx errors.
+
+    poetry run python -m bench.gh_standin --cassette cassette.jsonl --latency 0.05 --error-rate 0.02
+    GH_API_URL=http://127.0.0.1:8765 poetry run python index.py
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from bench.corpus import generate_corpus, make_comments
+from src.cassette import interaction_key, load_cassette
+
+RATE_LIMIT = 5000
+COMMENTS_PATH = re.compile(r"/issues/(\d+)/comments$")
+
+
+class Faults:
+    def __init__(self, latency=0.0, rate_limit_every=0, reset_after=2, secondary_every=0,
+                 retry_after=1, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.reset_after = reset_after
+        self.secondary_every = secondary_every
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+
+class StandIn:
+    """
+    Request matching, fault injection and a simulated hourly rate-limit budget.
+    """
+
+    def __init__(self, faults, cassette=None, corpus=None):
+        self.faults = faults
+        self.cassette = cassette
+        self.corpus = corpus or []
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.replayed = {}
+        self.remaining = RATE_LIMIT
+        self.reset_at = int(time.time()) + 3600
+        self.stats = {"requests": 0, "rate_limited": 0, "secondary_limited": 0, "errors": 0, "not_found": 0}
+
+    def rate_headers(self):
+        return {
+            "X-RateLimit-Limit": str(RATE_LIMIT),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(self.reset_at),
+        }
+
+    def inject_fault(self):
+        """
+        Returns (status, headers, body) of an injected failure, or None.
+        """
+        faults = self.faults
+        with self.lock:
+            self.requests += 1
+            count = self.requests
+            self.stats["requests"] += 1
+            if faults.rate_limit_every and count % faults.rate_limit_every == 0:
+                self.stats["rate_limited"] += 1
+                headers = {**self.rate_headers(), "X-RateLimit-Remaining": "0",
+                           "X-RateLimit-Reset": str(int(time.time()) + faults.reset_after)}
+                return 403, headers, {"message": "API rate limit exceeded for user."}
+            if faults.secondary_every and count % faults.secondary_every == 0:
+                self.stats["secondary_limited"] += 1
+                headers = {**self.rate_headers(), "Retry-After": str(faults.retry_after)}
+                return 403, headers, {"message": "You have exceeded a secondary rate limit."}
+            if faults.error_rate and faults.random.random() < faults.error_rate:
+                self.stats["errors"] += 1
+                return faults.random.choice([500, 502, 503]), self.rate_headers(), {"message": "Server Error"}
+            self.remaining -= 1
+        return None
+
+    def from_cassette(self, method, path, query, body, base_url):
+        key = interaction_key(method, path, query, body)
+        records = self.cassette.get(key)
+        if not records:
+            return None
+        with self.lock:
+            index = self.replayed.get(key, 0)
+            self.replayed[key] = index + 1
+        record = records[min(index, len(records) - 1)]
+        headers = {k: v for k, v in record["headers"].items()
+                   if k.lower() not in ("content-encoding", "content-length", "transfer-encoding", "connection")}
+        if "Link" in headers:
+            headers["Link"] = headers["Link"].replace("https://api.github.com", base_url)
+        headers.update(self.rate_headers())
+        return record["status"], headers, record["body"]
+
+    def from_corpus(self, path, query, base_url):
+        if path.endswith("/issues"):
+            issues = self.corpus
+            if query.get("since"):
+                issues = [issue for issue in issues if issue["updated_at"] >= query["since"]]
+            field = {"created": "created_at", "updated": "updated_at"}.get(query.get("sort"))
+            if field:
+                issues = sorted(issues, key=lambda issue: (issue.get(field, ""), issue["number"]),
+                                reverse=query.get("direction") == "desc")
+            return self.paginate(issues, path, query, base_url)
+        comments = COMMENTS_PATH.search(path)
+        if comments:
+            number = int(comments.group(1))
+            issue = next((issue for issue in self.corpus if issue["number"] == number), None)
+            if issue is not None:
+                return self.paginate(make_comments(issue), path, query, base_url)
+        return None
+
+    def paginate(self, all_items, path, query, base_url):
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        last_page = max(1, -(-len(all_items) // per_page))
+        items = all_items[(page - 1) * per_page:page * per_page]
+        other = {k: v for k, v in query.items() if k != "page"}
+        other_query = "".join(f"&{k}={v}" for k, v in sorted(other.items()))
+        headers = {
+            **self.rate_headers(),
+            "Content-Type": "application/json; charset=utf-8",
+            "Link": f'<{base_url}{path}?page={last_page}{other_query}>; rel="last"',
+        }
+        return 200, headers, json.dumps(items)
+
+    def respond(self, method, raw_path, body, base_url):
+        fault = self.inject_fault()
+        if self.faults.latency:
+            time.sleep(self.faults.latency)
+        if fault:
+            status, headers, payload = fault
+            return status, headers, json.dumps(payload)
+        url = urlparse(raw_path)
+        query = dict(parse_qsl(url.query))
+        if self.cassette is not None:
+            result = self.from_cassette(method, url.path, query, body, base_url)
+        else:
+            result = self.from_corpus(url.path, query, base_url)
+        if result is None:
+            with self.lock:
+                self.stats["not_found"] += 1
+                first_miss = self.stats["not_found"] == 1
+            if self.cassette is not None and first_miss:
+                print(f"Not in the cassette: {method} {raw_path}. Replays need the store state of the "
+                      "recording; run both against a fresh ISSUE_STORE_PATH.", file=sys.stderr)
+            return 404, self.rate_headers(), json.dumps({"message": "Not Found"})
+        return result
+
+
+def make_handler(standin):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, method, body=None):
+            base_url = f"http://{self.headers.get('Host')}"
+            status, headers, payload = standin.respond(method, self.path, body, base_url)
+            data = payload.encode("utf-8")
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._send("GET")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self._send("POST", json.loads(self.rfile.read(length) or b"null"))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(standin, host="127.0.0.1", port=0):
+    """
+    Serve in a background thread; returns the server and its base URL.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(standin))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Serve recorded or synthetic GitHub API responses.")
+    parser.add_argument("--cassette", help="JSON-lines cassette recorded with GH_RECORD_CASSETTE")
+    parser.add_argument("--synthetic", type=int, default=1000, help="corpus size when no cassette is given")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="every Nth request is a 403 rate limit")
+    parser.add_argument("--reset-after", type=int, default=2, help="seconds until X-RateLimit-Reset")
+    parser.add_argument("--secondary-every", type=int, default=0, help="every Nth request is a secondary limit")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 5xx")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.rate_limit_every, args.reset_after, args.secondary_every,
+                    args.retry_after, args.error_rate, args.seed)
+    if args.cassette:
+        standin = StandIn(faults, cassette=load_cassette(args.cassette))
+    else:
+        standin = StandIn(faults, corpus=generate_corpus(args.synthetic, args.seed))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(standin))
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(standin.stats))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,80 @@
+"""
+Ingest cost of a full backfill into the issue store, against the local stand-in serving full
+REST payloads. "list" decodes every page whole and stores the list once all pages are in (the
+former sync); "streamed" projects issues as they are decoded and stores them page by page.
+Peak traced memory and wall time are measured in separate passes.
+
+    poetry run python -m bench.ingest_benchmark --issues 20000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from bench.corpus import generate_corpus, rest_payload
+from bench.gh_standin import Faults, StandIn, start_server
+from src import fetcher
+from src.issue_store import IssueStore
+from src.projection import project_issue
+
+
+def ingest_list(url, store, workers):
+    issues = fetcher.fetch_all_pages(url, {"state": "all"}, fetcher.create_session(workers), workers)
+    store.upsert_issues(issues)
+    return len(issues)
+
+
+def ingest_streamed(url, store, workers):
+    pages = fetcher.iter_pages(url, {"state": "all"}, fetcher.create_session(workers), workers, project=project_issue)
+    count, _ = store.upsert_pages(pages)
+    return count
+
+
+def measure(ingest, url, workdir, workers, trace):
+    store = IssueStore(os.path.join(workdir, f"{ingest.__name__}_{trace}.sqlite3"))
+    try:
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        count = ingest(url, store, workers)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else None
+        tracemalloc.stop()
+        return count, elapsed, peak
+    finally:
+        store.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark backfill ingest into the issue store.")
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_ingest_results.json")
+    args = parser.parse_args()
+
+    corpus = [rest_payload(issue) for issue in generate_corpus(args.issues, args.seed)]
+    fetcher.http_cache.enabled = False
+    server, base_url = start_server(StandIn(Faults(), corpus=corpus))
+    url = f"{base_url}/repos/o/r/issues"
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for ingest in (ingest_list, ingest_streamed):
+                count, elapsed, _ = measure(ingest, url, workdir, args.workers, trace=False)
+                _, _, peak = measure(ingest, url, workdir, args.workers, trace=True)
+                name = ingest.__name__.removeprefix("ingest_")
+                results.append({"ingest": name, "issues": count, "seconds": elapsed, "peak_bytes": peak})
+                print(f"{name:<10} {count:>7} issues {elapsed:8.3f}s peak {peak / 2**20:8.1f} MiB")
+    finally:
+        server.shutdown()
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"corpus": len(corpus), "workers": args.workers, "results": results}, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,114 @@
+"""
+Offline benchmarks over a synthetic corpus.
+
+    poetry run python -m bench.run_benchmarks --sizes 100 10000 100000 --output bench_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+# rates are read at import by src.parser
+os.environ.setdefault("EASY", "50")
+os.environ.setdefault("MEDIUM", "75")
+os.environ.setdefault("HARD", "100")
+
+from bench.corpus import generate_corpus  # noqa: E402
+from src import main  # noqa: E402
+from src.csv_writer import update_csv, write_to_csv  # noqa: E402
+from src.parse_cache import ParseCache  # noqa: E402
+from src.parser import parse_milestone, parse_schedule  # noqa: E402
+
+DEFAULT_SIZES = [100, 10000, 100000]
+
+
+def timed(stage, size, items, func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "stage": stage,
+        "issues": size,
+        "items": items,
+        "seconds": best,
+        "us_per_item": best / items * 1e6 if items else 0.0,
+    }, result
+
+
+def bench_size(size, seed, repeat, workdir):
+    issues = generate_corpus(size, seed)
+    proposals = [issue for issue in issues if main.is_proposal(issue["title"])]
+    results = []
+
+    record, tasks = timed("process_tasks", size, len(issues) - len(proposals),
+                          lambda: main.process_tasks(issues), repeat)
+    results.append(record)
+    complexity = {link: task.project_complexity for link, task in tasks.items()}
+    linked = [
+        (p["title"], p["body"], complexity[main.parse_issue_link_from_body(p["body"], p["title"])])
+        for p in proposals
+    ]
+
+    record, _ = timed("parse_milestone", size, len(linked),
+                      lambda: [parse_milestone(body, title, c) for title, body, c in linked], repeat)
+    results.append(record)
+    record, _ = timed("parse_schedule", size, len(linked),
+                      lambda: [parse_schedule(body) for _, body, _ in linked], repeat)
+    results.append(record)
+
+    def process_proposals_cold():
+        main.parse_cache = ParseCache(os.path.join(workdir, f"parse-{size}-{time.perf_counter_ns()}.sqlite3"))
+        return main.process_proposals(issues, main.process_tasks(issues))
+
+    record, tracker = timed("process_proposals", size, len(proposals), process_proposals_cold, repeat)
+    results.append(record)
+    record, _ = timed("process_proposals_warm_cache", size, len(proposals),
+                      lambda: main.process_proposals(issues, main.process_tasks(issues)), repeat)
+    results.append(record)
+
+    record, _ = timed("generate_metrics", size, len(tracker), lambda: main.generate_metrics(tracker), repeat)
+    results.append(record)
+    csv_path = os.path.join(workdir, f"issues-{size}.csv")
+    record, _ = timed("write_to_csv", size, len(tracker), lambda: write_to_csv(tracker, csv_path), repeat)
+    record["bytes"] = os.path.getsize(csv_path)
+    results.append(record)
+    record, _ = timed("update_csv_unchanged", size, len(tracker), lambda: update_csv(tracker, csv_path), repeat)
+    results.append(record)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Run the offline tracker benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="keep the best of N runs per stage")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            results.extend(bench_size(size, args.seed, args.repeat, workdir))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    for record in results:
+        print(f"{record['stage']:<30} {record['issues']:>7} issues {record['seconds']:>9.4f}s {record['us_per_item']:>10.1f} us/item")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
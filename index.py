@@ -1,2 +1,45 @@
-from src.main import run
-run()
\ No newline at end of file
+import argparse
+import sys
+from src.logger import configure_logging
+from src.main import IncompleteSync, run, parse_workers
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the acceleration program tracker.")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="rebuild from the local issue store without calling the GitHub API",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=parse_workers,
+        help="parse issues in a pool of this many processes (default: PARSE_WORKERS, serial)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running: apply GitHub issues webhooks and periodic incremental polls as they arrive",
+    )
+    parser.add_argument("--host", help="webhook listen address (default: WEBHOOK_HOST, 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="webhook listen port (default: WEBHOOK_PORT, 8000)")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="seconds between incremental polls in daemon mode (default: DAEMON_POLL_SECONDS, 300)",
+    )
+    args = parser.parse_args()
+    configure_logging()
+    try:
+        if args.daemon:
+            from src import daemon
+
+            daemon.serve(
+                host=args.host or daemon.WEBHOOK_HOST,
+                port=args.port or daemon.WEBHOOK_PORT,
+                poll_interval=args.poll_interval or daemon.POLL_INTERVAL,
+            )
+        else:
+            run(offline=args.offline, workers=args.workers)
+    except IncompleteSync as e:
+        sys.exit(str(e))
@@ -0,0 +1,61 @@
+import json
+import threading
+from urllib.parse import parse_qsl, urlparse
+
+
+def interaction_key(method, path, query, body):
+    """
+    How a recorded response is matched on replay: method, path, query params and JSON body.
+    """
+    return json.dumps([method.upper(), path, sorted(query.items()), body], sort_keys=True, default=str)
+
+
+def load_cassette(path):
+    """
+    Interactions keyed by interaction_key; repeated requests replay in recorded order.
+    """
+    interactions = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            key = interaction_key(record["method"], record["path"], record["query"], record["request_body"])
+            interactions.setdefault(key, []).append(record)
+    return interactions
+
+
+class RecordingSession:
+    """
+    Wraps a requests.Session and appends every response, headers included, to a JSON-lines cassette.
+    """
+
+    def __init__(self, session, cassette_path):
+        self.session = session
+        self.cassette_path = cassette_path
+        self.headers = session.headers
+        self.lock = threading.Lock()
+
+    def _record(self, method, response, request_body):
+        url = urlparse(response.url)
+        record = {
+            "method": method,
+            "path": url.path,
+            "query": dict(parse_qsl(url.query)),
+            "request_body": request_body,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": response.text,
+        }
+        with self.lock, open(self.cassette_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, **kwargs)
+        self._record("GET", response, None)
+        return response
+
+    def post(self, url, json=None, **kwargs):
+        response = self.session.post(url, json=json, **kwargs)
+        self._record("POST", response, json)
+        return response
@@ -0,0 +1,87 @@
+"""
+Comment enrichment: deliverable repositories and the last reviewer comment of each proposal.
+
+Comments are fetched only for proposals whose comment count changed since the summary
+stored with the issue snapshot, in a bounded pool over the shared session and rate limiter.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from src.fetcher import API_URL, FETCH_WORKERS, fetch_all_pages
+from src.logger import logger
+from src.projection import project_comment
+
+REPO_LINK_PATTERN = re.compile(r"https://github\.com/([\w.-]+)/([\w.-]+)")
+# first path segments of github.com that are not repository owners
+NOT_OWNERS = {
+    "orgs", "users", "settings", "apps", "sponsors", "marketplace", "features", "topics", "collections",
+    # uploaded images and files: https://github.com/user-attachments/assets/<uuid>
+    "user-attachments", "login", "logout", "join", "signup", "notifications", "explore", "search",
+    "new", "organizations", "enterprise", "pricing", "about", "security", "customer-stories",
+    "trending", "dashboard", "pulls", "issues", "codespaces", "account", "contact",
+}
+
+
+def find_repo_links(text, excluded_repos=()):
+    repos = []
+    for owner, name in REPO_LINK_PATTERN.findall(text or ""):
+        name = name.rstrip(".").removesuffix(".git")
+        repo = f"{owner}/{name}"
+        if owner.lower() in NOT_OWNERS or repo in excluded_repos or repo in repos:
+            continue
+        repos.append(repo)
+    return repos
+
+
+def summarize_comments(comments, applicant, excluded_repos=()):
+    """
+    Repositories linked from the comments, in order of first mention, and the author and time
+    of the last comment by someone other than the applicant or a bot.
+    """
+    summary = {"deliverable_repos": [], "last_reviewer": None, "last_reviewed_at": None}
+    for comment in comments:
+        for repo in find_repo_links(comment.get("body"), excluded_repos):
+            if repo not in summary["deliverable_repos"]:
+                summary["deliverable_repos"].append(repo)
+        login = (comment.get("user") or {}).get("login", "")
+        if login and login != applicant and not login.endswith("[bot]"):
+            summary["last_reviewer"] = login
+            summary["last_reviewed_at"] = comment.get("created_at")
+    return summary
+
+
+def comments_url(repo, number):
+    return f"{API_URL}/repos/{repo}/issues/{number}/comments"
+
+
+def fetch_comment_summaries(jobs, session, excluded_repos=(), workers=FETCH_WORKERS):
+    """
+    jobs: (repo, number, applicant). Returns {(repo, number): summary}, without the issues
+    whose comments could not be fetched.
+    """
+    def fetch(job):
+        repo, number, applicant = job
+        comments = fetch_all_pages(comments_url(repo, number), {}, session, workers=1, project=project_comment)
+        if comments is None:
+            logger.warning(f"Comments of {repo}#{number} unavailable, keeping the previous summary")
+            return job, None
+        return job, summarize_comments(comments, applicant, excluded_repos)
+
+    summaries = {}
+    if not jobs:
+        return summaries
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        for (repo, number, _), summary in pool.map(fetch, jobs):
+            if summary is not None:
+                summaries[(repo, number)] = summary
+    return summaries
+
+
+def apply_summary(proposal, summary):
+    # summaries stored before a path was excluded are filtered on the way out
+    proposal.deliverable_repos = [
+        repo for repo in summary["deliverable_repos"] if repo.split("/")[0].lower() not in NOT_OWNERS
+    ]
+    proposal.last_reviewer = summary["last_reviewer"]
+    reviewed_at = summary["last_reviewed_at"]
+    proposal.last_reviewed_at = datetime.fromisoformat(reviewed_at) if reviewed_at else None
@@ -1,4 +1,12 @@
 import csv
+import hashlib
+import json
+import os
+import tempfile
+import time
+from src import instrumentation
+from src.decorator import instrumented
+from src.logger import logger
 
 
 def get_csv_header():
@@ -22,49 +30,249 @@ def get_csv_header():
         "Cost Per Milestone",
         "Start/End Date",
         "Deliverable Repo Available",
+        "Last Reviewer Comment",
+        "Repository",
     ]
 
 
-def get_csv_row(proposal_type, task_info, proposal, task_link):
+def or_error(value):
+    return "error" if value is None else value
+
+
+def format_equation(milestones):
+    components = [
+        f"({m.duration} {m.unit} * {m.fte} FTE) * ${m.rate if m.rate is not None else 'ERROR'}"
+        for m in milestones
+        if m.duration is not None
+    ]
+    return " + ".join(components) if components else "error"
+
+
+def format_cost_per_milestone(milestones):
+    costs = [m.cost for m in milestones if m.cost is not None]
+    return "".join(f"m{i+1} = ${cost}; " for i, cost in enumerate(costs))
+
+
+def format_schedule(milestones):
+    formatted_dates = "".join(
+        f"Start Date for Milestone {m.number}: {m.start_date.strftime('%Y %b %d')}, "
+        f"End Date for Milestone {m.number}: {m.end_date.strftime('%B %d, %Y')}; "
+        for m in milestones
+        if m.start_date is not None
+    )
+    return formatted_dates or "NONE"
+
+
+def format_deliverable_repos(repos):
+    if repos is None:
+        return "NONE"
+    return " ".join(f"https://github.com/{repo}" for repo in repos) or "No"
+
+
+def format_last_review(proposal):
+    if proposal.last_reviewer is None:
+        return "NONE"
+    reviewed_at = f" {proposal.last_reviewed_at.strftime('%Y-%m-%d')}" if proposal.last_reviewed_at else ""
+    return proposal.last_reviewer + reviewed_at
+
+
+def get_csv_row(proposal_type, task, proposal):
     return [
         proposal_type,
-        task_info["title"],
+        task.title,
         "",
-        task_info["creator"],
-        task_info["assignee"],
-        task_link,
-        task_info["project_complexity"],
+        task.creator,
+        task.assignee,
+        task.task_link,
+        or_error(task.project_complexity),
         "Yes" if proposal else "No",
-        proposal["link"] if proposal else "NONE",
-        proposal["creator"] if proposal else "NONE",
-        proposal["total_duration_value"] if proposal else "NONE",
-        proposal["total_fte"] if proposal else "NONE",
-        proposal["total_working_hours"] if proposal else "NONE",
-        proposal["formatted_equation"] if proposal else "NONE",
-        task_info["Pricing Per Hours"],
-        proposal["total_cost"] if proposal else "NONE",
-        proposal["format_cost_per_milestone"] if proposal else "NONE",
-        proposal.get("start_end_date", "NONE") if proposal else "NONE",
-        "NONE",
+        proposal.link if proposal else "NONE",
+        proposal.creator if proposal else "NONE",
+        or_error(proposal.total_duration) if proposal else "NONE",
+        or_error(proposal.total_fte) if proposal else "NONE",
+        or_error(proposal.total_working_hours) if proposal else "NONE",
+        format_equation(proposal.milestones) if proposal else "NONE",
+        or_error(task.pricing_per_hours),
+        proposal.total_cost if proposal else "NONE",
+        format_cost_per_milestone(proposal.milestones) if proposal else "NONE",
+        format_schedule(proposal.milestones) if proposal else "NONE",
+        format_deliverable_repos(proposal.deliverable_repos) if proposal else "NONE",
+        format_last_review(proposal) if proposal else "NONE",
+        task.repo,
     ]
 
 
+def get_proposal_type(task):
+    if len(task.proposals) == 1 and task.type == "Closed Task":
+        return "Closed Task & Closed Proposal"
+    elif len(task.proposals) == 1 and task.type == "Task":
+        return "Task & Proposal"
+    return "Task & Competing Proposal"
+
+
+def task_rows(task):
+    if task.proposals:
+        return [get_csv_row(get_proposal_type(task), task, proposal) for proposal in task.proposals]
+    return [get_csv_row(task.type, task, None)]
+
+
+def iter_csv_rows(tasks):
+    for task in tasks.values():
+        yield from task_rows(task)
+
+
+TASK_LINK_COLUMN = get_csv_header().index("Task Link")
+PROPOSAL_LINK_COLUMN = get_csv_header().index("Proposal Link")
+
+
+def row_key(row):
+    return row[TASK_LINK_COLUMN], row[PROPOSAL_LINK_COLUMN]
+
+
+def row_hash(row):
+    # hash the cells as csv writes them, so rows read back from the file compare equal
+    return hashlib.sha1("\x1f".join("" if cell is None else str(cell) for cell in row).encode()).hexdigest()
+
+
+def read_row_hashes(filepath):
+    """
+    (task link, proposal link) -> row hash of an existing output, in file order.
+    None if there is no file or it was written with a different header.
+    """
+    try:
+        with open(filepath, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            if next(reader, None) != get_csv_header():
+                return None
+            return {row_key(row): row_hash(row) for row in reader}
+    except FileNotFoundError:
+        return None
+
+
+def write_rows_atomically(rows, filepath):
+    """
+    Write to a temp file in the same directory and rename it over filepath,
+    so readers see either the old file or the new one, never a partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".csv-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+            writer.writerow(get_csv_header())
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+        mode = os.stat(filepath).st_mode if os.path.exists(filepath) else 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+@instrumented("csv_write")
 def write_to_csv(tasks, filepath):
-    with open(filepath, mode="w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file, quoting=csv.QUOTE_ALL)
-        writer.writerow(get_csv_header())
-
-        for task_link, task_info in tasks.items():
-            if task_info["proposals"]:
-                for proposal in task_info["proposals"]:
-                    if len(task_info["proposals"]) == 1 and task_info["type"] == "Closed Task":
-                        proposal_type = "Closed Task & Closed Proposal" 
-                    elif len(task_info["proposals"]) == 1 and task_info["type"] == "Task":
-                        proposal_type = "Task & Proposal" 
-                    else:
-                        proposal_type = "Task & Competing Proposal"
-                    row = get_csv_row(proposal_type, task_info, proposal, task_link)
-                    writer.writerow(row)
-            else:
-                row = get_csv_row(task_info["type"], task_info, None, task_link)
-                writer.writerow(row)
+    write_rows_atomically(iter_csv_rows(tasks), filepath)
+
+
+@instrumented("csv_write")
+def update_csv(tasks, filepath, changelog_path=None):
+    """
+    Bring filepath up to date with the tracker and return the keys of the rows that were
+    added, changed or removed. The file is republished atomically only if something
+    differs; each non-empty change set is appended to changelog_path as one JSON line.
+    """
+    rows = list(iter_csv_rows(tasks))
+    return replace_rows(rows, {row_key(row): row_hash(row) for row in rows}, filepath, changelog_path)
+
+
+def replace_rows(rows, current, filepath, changelog_path):
+    """
+    Diff `current` (row key -> row hash, in row order) with filepath and publish `rows` if they differ.
+    """
+    previous = read_row_hashes(filepath)
+    changes = {"added": [], "changed": [], "removed": []}
+    for key, digest in current.items():
+        if previous is None or key not in previous:
+            changes["added"].append(key)
+        elif previous[key] != digest:
+            changes["changed"].append(key)
+    changes["removed"] = [key for key in previous or {} if key not in current]
+
+    if previous is None or list(previous) != list(current) or changes["changed"]:
+        write_rows_atomically(rows, filepath)
+    record_changes(changes, filepath, changelog_path)
+    return changes
+
+
+def record_changes(changes, filepath, changelog_path):
+    for kind, keys in changes.items():
+        instrumentation.count(f"csv_rows_{kind}", len(keys))
+    logger.info(
+        f"{filepath}: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+        f"{len(changes['removed'])} removed"
+    )
+    if changelog_path and any(changes.values()):
+        append_changelog(changes, changelog_path)
+
+
+class TrackerCsv:
+    """
+    issues.csv for a tracker that changes a few tasks at a time (watch mode). The rows of every
+    task and their hashes are kept between updates, so an update renders and hashes only the
+    tasks that changed, and compares them with what it last wrote instead of reading the file.
+    """
+
+    def __init__(self, filepath, changelog_path=None):
+        self.filepath = filepath
+        self.changelog_path = changelog_path
+        # task link -> [(row key, row hash, row)] as last written; None before the first update
+        self.rows = None
+
+    @instrumented("csv_write")
+    def update(self, tasks, changed):
+        """
+        Same as update_csv, for the tasks whose links are in `changed`: added, edited or removed
+        since the last update. The first update renders every task and diffs with the file.
+        """
+        if self.rows is None:
+            self.rows = {link: self.render(task) for link, task in tasks.items()}
+            rendered = [entry for entries in self.rows.values() for entry in entries]
+            return replace_rows((row for _, _, row in rendered), {key: digest for key, digest, _ in rendered},
+                                self.filepath, self.changelog_path)
+
+        changes = {"added": [], "changed": [], "removed": []}
+        reordered = False
+        for link in changed:
+            old = self.rows.pop(link, [])
+            new = self.render(tasks[link]) if link in tasks else []
+            if new:
+                self.rows[link] = new
+            old_hashes = {key: digest for key, digest, _ in old}
+            new_keys = {key for key, _, _ in new}
+            for key, digest, _ in new:
+                if key not in old_hashes:
+                    changes["added"].append(key)
+                elif old_hashes[key] != digest:
+                    changes["changed"].append(key)
+            changes["removed"] += [key for key, _, _ in old if key not in new_keys]
+            reordered = reordered or [key for key, _, _ in old] != [key for key, _, _ in new]
+
+        if reordered or changes["changed"]:
+            write_rows_atomically((row for link in tasks for _, _, row in self.rows[link]), self.filepath)
+        record_changes(changes, self.filepath, self.changelog_path)
+        return changes
+
+    @staticmethod
+    def render(task):
+        return [(row_key(row), row_hash(row), row) for row in task_rows(task)]
+
+
+def append_changelog(changes, changelog_path):
+    entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+    for kind, keys in changes.items():
+        entry[kind] = [{"task_link": task_link, "proposal_link": proposal_link} for task_link, proposal_link in keys]
+    with open(changelog_path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(entry) + "\n")
@@ -0,0 +1,369 @@
+"""
+Watch mode: keep the tracker in memory and apply issue updates as they arrive.
+
+Updates come from GitHub `issues` webhooks posted to a local endpoint and from a periodic
+incremental poll, which uses the same since-based sync as a normal run. An update re-parses
+only the changed issue, plus the proposals of a task whose complexity changed. Outputs are
+republished once per batch of updates, at the cost of the tasks it changed.
+"""
+import hashlib
+import hmac
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src import main
+from src.csv_writer import TrackerCsv
+from src.isolation import isolate, write_quarantine
+from src.issue_store import IssueStore
+from src.logger import logger
+from src.parser import parse_issue_link_from_body, repo_from_link
+from src.projection import project_issue
+from src.query import build_index, update_index
+
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8000))
+# GitHub signs deliveries with this secret (X-Hub-Signature-256); unsigned deliveries are refused when set
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+POLL_INTERVAL = float(os.getenv("DAEMON_POLL_SECONDS", 300))
+# after the first update of a burst, wait this long for more before republishing
+BATCH_SECONDS = 1.0
+REMOVING_ACTIONS = ("deleted", "transferred")
+
+
+class Tracker:
+    """
+    Task index, raw issues and proposals waiting for their task, updated one issue at a time.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+        self.issues = {}
+        # task link -> {proposal link: issue} for proposals whose task is not known yet
+        self.pending = {}
+        # proposal link -> link of the task it is attached to
+        self.attached = {}
+        # issue link -> ParseFailure of its latest version
+        self.failures = {}
+        # links of the tasks added, edited or removed, or whose proposals were, since the last publish
+        self.changed = set()
+
+    def load(self, issues):
+        for issue in issues:
+            self.apply(issue)
+
+    def apply(self, issue, removed=False):
+        if "pull_request" in issue:
+            return
+        link = issue.get("html_url")
+        title = issue.get("title", "").strip()
+        self.failures.pop(link, None)
+        if not removed and link in self.tasks and not main.is_proposal(title):
+            self.update_task(link, title, issue)
+            return
+        if not removed and link in self.attached and main.is_proposal(title):
+            self.update_proposal(link, title, issue)
+            return
+        self.remove(link)
+        if removed:
+            return
+        self.issues[link] = issue
+        if main.is_proposal(title):
+            self.add_proposal(link, title, issue)
+        else:
+            self.add_task(link, title, issue)
+
+    def add_task(self, link, title, issue):
+        task, failure = isolate("task", link, title, main.process_task, title, issue)
+        if failure:
+            self.failures[link] = failure
+            return
+        self.tasks[link] = task
+        self.changed.add(link)
+        for proposal_link, proposal_issue in self.pending.pop(link, {}).items():
+            self.add_proposal(proposal_link, proposal_issue.get("title", "").strip(), proposal_issue)
+
+    def update_task(self, link, title, issue):
+        old = self.tasks[link]
+        self.changed.add(link)
+        task, failure = isolate("task", link, title, main.process_task, title, issue)
+        if failure:
+            self.remove(link)
+            self.issues[link] = issue
+            self.failures[link] = failure
+            return
+        self.issues[link] = issue
+        self.tasks[link] = task
+        if task.project_complexity == old.project_complexity:
+            task.proposals = old.proposals
+            return
+        # the rate changed, so every proposal of the task is repriced
+        for proposal in old.proposals:
+            del self.attached[proposal.link]
+            proposal_issue = self.issues[proposal.link]
+            self.add_proposal(proposal.link, proposal_issue.get("title", "").strip(), proposal_issue)
+
+    def add_proposal(self, link, title, issue):
+        task_link, failure = isolate("link", link, title, parse_issue_link_from_body, issue.get("body", ""), title)
+        if failure:
+            self.failures[link] = failure
+            return
+        if task_link not in self.tasks:
+            self.pending.setdefault(task_link, {})[link] = issue
+            return
+        proposal, failure = isolate("proposal", link, title, main.process_proposal, title, issue, self.tasks)
+        if failure:
+            self.failures[link] = failure
+            return
+        self.tasks[task_link].proposals.append(proposal)
+        self.attached[link] = task_link
+        self.changed.add(task_link)
+
+    def update_proposal(self, link, title, issue):
+        task = self.tasks[self.attached[link]]
+        index = next(i for i, proposal in enumerate(task.proposals) if proposal.link == link)
+        self.remove(link)
+        self.issues[link] = issue
+        self.add_proposal(link, title, issue)
+        if self.attached.get(link) == task.task_link:
+            # still the same task: keep the proposal where it was
+            task.proposals.insert(index, task.proposals.pop())
+
+    def remove(self, link):
+        self.issues.pop(link, None)
+        task = self.tasks.pop(link, None)
+        if task is not None:
+            self.changed.add(link)
+            for proposal in task.proposals:
+                del self.attached[proposal.link]
+                self.pending.setdefault(link, {})[proposal.link] = self.issues[proposal.link]
+            return
+        task_link = self.attached.pop(link, None)
+        if task_link is not None:
+            task = self.tasks[task_link]
+            task.proposals = [proposal for proposal in task.proposals if proposal.link != link]
+            self.changed.add(task_link)
+        for waiting in self.pending.values():
+            waiting.pop(link, None)
+        self.failures.pop(link, None)
+
+    def quarantined(self):
+        """
+        Failed issues, then proposals still waiting for their task.
+        """
+        unresolved = [
+            main.unresolved(issue.get("title", "").strip(), issue)
+            for waiting in self.pending.values() for issue in waiting.values()
+        ]
+        return list(self.failures.values()) + unresolved
+
+
+def verify_signature(secret, body, signature):
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def make_webhook_handler(updates, secret=None):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def _reply(self, status):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if secret and not verify_signature(secret, body, self.headers.get("X-Hub-Signature-256")):
+                self._reply(401)
+                return
+            if self.headers.get("X-GitHub-Event") != "issues":
+                self._reply(204)
+                return
+            try:
+                payload = json.loads(body)
+                updates.put((payload.get("action"), project_issue(payload["issue"])))
+            except (ValueError, KeyError, TypeError):
+                self._reply(400)
+                return
+            self._reply(202)
+
+        def log_message(self, format, *args):
+            logger.debug("Webhook: " + format, *args)
+
+    return WebhookHandler
+
+
+def start_webhook_server(updates, host=WEBHOOK_HOST, port=WEBHOOK_PORT, secret=WEBHOOK_SECRET):
+    """
+    Accept webhook deliveries in a background thread; they are queued as (action, issue).
+    """
+    server = ThreadingHTTPServer((host, port), make_webhook_handler(updates, secret))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def store_delivered(issues, removed=()):
+    """
+    Upsert webhook issues into their repository's store and delete the removed ones;
+    the since-mark is left to the poll.
+    """
+    by_repo = {}
+    for issue in issues:
+        by_repo.setdefault(repo_from_link(issue.get("html_url")), ([], []))[0].append(issue)
+    for issue in removed:
+        by_repo.setdefault(repo_from_link(issue.get("html_url")), ([], []))[1].append(issue["number"])
+    for repo, (repo_issues, deleted) in by_repo.items():
+        store = IssueStore(main.store_path(repo))
+        try:
+            store.upsert_issues(repo_issues)
+            store.delete(deleted)
+        finally:
+            store.close()
+
+
+def poll_repo(repo):
+    """
+    Sync one repository and read back the issues it changed.
+    """
+    store = IssueStore(main.store_path(repo))
+    try:
+        since = store.get_since()
+        if not main.sync_issues(store, repo):
+            return []
+        return list(store.iter_issues(updated_after=since))
+    finally:
+        store.close()
+
+
+def poll():
+    with ThreadPoolExecutor(max_workers=len(main.tracked_repos)) as pool:
+        changed = pool.map(poll_repo, main.tracked_repos)
+    return [issue for issues in changed for issue in issues]
+
+
+def drain(updates, first):
+    batch = [first]
+    deadline = time.monotonic() + BATCH_SECONDS
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            batch.append(updates.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def columnar_rows(task):
+    """
+    The rows of a task in the columnar table and in the milestone timeline; needs pandas.
+    """
+    from src.table import task_rows
+    from src.timeline import milestone_rows
+
+    return list(task_rows(task)), list(milestone_rows(task))
+
+
+class Publisher:
+    """
+    Writes the outputs of a Tracker. The first publish writes everything; after that, a publish
+    costs the tasks changed since the last one. Only their CSV rows, index rows and comment
+    summaries are redone, and the columnar table and timeline are rebuilt only if one of their
+    rows changed.
+    """
+
+    def __init__(self):
+        self.csv = TrackerCsv(main.output_csv_path, main.output_changelog_path)
+        # task link -> its columnar_rows as last written; None before the first publish
+        self.columnar = None
+
+    def publish(self, tracker):
+        changed, tracker.changed = tracker.changed, set()
+        first = self.columnar is None
+        metrics = main.generate_metrics(tracker.tasks)
+        main.enrich_proposals({link: tracker.tasks[link] for link in changed if link in tracker.tasks})
+        main.get_parse_cache().flush()
+        write_quarantine(tracker.quarantined(), main.output_quarantine_path)
+        changes = self.csv.update(tracker.tasks, changed)
+        if self.columnar_changed(tracker.tasks, changed):
+            main.write_columnar_outputs(tracker.tasks)
+        if first:
+            build_index(tracker.tasks, tracker.issues.values(), main.tracker_index_path)
+        else:
+            update_index(tracker.tasks, changed, tracker.issues, main.tracker_index_path)
+        main.export_run_metrics(metrics)
+        return changes
+
+    def columnar_changed(self, tasks, changed):
+        try:
+            if self.columnar is None:
+                self.columnar = {link: columnar_rows(task) for link, task in tasks.items()}
+                return True
+            affected = False
+            for link in changed:
+                rows = columnar_rows(tasks[link]) if link in tasks else None
+                if rows != self.columnar.pop(link, None):
+                    affected = True
+                if rows is not None:
+                    self.columnar[link] = rows
+            return affected
+        except ImportError:
+            # write_columnar_outputs reports the missing pandas
+            self.columnar = {}
+            return True
+
+
+def apply_deliveries(tracker, batch):
+    delivered = []
+    deleted = []
+    for action, issue in batch:
+        if repo_from_link(issue.get("html_url")) not in main.tracked_repos:
+            logger.warning(f"Ignoring webhook for untracked {issue.get('html_url')}")
+            continue
+        removed = action in REMOVING_ACTIONS
+        tracker.apply(issue, removed=removed)
+        if removed:
+            deleted.append(issue)
+        else:
+            delivered.append(issue)
+    store_delivered(delivered, deleted)
+
+
+def serve(host=WEBHOOK_HOST, port=WEBHOOK_PORT, poll_interval=POLL_INTERVAL, secret=WEBHOOK_SECRET):
+    tracker = Tracker()
+    tracker.load(main.iter_issues())
+    publisher = Publisher()
+    publisher.publish(tracker)
+    updates = queue.Queue()
+    server = start_webhook_server(updates, host, port, secret)
+    print(f"Watching {', '.join(main.tracked_repos)}: webhooks on http://{host}:{port}/, "
+          f"polling every {poll_interval:g}s")
+
+    next_poll = time.monotonic() + poll_interval
+    try:
+        while True:
+            try:
+                batch = drain(updates, updates.get(timeout=max(0.0, next_poll - time.monotonic())))
+            except queue.Empty:
+                batch = []
+            if batch:
+                apply_deliveries(tracker, batch)
+            polled = []
+            if time.monotonic() >= next_poll:
+                polled = poll()
+                for issue in polled:
+                    tracker.apply(issue)
+                next_poll = time.monotonic() + poll_interval
+            if batch or polled:
+                changes = publisher.publish(tracker)
+                logger.info(
+                    f"Applied {len(batch)} webhook and {len(polled)} polled updates: "
+                    f"{len(changes['added'])} rows added, {len(changes['changed'])} changed, "
+                    f"{len(changes['removed'])} removed"
+                )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,4 +1,6 @@
 import functools
+import time
+from src import instrumentation
 from src.logger import logger
 
 def log_issue_error(func):
@@ -14,4 +16,26 @@ def log_issue_error(func):
             issue_title = args[0] if len(args) > 0 else kwargs.get('issue_title', 'Unknown')
             logger.error(f"Error in {func.__name__} for issue '{issue_title}': {str(e)}")
             return None
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def instrumented(stage, per_item=False, label_arg=None):
+    """
+    Time every call of the function under `stage`.
+    per_item: also feed a per-call latency histogram; label_arg is the index of the
+    positional argument naming the item, for the slowest-items list.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                instrumentation.record_stage(stage, elapsed)
+                if per_item:
+                    label = args[label_arg] if label_arg is not None and len(args) > label_arg else None
+                    instrumentation.observe(stage, elapsed, label)
+        return wrapper
+    return decorator
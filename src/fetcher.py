@@ -0,0 +1,194 @@
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import parse_qs, urlparse
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from src import instrumentation
+from src.cassette import RecordingSession
+from src.http_cache import HttpCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from src.logger import logger
+from src.rate_limiter import RateLimiter, Stopped, is_rate_limited
+
+load_dotenv()
+
+GH_PERSONAL_ACCESS_TOKEN = os.getenv("GH_PERSONAL_ACCESS_TOKEN")
+# Point at a local stand-in (bench/gh_standin.py) to run without the real API
+API_URL = os.getenv("GH_API_URL", "https://api.github.com").rstrip("/")
+# Append every raw response to this JSON-lines cassette, for replay by the stand-in
+RECORD_CASSETTE = os.getenv("GH_RECORD_CASSETTE")
+PER_PAGE = 100
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", 8))
+MAX_RETRIES = 5
+MAX_RATE_LIMIT_WAITS = 10
+RETRY_STATUSES = (500, 502, 503, 504)
+WHITESPACE = re.compile(r"\s*")
+json_decoder = json.JSONDecoder()
+
+headers = {
+    "Authorization": GH_PERSONAL_ACCESS_TOKEN,
+    "Accept": "application/vnd.github.v3+json",
+}
+
+http_cache = HttpCache(
+    os.getenv("HTTP_CACHE_DIR", DEFAULT_CACHE_DIR),
+    int(os.getenv("HTTP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+    # a recording must hold full responses, not 304s
+    enabled=not RECORD_CASSETTE,
+)
+
+
+def create_session(workers=FETCH_WORKERS):
+    """
+    One keep-alive connection pool shared by all fetch workers.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers)
+    if RECORD_CASSETTE:
+        return RecordingSession(session, RECORD_CASSETTE)
+    return session
+
+
+session = create_session()
+# shared by every worker and by the GraphQL backend
+rate_limiter = RateLimiter()
+
+
+def send_with_retries(send, description):
+    """
+    Run `send` (a zero-argument request) under the shared rate limiter.
+    Rate-limited responses wait for the limit to lift; connection errors and 5xx are retried
+    with jittered exponential back-off. Returns the 200 response, or None once it gives up or the
+    rate limiter is interrupted.
+    """
+    attempt = 0
+    limited = 0
+    try:
+        while attempt <= MAX_RETRIES and limited <= MAX_RATE_LIMIT_WAITS:
+            rate_limiter.acquire()
+            try:
+                response = send()
+            except requests.RequestException as e:
+                logger.warning(f"{description}: {e}")
+                rate_limiter.backoff(attempt)
+                attempt += 1
+                continue
+            rate_limiter.update(response)
+            if response.status_code == 200:
+                return response
+            if is_rate_limited(response):
+                logger.warning(f"{description}: rate limited (HTTP {response.status_code})")
+                limited += 1
+            elif response.status_code in RETRY_STATUSES:
+                logger.warning(f"{description}: HTTP {response.status_code}, retrying")
+                rate_limiter.backoff(attempt)
+                attempt += 1
+            else:
+                logger.error(f"{description} failed: HTTP {response.status_code}")
+                return None
+    except Stopped:
+        logger.warning(f"{description}: abandoned, the sync was stopped")
+        return None
+    logger.error(f"{description} failed: giving up after {attempt} retries and {limited} rate limits")
+    return None
+
+
+def iter_json_array(text):
+    """
+    Decode a JSON array one element at a time, so a caller can project each element and drop it
+    before the next one is built.
+    """
+    pos = WHITESPACE.match(text).end()
+    if not text.startswith("[", pos):
+        raise ValueError(f"Expected a JSON array at {pos}")
+    pos = WHITESPACE.match(text, pos + 1).end()
+    if text.startswith("]", pos):
+        return
+    while True:
+        item, pos = json_decoder.raw_decode(text, pos)
+        yield item
+        pos = WHITESPACE.match(text, pos).end()
+        if text.startswith("]", pos):
+            return
+        if not text.startswith(",", pos):
+            raise ValueError(f"Expected ',' or ']' at {pos}")
+        pos = WHITESPACE.match(text, pos + 1).end()
+
+
+def fetch_page(url, params, page, session=session, project=None):
+    """
+    Returns the decoded page and its page count, or None if GitHub refused it.
+    With `project`, each item is passed through it as it is decoded.
+    """
+    params = {**params, "page": page, "per_page": PER_PAGE}
+    response = send_with_retries(
+        lambda: http_cache.get(session, url, params=params),
+        f"Fetching page {page} of {url}",
+    )
+    if response is None:
+        return None
+    # bytes received are counted by http_cache, which knows whether the body came from disk
+    instrumentation.count("pages_fetched")
+    if project is None:
+        return response.json(), get_last_page(response)
+    text = response.content.decode(response.encoding or "utf-8")
+    return [project(item) for item in iter_json_array(text)], get_last_page(response)
+
+
+def get_last_page(response):
+    last = response.links.get("last")
+    if not last:
+        return 1
+    return int(parse_qs(urlparse(last["url"]).query)["page"][0])
+
+
+class IncompleteFetch(Exception):
+    pass
+
+
+def iter_pages(url, params, session=session, workers=FETCH_WORKERS, project=None, first_page=1):
+    """
+    Fetch `first_page`, read the page count from its `Link: rel="last"` header and fetch the rest
+    concurrently. Yields the items of each page in page order. At most two pages per worker are
+    fetched ahead of the consumer, so memory stays bounded however many pages there are.
+    Raises IncompleteFetch if a page failed.
+    """
+    first = fetch_page(url, params, first_page, session, project)
+    if first is None:
+        raise IncompleteFetch(f"page {first_page} of {url}")
+    items, last_page = first
+    yield items
+    # only the last page (or one past it) has no rel="last"
+    if last_page <= first_page:
+        return
+
+    pages = iter(range(first_page + 1, last_page + 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        ahead = deque(pool.submit(fetch_page, url, params, page, session, project) for page in islice(pages, 2 * workers))
+        while ahead:
+            result = ahead.popleft().result()
+            if result is None:
+                for future in ahead:
+                    future.cancel()
+                raise IncompleteFetch(f"a page of {url}")
+            page = next(pages, None)
+            if page is not None:
+                ahead.append(pool.submit(fetch_page, url, params, page, session, project))
+            yield result[0]
+
+
+def fetch_all_pages(url, params, session=session, workers=FETCH_WORKERS, project=None):
+    """
+    Every item of iter_pages in page order, or None if any page failed.
+    """
+    try:
+        return [item for items in iter_pages(url, params, session, workers, project) for item in items]
+    except IncompleteFetch:
+        return None
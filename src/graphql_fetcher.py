@@ -0,0 +1,97 @@
+from src import instrumentation
+from src.fetcher import API_URL, IncompleteFetch, send_with_retries, session
+from src.logger import logger
+from src.projection import project_issue
+
+GRAPHQL_URL = f"{API_URL}/graphql"
+PAGE_SIZE = 100
+
+# Only the fields read by process_task, process_proposal and parse_issue_meta_data.
+# Pull requests are not part of the `issues` connection, so no pull_request marker is needed.
+ISSUES_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $since: DateTime, $pageSize: Int!) {
+  repository(owner: $owner, name: $name) {
+    issues(first: $pageSize, after: $cursor, filterBy: {since: $since},
+           orderBy: {field: UPDATED_AT, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        state
+        url
+        updatedAt
+        author { login }
+        assignees(first: 1) { nodes { login } }
+        labels(first: 20) { nodes { name } }
+        comments { totalCount }
+      }
+    }
+  }
+}
+"""
+
+
+def to_rest_shape(node, owner, name):
+    """
+    Convert a GraphQL issue node to the subset of the REST issue dict the tracker reads.
+    """
+    assignees = node["assignees"]["nodes"]
+    return project_issue({
+        "number": node["number"],
+        "url": f"{API_URL}/repos/{owner}/{name}/issues/{node['number']}",
+        "html_url": node["url"],
+        "title": node["title"],
+        "body": node["body"],
+        "state": node["state"].lower(),
+        "updated_at": node["updatedAt"],
+        "user": {"login": node["author"]["login"] if node["author"] else ""},
+        "assignee": {"login": assignees[0]["login"]} if assignees else None,
+        "labels": [{"name": label["name"]} for label in node["labels"]["nodes"]],
+        "comments": node["comments"]["totalCount"],
+    })
+
+
+def post_query(variables, session=session):
+    """
+    Returns the `issues` connection of one query, or None if GitHub refused it.
+    """
+    response = send_with_retries(
+        lambda: session.post(GRAPHQL_URL, json={"query": ISSUES_QUERY, "variables": variables}),
+        "GraphQL issues query",
+    )
+    if response is None:
+        return None
+    instrumentation.count("pages_fetched")
+    instrumentation.count("bytes_received", len(response.content))
+    payload = response.json()
+    if payload.get("errors"):
+        logger.error(f"GraphQL query failed: {payload['errors']}")
+        return None
+    return payload["data"]["repository"]["issues"]
+
+
+def iter_issue_pages_graphql(owner, name, since=None, session=session):
+    """
+    Cursor-paginated bulk fetch, 100 issues per query, oldest update first. Yields each page in
+    the same dict shape as the REST issues endpoint; raises IncompleteFetch if a query failed.
+    """
+    variables = {"owner": owner, "name": name, "cursor": None, "since": since, "pageSize": PAGE_SIZE}
+    while True:
+        connection = post_query(variables, session)
+        if connection is None:
+            raise IncompleteFetch(f"GraphQL issues of {owner}/{name}")
+        yield [to_rest_shape(node, owner, name) for node in connection["nodes"]]
+        if not connection["pageInfo"]["hasNextPage"]:
+            return
+        variables["cursor"] = connection["pageInfo"]["endCursor"]
+
+
+def fetch_issues_graphql(owner, name, since=None, session=session):
+    """
+    Every issue of iter_issue_pages_graphql, or None if any query failed.
+    """
+    try:
+        return [issue for issues in iter_issue_pages_graphql(owner, name, since, session) for issue in issues]
+    except IncompleteFetch:
+        return None
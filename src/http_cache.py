@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from src import instrumentation
+from src.logger import get_project_root
+
+DEFAULT_CACHE_DIR = os.path.join(get_project_root(), ".cache", "http")
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+class HttpCache:
+    """
+    On-disk cache of GET responses keyed by url + params.
+
+    A cached entry is revalidated with If-None-Match / If-Modified-Since; a 304
+    is answered from disk and does not count against the GitHub rate limit.
+    Entries are evicted least-recently-used once the directory exceeds max_bytes.
+    Shared by every fetch worker: writes and evictions take a lock, and an entry that another
+    worker evicted in the meantime is treated as a miss.
+    Only bodies that came over the network count as bytes received, so a 304 adds none.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def _entry_path(self, url, params):
+        key = json.dumps([url, sorted((params or {}).items())], default=str)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _load(self, path):
+        try:
+            with open(path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, path, response):
+        entry = {
+            "url": response.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "headers": dict(response.headers),
+            "body": response.text,
+        }
+        tmp_path = path + ".tmp"
+        with self.lock:
+            # created on the first write, so constructing the cache touches nothing on disk
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(entry, file)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self.evictions += 1
+
+    def _to_response(self, entry, response):
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.url = entry["url"]
+        cached.headers.update(entry["headers"])
+        # keep the fresh rate-limit headers from the 304
+        cached.headers.update(response.headers)
+        cached.encoding = "utf-8"
+        cached._content = entry["body"].encode("utf-8")
+        return cached
+
+    def get(self, session, url, headers=None, params=None):
+        """
+        session: anything with a requests-style get(), e.g. the requests module or a Session
+        """
+        if not self.enabled:
+            with self.lock:
+                self.misses += 1
+            response = session.get(url, headers=headers, params=params)
+            instrumentation.count("bytes_received", len(response.content))
+            return response
+        path = self._entry_path(url, params)
+        entry = self._load(path)
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = session.get(url, headers=request_headers, params=params)
+        instrumentation.count("bytes_received", len(response.content))
+        if response.status_code == 304 and entry:
+            now = time.time()
+            try:
+                os.utime(path, (now, now))
+            except FileNotFoundError:
+                # evicted since it was loaded; the entry in hand is still valid
+                pass
+            with self.lock:
+                self.hits += 1
+            return self._to_response(entry, response)
+
+        with self.lock:
+            self.misses += 1
+        if response.status_code == 200 and (
+            response.headers.get("ETag") or response.headers.get("Last-Modified")
+        ):
+            self._store(path, response)
+        return response
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,163 @@
+import heapq
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# upper bounds in seconds of the per-item latency histograms
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, float("inf"))
+SLOWEST_KEPT = 10
+METRIC_PREFIX = "tracker"
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_gauges = {}
+_histograms = {}
+_slowest = {}
+_started_at = time.time()
+
+
+def reset():
+    global _started_at
+    with _lock:
+        for registry in (_stages, _counters, _gauges, _histograms, _slowest):
+            registry.clear()
+        _started_at = time.time()
+
+
+def count(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def record_stage(name, seconds):
+    with _lock:
+        calls, total, longest = _stages.get(name, (0, 0.0, 0.0))
+        _stages[name] = (calls + 1, total + seconds, max(longest, seconds))
+
+
+def observe(name, seconds, label=None):
+    """
+    Add one per-item latency to the histogram of `name`; labelled items compete for the slowest list.
+    """
+    with _lock:
+        histogram = _histograms.setdefault(name, {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0})
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][i] += 1
+                break
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+        if label is not None:
+            slowest = _slowest.setdefault(name, [])
+            if len(slowest) < SLOWEST_KEPT:
+                heapq.heappush(slowest, (seconds, str(label)))
+            elif seconds > slowest[0][0]:
+                heapq.heapreplace(slowest, (seconds, str(label)))
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def summary():
+    with _lock:
+        return {
+            "started_at": _started_at,
+            "duration_seconds": time.time() - _started_at,
+            "stages": {
+                name: {"calls": calls, "seconds": total, "max_seconds": longest}
+                for name, (calls, total, longest) in _stages.items()
+            },
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": {
+                name: {
+                    "buckets": dict(zip((str(b) for b in LATENCY_BUCKETS), histogram["buckets"])),
+                    "sum": histogram["sum"],
+                    "count": histogram["count"],
+                }
+                for name, histogram in _histograms.items()
+            },
+            "slowest": {
+                name: [{"label": label, "seconds": seconds} for seconds, label in sorted(items, reverse=True)]
+                for name, items in _slowest.items()
+            },
+        }
+
+
+def metric_name(key):
+    return re.sub(r"[^a-z0-9_]+", "_", key.lower()).strip("_")
+
+
+def labeled_gauges(label, values):
+    """
+    A `by_<label>` gauge, {label value: {metric: number}}, as one gauge per metric labelled
+    with the label value, e.g. tracker_repo_proposals{repo="owner/name"}.
+    """
+    samples = {}
+    for label_value, metrics in values.items():
+        for key, value in metrics.items():
+            if isinstance(value, (int, float)):
+                samples.setdefault(metric_name(key), []).append((label_value, value))
+    lines = []
+    for key, values in samples.items():
+        lines.append(f"# TYPE {METRIC_PREFIX}_{label}_{key} gauge")
+        lines.extend(f'{METRIC_PREFIX}_{label}_{key}{{{label}="{label_value}"}} {value}' for label_value, value in values)
+    return lines
+
+
+def to_prometheus(data):
+    lines = [
+        f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge",
+        f"{METRIC_PREFIX}_run_duration_seconds {data['duration_seconds']}",
+        f"# TYPE {METRIC_PREFIX}_run_started_timestamp_seconds gauge",
+        f"{METRIC_PREFIX}_run_started_timestamp_seconds {data['started_at']}",
+        f"# TYPE {METRIC_PREFIX}_stage_seconds_total counter",
+        f"# TYPE {METRIC_PREFIX}_stage_calls_total counter",
+        f"# TYPE {METRIC_PREFIX}_stage_max_seconds gauge",
+    ]
+    for name, values in data["stages"].items():
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_total{{stage="{name}"}} {values["seconds"]}')
+        lines.append(f'{METRIC_PREFIX}_stage_calls_total{{stage="{name}"}} {values["calls"]}')
+        lines.append(f'{METRIC_PREFIX}_stage_max_seconds{{stage="{name}"}} {values["max_seconds"]}')
+    for name, value in data["counters"].items():
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+        lines.append(f"{METRIC_PREFIX}_{name}_total {value}")
+    for name, value in data["gauges"].items():
+        if isinstance(value, (int, float)):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.append(f"{METRIC_PREFIX}_{name} {value}")
+        elif isinstance(value, dict) and name.startswith("by_"):
+            lines.extend(labeled_gauges(name.removeprefix("by_"), value))
+    lines.append(f"# TYPE {METRIC_PREFIX}_item_seconds histogram")
+    for name, histogram in data["histograms"].items():
+        cumulative = 0
+        for bound, bucket in histogram["buckets"].items():
+            cumulative += bucket
+            le = "+Inf" if bound == "inf" else bound
+            lines.append(f'{METRIC_PREFIX}_item_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{METRIC_PREFIX}_item_seconds_sum{{stage="{name}"}} {histogram["sum"]}')
+        lines.append(f'{METRIC_PREFIX}_item_seconds_count{{stage="{name}"}} {histogram["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def export(json_path, prometheus_path):
+    data = summary()
+    with open(json_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+    with open(prometheus_path, "w", encoding="utf-8") as file:
+        file.write(to_prometheus(data))
+    return data
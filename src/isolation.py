@@ -0,0 +1,88 @@
+"""
+Per-issue fault isolation for the parse stages.
+
+Every issue is parsed under a time budget. An exception or an overrun becomes a ParseFailure
+for the quarantine report, and the rest of the tracker is still built and written.
+"""
+import json
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from src.logger import logger
+
+# seconds one issue may spend in a parse stage; 0 disables the budget
+PARSE_TIME_BUDGET = float(os.getenv("PARSE_TIME_BUDGET", 2.0))
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class ParseFailure:
+    link: str | None
+    title: str
+    stage: str
+    error: str
+    message: str
+    seconds: float
+
+
+@contextmanager
+def time_budget(seconds):
+    """
+    Raise ParseTimeout in the body once `seconds` have passed.
+
+    SIGALRM interrupts the body wherever it is, regex matching included, but only on the
+    main thread of a Unix process (the serial pipeline and the pool workers). Elsewhere the
+    body runs to completion and an overrun is raised afterwards.
+    """
+    if not seconds:
+        yield
+        return
+    if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+        def expire(signum, frame):
+            raise ParseTimeout(f"exceeded the {seconds:g}s parse budget")
+
+        previous = signal.signal(signal.SIGALRM, expire)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    else:
+        start = time.perf_counter()
+        yield
+        if time.perf_counter() - start > seconds:
+            raise ParseTimeout(f"exceeded the {seconds:g}s parse budget")
+
+
+def isolate(stage, link, title, func, *args, budget=None):
+    """
+    Run func(*args) for one issue. Returns (result, None), or (None, ParseFailure) if it
+    raised or ran over the budget (PARSE_TIME_BUDGET unless given).
+    """
+    budget = PARSE_TIME_BUDGET if budget is None else budget
+    start = time.perf_counter()
+    try:
+        with time_budget(budget):
+            return func(*args), None
+    except Exception as e:
+        return None, quarantine(stage, link, title, type(e).__name__, str(e), time.perf_counter() - start)
+
+
+def quarantine(stage, link, title, error, message, seconds=0.0):
+    logger.warning(f"Quarantined {link} ({stage}): {error}: {message}")
+    return ParseFailure(link, title, stage, error, message, round(seconds, 4))
+
+
+def write_quarantine(failures, filepath):
+    """
+    Written on every run, so an empty list means nothing is quarantined.
+    """
+    with open(filepath, "w", encoding="utf-8") as file:
+        json.dump([asdict(failure) for failure in failures], file, indent=2)
@@ -0,0 +1,168 @@
+import json
+import os
+import sqlite3
+from src.logger import get_project_root
+from src.projection import project_issue
+
+DEFAULT_STORE_PATH = os.path.join(get_project_root(), ".cache", "issues.sqlite3")
+
+
+class IssueStore:
+    """
+    Local SQLite snapshot of the GitHub issues, projected to the fields the tracker reads.
+
+    `since` is the high-water mark of the last complete sync (the largest
+    `updated_at` seen), so the next sync only asks GitHub for issues changed after it.
+    While a sync is running, `journal` records its progress after every committed page.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS issues (
+                number INTEGER PRIMARY KEY,
+                updated_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS comment_summaries (
+                number INTEGER PRIMARY KEY,
+                comments INTEGER NOT NULL,
+                summary TEXT NOT NULL
+            );
+            """
+        )
+
+    def upsert_issues(self, issues):
+        self.upsert_pages([issues])
+
+    def upsert_pages(self, pages):
+        """
+        Upsert pages of issues in one transaction, so only the current page is held in memory.
+        If iterating the pages raises, nothing is stored. Returns the number of issues and the
+        largest `updated_at` among them.
+        """
+        count = 0
+        latest = None
+        with self.conn:
+            for issues in pages:
+                self._upsert(issues)
+                count += len(issues)
+                updated = [issue["updated_at"] for issue in issues if issue.get("updated_at")]
+                if updated:
+                    latest = max(updated) if latest is None else max(latest, *updated)
+        return count, latest
+
+    def _upsert(self, issues):
+        # an older copy (a page served again on resume, a late poll) never replaces a newer one
+        self.conn.executemany(
+            "INSERT INTO issues (number, updated_at, data) VALUES (?, ?, ?) "
+            "ON CONFLICT(number) DO UPDATE SET updated_at = excluded.updated_at, data = excluded.data "
+            "WHERE excluded.updated_at >= issues.updated_at",
+            ((issue["number"], issue.get("updated_at", ""), json.dumps(project_issue(issue))) for issue in issues),
+        )
+
+    def delete(self, numbers):
+        """
+        Drop deleted or transferred issues, which a since-based sync never reports.
+        """
+        rows = [(number,) for number in numbers]
+        with self.conn:
+            self.conn.executemany("DELETE FROM issues WHERE number = ?", rows)
+            self.conn.executemany("DELETE FROM comment_summaries WHERE number = ?", rows)
+
+    def commit_page(self, issues, journal):
+        """
+        Upsert one page of a sync and its journal entry in the same transaction.
+        """
+        with self.conn:
+            self._upsert(issues)
+            self._set_state("journal", json.dumps(journal))
+
+    def finish_sync(self, since):
+        """
+        Move the high-water mark and drop the journal of the sync that reached it.
+        """
+        with self.conn:
+            if since:
+                self._set_state("since", since)
+            self.conn.execute("DELETE FROM sync_state WHERE key = 'journal'")
+
+    def get_journal(self):
+        journal = self._get_state("journal")
+        return json.loads(journal) if journal else None
+
+    def get_updated_at(self, number):
+        row = self.conn.execute("SELECT updated_at FROM issues WHERE number = ?", (number,)).fetchone()
+        return row[0] if row else None
+
+    def iter_issues(self, updated_after=None):
+        """
+        Oldest issue first, decoded one row at a time; only those updated after `updated_after`
+        when given. Rows stored before issues were projected at ingest are projected on the way out.
+        """
+        query = "SELECT data FROM issues ORDER BY number ASC"
+        args = ()
+        if updated_after:
+            query = "SELECT data FROM issues WHERE updated_at > ? ORDER BY number ASC"
+            args = (updated_after,)
+        for (data,) in self.conn.execute(query, args):
+            yield project_issue(json.loads(data))
+
+    def load_issues(self):
+        return list(self.iter_issues())
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+
+    def _get_state(self, key):
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        self.conn.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def get_since(self):
+        return self._get_state("since")
+
+    def set_since(self, since):
+        with self.conn:
+            self._set_state("since", since)
+
+    def get_comment_summaries(self, numbers=None):
+        """
+        Issue number -> (comment count when summarized, summary), for the issues in `numbers`
+        when given.
+        """
+        query = "SELECT number, comments, summary FROM comment_summaries"
+        if numbers is None:
+            rows = self.conn.execute(query)
+        else:
+            numbers = list(numbers)
+            rows = []
+            # in chunks, under SQLite's limit on the number of parameters
+            for start in range(0, len(numbers), 500):
+                chunk = numbers[start:start + 500]
+                rows += self.conn.execute(f"{query} WHERE number IN ({', '.join('?' * len(chunk))})", chunk)
+        return {number: (comments, json.loads(summary)) for number, comments, summary in rows}
+
+    def set_comment_summaries(self, rows):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO comment_summaries (number, comments, summary) VALUES (?, ?, ?) "
+                "ON CONFLICT(number) DO UPDATE SET comments = excluded.comments, summary = excluded.summary",
+                [(number, comments, json.dumps(summary)) for number, comments, summary in rows],
+            )
+
+    def close(self):
+        self.conn.close()
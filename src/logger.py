@@ -1,20 +1,133 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
+import sys
 from pathlib import Path
 
 def get_project_root() -> str:
     return str(Path(__file__).parent.parent)
 
-logging.basicConfig(
-    filename=os.path.join(get_project_root(), "app.log"),
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="a",
-    force=True,
-)
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+DEFAULT_LOG_FILE = os.path.join(get_project_root(), "app.log")
 
+# Importing this module does not touch global logging; entry points call configure_logging().
 logger = logging.getLogger("logger")
 
+_listener = None
+# drains the records of worker processes, see worker_logging_args
+_worker_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, for log shippers.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def build_handler(destination, json_lines, max_bytes, backup_count):
+    if destination == "-":
+        handler = logging.StreamHandler(sys.stderr)
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            destination, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+    handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def configure_logging(level=None, destination=None, json_lines=None, max_bytes=None, backup_count=None):
+    """
+    Route the tracker logger through a QueueHandler; a QueueListener thread does the formatting
+    and the (rotating) file writes off the hot path.
+    Defaults come from LOG_LEVEL, LOG_FILE ("-" for stderr), LOG_FORMAT (text|json),
+    LOG_MAX_BYTES and LOG_BACKUP_COUNT.
+    """
+    global _listener
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    destination = destination or os.getenv("LOG_FILE", DEFAULT_LOG_FILE)
+    if json_lines is None:
+        json_lines = os.getenv("LOG_FORMAT", "text") == "json"
+    max_bytes = max_bytes if max_bytes is not None else int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    backup_count = backup_count if backup_count is not None else int(os.getenv("LOG_BACKUP_COUNT", 3))
+
+    shutdown_logging()
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, build_handler(destination, json_lines, max_bytes, backup_count)
+    )
+    _listener.start()
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    return logger
+
+
+def worker_logging_args():
+    """
+    initargs of configure_worker_logging for a process pool. A worker cannot reach the queue of
+    the listener thread, so its records go through a multiprocessing queue, drained into the same
+    handler by a second listener. Before configure_logging, workers keep their default logging.
+    """
+    global _worker_listener
+    if _listener is None:
+        return None, None
+    if _worker_listener is None:
+        _worker_listener = logging.handlers.QueueListener(multiprocessing.Queue(), *_listener.handlers)
+        _worker_listener.start()
+    return _worker_listener.queue, logger.level
+
+
+def configure_worker_logging(log_queue, level):
+    """
+    Process pool initializer: route the tracker logger of a worker to `log_queue`.
+    """
+    global _listener, _worker_listener
+    if log_queue is None:
+        return
+    # copies of the parent's listeners; their threads do not run in this process
+    _listener = _worker_listener = None
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the listener threads.
+    """
+    global _listener, _worker_listener
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_listener = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
 
 def get_logger():
-    return logger
\ No newline at end of file
+    return logger
@@ -1,58 +1,242 @@
-import requests
 import os
-import time
-from time import sleep
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from src.parser import (
+    PARSER_VERSION,
+    parse_issue_link_from_body,
     parse_issue_meta_data,
-    parse_milestone,
+    parse_effort,
     parse_project_complexity,
-    parse_dates_and_format,
     parse_pricing,
+    price_proposal,
+    repo_from_link,
+    scan_proposal,
+    tracked_repos,
 )
-from src.csv_writer import write_to_csv
-from src.logger import logger
+from src import instrumentation
+from src.comments import apply_summary, fetch_comment_summaries, summarize_comments
+from src.csv_writer import update_csv
+from src.decorator import instrumented
+from src.fetcher import API_URL, FETCH_WORKERS, IncompleteFetch, http_cache, iter_pages, rate_limiter, session
+from src.graphql_fetcher import iter_issue_pages_graphql
+from src.isolation import isolate, quarantine, write_quarantine
+from src.issue_store import IssueStore, DEFAULT_STORE_PATH
+from src.logger import configure_worker_logging, logger, worker_logging_args
+from src.models import Milestone, Proposal, Task
+from src.projection import project_issue
+from src.parse_cache import ParseCache, DEFAULT_CACHE_PATH as DEFAULT_PARSE_CACHE_PATH, DEFAULT_MAX_ENTRIES
+from src.query import DEFAULT_INDEX_PATH, build_index
 
-GH_PERSONAL_ACCESS_TOKEN = os.getenv("GH_PERSONAL_ACCESS_TOKEN")
+# "rest" or "graphql"
+fetch_backend = os.getenv("FETCH_BACKEND", "rest")
+output_csv_path = "issues.csv"
+output_changelog_path = "issues_changes.jsonl"
+output_parquet_path = "issues.parquet"
+output_breakdowns_path = "tracker_metrics.json"
+output_timeline_path = "timeline.csv"
+output_timeline_summary_path = "timeline_summary.json"
+output_milestones_parquet_path = "milestones.parquet"
+output_quarantine_path = "quarantine.json"
+run_metrics_json_path = "run_metrics.json"
+run_metrics_prometheus_path = "run_metrics.prom"
+issue_store_path = os.getenv("ISSUE_STORE_PATH", DEFAULT_STORE_PATH)
+tracker_index_path = os.getenv("TRACKER_INDEX_PATH", DEFAULT_INDEX_PATH)
 
-headers = {
-    "Authorization": GH_PERSONAL_ACCESS_TOKEN,
-    "Accept": "application/vnd.github.v3+json",
-}
+# every repository is synced at once, over the fetcher's connection pool and the shared rate limiter
+fetch_session = session
+# a sync's start is read from this machine's clock; the high-water mark is set back by this much
+# more, in case the clock runs ahead of GitHub's
+CLOCK_SKEW = timedelta(minutes=5)
+# set to stop running syncs after their current page
+sync_stop = threading.Event()
 
-repo_url = "https://api.github.com/repos/privacy-scaling-explorations/acceleration-program/issues"
-output_csv_path = "issues.csv"
+# 0 or 1 parses in this process; more spreads parsing over a process pool
+parse_workers = int(os.getenv("PARSE_WORKERS", 0))
+PARSE_CHUNK_SIZE = 16
 
-def get_issues():
-    issues = []
-    url = repo_url
-    for status in ["open", "closed"]:
-        page = 1
-        while True:
-            params = {
-                "page": page,
-                "per_page": 50,  # Reduce the per_page value
-                "state": status,
-            }
-            response = requests.get(url, headers=headers, params=params)
-            if response.status_code == 200:
-                issues.extend(response.json())
-                if len(response.json()) == 50:
-                    page += 1
-                else:
-                    break
-            elif response.status_code == 403 and "rate limit" in response.text.lower():
-                # Rate limit exceeded, wait for the reset time
-                reset_time = int(response.headers["X-RateLimit-Reset"])
-                now = time.time()
-                wait_time = reset_time - now + 10  # Add 10 seconds buffer
-                logger.warn(f"Rate limit exceeded, waiting for {wait_time} seconds...")
-                sleep(wait_time)
-            else:
-                break
+# opened on first use by get_parse_cache, so importing this module leaves the cache alone
+parse_cache = None
+parse_cache_lock = threading.Lock()
+
+def get_parse_cache():
+    global parse_cache
+    with parse_cache_lock:
+        if parse_cache is None:
+            parse_cache = ParseCache(
+                os.getenv("PARSE_CACHE_PATH", DEFAULT_PARSE_CACHE_PATH),
+                int(os.getenv("PARSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            )
+        return parse_cache
+
+def repo_url(repo):
+    return f"{API_URL}/repos/{repo}/issues"
+
+def store_path(repo):
+    """
+    Each repository has its own snapshot; the first one keeps ISSUE_STORE_PATH itself.
+    """
+    if repo == tracked_repos[0]:
+        return issue_store_path
+    root, ext = os.path.splitext(issue_store_path)
+    return f"{root}.{repo.replace('/', '.')}{ext}"
+
+def repo_workers():
+    """
+    Issue pages fetched at once per repository; the repositories sync together and share FETCH_WORKERS.
+    """
+    return max(1, FETCH_WORKERS // len(tracked_repos))
+
+def issue_pages(repo, journal):
+    """
+    Pages of the issues of repo updated at or after the journal's `since`, from where it left off.
+
+    REST pages are offsets into the list in creation order, which an edit does not change, so
+    they are fetched concurrently and a resumed sync skips the pages it committed. GraphQL pages
+    come oldest update first behind a cursor, so a resumed sync asks for the issues updated
+    since its cursor.
+    """
+    if fetch_backend == "graphql":
+        owner, name = repo.split("/")
+        return iter_issue_pages_graphql(owner, name, journal["cursor"], fetch_session)
+    params = {
+        "state": "all",
+        "sort": "created",
+        "direction": "asc",
+    }
+    if journal["since"]:
+        params["since"] = journal["since"]
+    return iter_pages(repo_url(repo), params, fetch_session, repo_workers(), project_issue, journal["pages"] + 1)
+
+def sync_start():
+    return (datetime.now(timezone.utc) - CLOCK_SKEW).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def resume_point(store, since):
+    """
+    The journal of an interrupted sync from the same high-water mark and backend, provided the
+    last issue it committed is still stored as it was. Otherwise None, and the sync starts over.
+    """
+    journal = store.get_journal()
+    if journal is None:
+        return None
+    if journal["since"] != since or journal["backend"] != fetch_backend or "started" not in journal:
+        logger.warning(f"Discarding the journal of a sync since {journal['since']} over {journal['backend']}")
+        return None
+    if journal["last"] is not None and store.get_updated_at(journal["last"]) != journal["cursor"]:
+        logger.warning(f"Issue {journal['last']} changed after the interrupted sync, starting it over")
+        return None
+    return journal
+
+@instrumented("fetch")
+def sync_issues(store, repo):
+    """
+    Fetch every issue of repo changed since the last complete sync and upsert it into the store.
+    Each page is committed together with a journal entry holding the pages committed so far and
+    the sync's cursor, the latest `updated_at` among them, so a sync that stops part-way resumes
+    after its last committed page (see issue_pages).
+
+    An issue edited while the sync runs may have been stored as it was before the edit, so the
+    high-water mark is capped at the time the sync started: the next sync fetches those issues again.
+
+    Returns the number of issues received, or None if a page failed; the committed pages are kept
+    and the high-water mark moves only once the sync completes.
+    """
+    since = store.get_since()
+    journal = resume_point(store, since) or {
+        "since": since, "backend": fetch_backend, "started": sync_start(), "cursor": since, "last": None,
+        "pages": 0, "count": 0,
+    }
+    if journal["pages"]:
+        logger.info(f"Resuming sync of {repo} since {since} after {journal['pages']} pages")
+    try:
+        for issues in issue_pages(repo, journal):
+            if sync_stop.is_set():
+                raise IncompleteFetch("sync interrupted")
+            latest = max(issues, key=lambda issue: issue.get("updated_at") or "", default=None)
+            if latest and latest.get("updated_at") and (journal["cursor"] is None or latest["updated_at"] > journal["cursor"]):
+                journal["cursor"] = latest["updated_at"]
+                journal["last"] = latest["number"]
+            journal["pages"] += 1
+            journal["count"] += len(issues)
+            store.commit_page(issues, journal)
+    except IncompleteFetch:
+        logger.error(
+            f"Sync of {repo} since {since} incomplete after {journal['pages']} pages, "
+            f"the next sync resumes after them"
+        )
+        return None
+
+    store.finish_sync(journal["cursor"] and min(journal["cursor"], journal["started"]))
+    logger.info(
+        f"Synced {journal['count']} changed issues of {repo} since {since}; "
+        f"HTTP cache: {http_cache.stats()}; rate limiter: {rate_limiter.stats()}"
+    )
+    return journal["count"]
+
+def sync_repo(repo):
+    store = IssueStore(store_path(repo))
+    try:
+        return sync_issues(store, repo)
+    finally:
+        store.close()
+
+def sync_all(repos):
+    """
+    Sync every repository concurrently, so the wall time is that of the slowest one.
+    Returns the repositories whose sync was incomplete.
+    """
+    sync_stop.clear()
+    rate_limiter.resume()
+    with ThreadPoolExecutor(max_workers=len(repos)) as pool:
+        try:
+            synced = list(pool.map(sync_repo, repos))
+        except KeyboardInterrupt:
+            # let every sync commit the page it has, wake the workers waiting on the rate limit
+            # and abandon the pages they were waiting to fetch
+            sync_stop.set()
+            rate_limiter.interrupt()
+            raise
+    return [repo for repo, count in zip(repos, synced) if count is None]
+
+class IncompleteSync(Exception):
+    pass
+
+def has_snapshot(repo):
+    store = IssueStore(store_path(repo))
+    try:
+        return store.get_since() is not None
+    finally:
+        store.close()
 
-    # Reverse the list to get the oldest issue first, so that proposal can always link to the task. Otherwise, the task might not be created yet.    
-    return issues[::-1]
+def iter_issues(offline=False):
+    """
+    Stream issues out of the local stores, one repository after the other, oldest first.
+    Unless offline, the stores are brought up to date first. Raises IncompleteSync if a
+    repository that never completed a sync failed to complete this one, so a partial backfill
+    is never published as the tracker.
+    """
+    if not offline:
+        incomplete = sync_all(tracked_repos)
+        partial = [repo for repo in incomplete if not has_snapshot(repo)]
+        if partial:
+            raise IncompleteSync(
+                f"First sync of {', '.join(partial)} incomplete: nothing was written, "
+                "the next run resumes after the pages synced so far"
+            )
+        if incomplete:
+            print(f"Sync incomplete for {', '.join(incomplete)}: the tracker uses the last complete snapshot "
+                  "and the pages synced since, and the next run resumes after them")
+    for repo in tracked_repos:
+        store = IssueStore(store_path(repo))
+        try:
+            yield from store.iter_issues()
+        finally:
+            store.close()
 
+def get_issues(offline=False):
+    return list(iter_issues(offline))
+
+@instrumented("task_parse", per_item=True, label_arg=0)
 def process_task(title, issue):
     body = issue.get("body", "")
     issue_link = issue.get("html_url")
@@ -64,7 +248,7 @@ def process_task(title, issue):
 
     project_complexity = parse_project_complexity(body)
     task_type = "Closed Task" if state == "closed" else "Task"
-    logger.debug(f"{title}; {task_type}; {state}")
+    logger.debug("%s; %s; %s", title, task_type, state)
     if "wip" in labels:
         task_type = "Closed WIP" if state == "closed" else "WIP"
     elif "self proposed open task" in labels:
@@ -79,57 +263,250 @@ def process_task(title, issue):
     # Pricing Per Hours
     pricing_per_hours = parse_pricing(project_complexity)
 
-    return {
-        "type": task_type,
-        "title": title,
-        "creator": creator,
-        "assignee": assignee,
-        "proposals": [],
-        "project_complexity": project_complexity,
-        "Pricing Per Hours": pricing_per_hours,
-        "task_link": issue_link,
-    }
+    return Task(
+        task_link=issue_link,
+        title=title,
+        type=task_type,
+        creator=creator,
+        assignee=assignee,
+        project_complexity=project_complexity,
+        pricing_per_hours=pricing_per_hours,
+        repo=repo_from_link(issue_link),
+    )
 
-def process_proposal(title, issue, tasks):
-    logger.debug(f"Processing proposal: {title}, {issue.get('html_url')}")
+def proposal_meta(title, issue, tasks):
+    """
+    Everything about a proposal except its body parse; returns the proposal and its body.
+    """
     body, issue_link, assignee, creator, linked_tasks, project_complexity = parse_issue_meta_data(title, issue, tasks)
-    working_hour_data = parse_milestone(body, title, project_complexity)
-    start_end_date = parse_dates_and_format(body)
-    
+    proposal = Proposal(
+        link=issue_link,
+        creator=creator,
+        assignee=assignee,
+        linked_task=linked_tasks,
+        project_complexity=project_complexity,
+        repo=repo_from_link(issue_link),
+        number=issue.get("number"),
+        comment_count=issue.get("comments", 0),
+    )
+    return proposal, body
+
+@instrumented("proposal_parse", per_item=True, label_arg=0)
+def process_proposal(title, issue, tasks):
+    logger.debug("Processing proposal: %s, %s", title, issue.get("html_url"))
+    proposal, body = proposal_meta(title, issue, tasks)
+    proposal.update(parse_proposal_body(issue.get("number"), title, body, proposal.project_complexity))
+    return proposal
+
+def proposal_cache_key(number, body):
+    return ParseCache.key(number, PARSER_VERSION, body)
+
+def parse_proposal_fields(title, body):
+    return parse_effort(body, title, scan_proposal(body))
+
+def dump_parsed(parsed):
+    return {**parsed, "milestones": [milestone.to_dict() for milestone in parsed["milestones"]]}
+
+def load_parsed(data):
+    return {**data, "milestones": [Milestone.from_dict(milestone) for milestone in data["milestones"]]}
+
+def parse_proposal_body(number, title, body, project_complexity):
+    """
+    Milestone costs and dates of a proposal. The parse is memoized on disk by issue number, parser
+    version and body; pricing is applied afterwards, so a rate change does not re-parse.
+    """
+    key = proposal_cache_key(number, body)
+    cached = get_parse_cache().get(key)
+    if cached is not None:
+        return price_proposal(load_parsed(cached), project_complexity)
+    parsed = parse_proposal_fields(title, body)
+    get_parse_cache().put(key, dump_parsed(parsed))
+    return price_proposal(parsed, project_complexity)
+
+def is_proposal(title):
+    return title.lower().startswith(("proposal: ", "proposal "))
+
+def task_event(title, issue):
+    task, failure = isolate("task", issue.get("html_url"), title, process_task, title, issue)
+    return ("failure", failure) if failure else ("task", task)
+
+def proposal_event(title, issue, tasks):
+    proposal, failure = isolate("proposal", issue.get("html_url"), title, process_proposal, title, issue, tasks)
+    return ("failure", failure) if failure else ("proposal", proposal)
+
+def unresolved(title, issue):
+    return quarantine("link", issue.get("html_url"), title, "ValueError", f"Error: {title} linked task not found.")
+
+def stream_issues(issues):
+    """
+    Single pass over issues in any order.
+    Yields ("task", task) as soon as a task is seen and ("proposal", proposal) once its linked task is known.
+    Proposals that arrive before their task wait in a buffer keyed by task link.
+    An issue that fails to parse, or whose task never shows up, is yielded as ("failure", ParseFailure).
+    """
+    tasks = {}
+    pending = {}
+    for issue in issues:
+        title = issue.get("title", "").strip()
+        if "pull_request" in issue:
+            continue
+
+        if is_proposal(title):
+            linked_task, failure = isolate(
+                "link", issue.get("html_url"), title, parse_issue_link_from_body, issue.get("body", ""), title
+            )
+            if failure:
+                yield "failure", failure
+            elif linked_task in tasks:
+                yield proposal_event(title, issue, tasks)
+            else:
+                pending.setdefault(linked_task, []).append((title, issue))
+        else:
+            kind, task = task_event(title, issue)
+            yield kind, task
+            if kind == "failure":
+                continue
+            tasks[task.task_link] = task
+            for title, issue in pending.pop(task.task_link, []):
+                yield proposal_event(title, issue, tasks)
+
+    for waiting in pending.values():
+        for title, issue in waiting:
+            yield "failure", unresolved(title, issue)
+
+def process_task_job(job):
+    return task_event(*job)
+
+def parse_proposal_job(job):
+    link, title, body = job
+    return isolate("proposal", link, title, parse_proposal_fields, title, body)
+
+def parallel_events(issues, workers):
+    """
+    Opt-in alternative to stream_issues for large backfills: task and proposal parsing is spread
+    over a process pool in chunks. Parse cache lookups, pricing and the task index stay in this
+    process; workers only get (title, body) of the cache misses. Tasks, proposals and failures
+    come out in the same order as stream_issues, except that failures of proposals waiting for a
+    task are not held back to the end.
+    """
+    task_jobs = []
+    proposal_jobs = []
+    for issue in issues:
+        title = issue.get("title", "").strip()
+        if "pull_request" in issue:
+            continue
+        if is_proposal(title):
+            proposal_jobs.append((title, issue))
+        else:
+            task_jobs.append((title, issue))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=configure_worker_logging,
+                             initargs=worker_logging_args()) as pool:
+        tasks = {}
+        for kind, task in pool.map(process_task_job, task_jobs, chunksize=PARSE_CHUNK_SIZE):
+            if kind == "task":
+                tasks[task.task_link] = task
+            yield kind, task
+
+        proposals = []
+        misses = []
+        cache = get_parse_cache()
+        for title, issue in proposal_jobs:
+            link = issue.get("html_url")
+            meta, failure = isolate("link", link, title, proposal_meta, title, issue, tasks)
+            if failure:
+                yield "failure", failure
+                continue
+            proposal, body = meta
+            key = proposal_cache_key(issue.get("number"), body)
+            cached = cache.get(key)
+            if cached is None:
+                misses.append((link, title, body))
+            proposals.append((proposal, key, cached))
+
+        results = pool.map(parse_proposal_job, misses, chunksize=PARSE_CHUNK_SIZE)
+        for proposal, key, cached in proposals:
+            if cached is None:
+                parsed, failure = next(results)
+                if failure:
+                    yield "failure", failure
+                    continue
+                cache.put(key, dump_parsed(parsed))
+            else:
+                parsed = load_parsed(cached)
+            proposal.update(price_proposal(parsed, proposal.project_complexity))
+            yield "proposal", proposal
+
+def new_metrics():
     return {
-        "creator": creator,
-        "assignee": assignee,
-        "link": issue_link,
-        "project_complexity": project_complexity,
-        "linked_tasks": linked_tasks,
-        "start_end_date": start_end_date,
-        **working_hour_data,
+        "WIP Tasks": 0,
+        "Tasks Looking for Reviewer": 0,
+        "Available Tasks": 0,
+        "Proposals": 0,
+        "Total Tasks": 0,
     }
 
+@instrumented("metrics")
+def update_metrics(metrics, tasks, kind, item):
+    """
+    Apply one stream event; must be called before the event is added to tasks.
+    """
+    if kind == "task":
+        metrics["Total Tasks"] += 1
+        if item.type == "WIP":
+            metrics["WIP Tasks"] += 1
+        else:
+            metrics["Available Tasks"] += 1
+        if not item.assignee:
+            metrics["Tasks Looking for Reviewer"] += 1
+    else:
+        task = tasks[item.linked_task]
+        if task.type != "WIP" and not task.proposals:
+            metrics["Available Tasks"] -= 1
+        metrics["Proposals"] += 1
+
+def consume_events(events, failures=None):
+    """
+    Fold the event stream into the tracker (task link -> task with its proposals) and its metrics.
+    Failures are appended to `failures` when given.
+    """
+    tasks = {}
+    metrics = new_metrics()
+    for kind, item in events:
+        if kind == "failure":
+            instrumentation.count("quarantined")
+            if failures is not None:
+                failures.append(item)
+            continue
+        update_metrics(metrics, tasks, kind, item)
+        if kind == "task":
+            tasks[item.task_link] = item
+        else:
+            tasks[item.linked_task].proposals.append(item)
+    return tasks, metrics
+
 def preprocess_issues(issues):
     """ 
-    get task and proposal separately
+    get task and proposal in a single pass
     """
     
     logger.info('preprocess_issue')
-    tasks = process_tasks(issues)
-    tasks = process_proposals(issues, tasks)
+    tasks, _ = consume_events(stream_issues(issues))
     
     return tasks
 
 def process_proposals(issues, tasks):
     """  
-    dependent: rely on the task to be created first
-    TODO: refactor to decouple the task creation and proposal creation
+    dependent: rely on the task to be created first, see stream_issues for the order-independent pipeline
     """
     for issue in issues:
         title = issue.get("title", "").strip()
         if "pull_request" in issue:
             continue
 
-        if title.lower().startswith(("proposal: ", "proposal ")):
+        if is_proposal(title):
             proposal = process_proposal(title, issue, tasks)
-            tasks[proposal["linked_tasks"]]["proposals"].append(proposal)
+            tasks[proposal.linked_task].proposals.append(proposal)
     return tasks
 
 def process_tasks(issues):
@@ -138,46 +515,160 @@ def process_tasks(issues):
         title = issue.get("title", "").strip()
         if "pull_request" in issue:
             continue
-        if title.lower().startswith(("proposal: ", "proposal ")):
+        if is_proposal(title):
             continue
         task = process_task(title, issue)
-        tasks[task["task_link"]] = task
-        tasks[task["task_link"]]["proposals"] = []
+        tasks[task.task_link] = task
     return tasks
 
 
+@instrumented("metrics")
 def generate_metrics(tasks):
-    metrics = {
-        "WIP Tasks": 0,
-        "Tasks Looking for Reviewer": 0,
-        "Available Tasks": 0,
-        "Proposals": 0,
-        "Total Tasks": 0,
-    }
+    metrics = new_metrics()
 
-    for task_link, task_info in tasks.items():
+    for task in tasks.values():
         metrics["Total Tasks"] += 1
 
-        if task_info["type"] == "WIP":
+        if task.type == "WIP":
             metrics["WIP Tasks"] += 1
-        elif not task_info["proposals"]:
+        elif not task.proposals:
             metrics["Available Tasks"] += 1
 
-        if not task_info["assignee"]:
+        if not task.assignee:
             metrics["Tasks Looking for Reviewer"] += 1
 
-        metrics["Proposals"] += len(task_info["proposals"])
+        metrics["Proposals"] += len(task.proposals)
 
     return metrics
 
+@instrumented("enrich")
+def enrich_proposals(tasks, offline=False):
+    """
+    Fill the comment-derived fields of every proposal from the summaries stored with each
+    repository's snapshot; only those of the proposals in `tasks` are read. Unless offline, comments are fetched for the proposals whose
+    comment count changed since their summary, all repositories in one bounded fan-out.
+    """
+    by_repo = {}
+    for task in tasks.values():
+        for proposal in task.proposals:
+            by_repo.setdefault(proposal.repo, []).append(proposal)
+
+    known = {}
+    stale = []
+    for repo, proposals in by_repo.items():
+        store = IssueStore(store_path(repo))
+        try:
+            known[repo] = store.get_comment_summaries(p.number for p in proposals)
+        finally:
+            store.close()
+        stale += [
+            (repo, p.number, p.creator) for p in proposals
+            if p.comment_count and known[repo].get(p.number, (None,))[0] != p.comment_count
+        ]
+    fetched = {} if offline else fetch_comment_summaries(stale, fetch_session, tracked_repos)
+    instrumentation.count("comment_fetches", len(fetched))
+
+    empty = summarize_comments([], None)
+    for repo, proposals in by_repo.items():
+        updates = []
+        for proposal in proposals:
+            if not proposal.comment_count:
+                summary = empty
+            elif (repo, proposal.number) in fetched:
+                summary = fetched[(repo, proposal.number)]
+                updates.append((proposal.number, proposal.comment_count, summary))
+            elif proposal.number in known[repo]:
+                summary = known[repo][proposal.number][1]
+            else:
+                continue
+            apply_summary(proposal, summary)
+        if updates:
+            store = IssueStore(store_path(repo))
+            try:
+                store.set_comment_summaries(updates)
+            finally:
+                store.close()
+    return len(fetched)
+
+def metrics_by_repo(tasks):
+    """
+    generate_metrics per repository; proposals count towards the repository of their task.
+    """
+    by_repo = {}
+    for link, task in tasks.items():
+        by_repo.setdefault(task.repo, {})[link] = task
+    return {repo: generate_metrics(repo_tasks) for repo, repo_tasks in by_repo.items()}
 
-def run():
-    issues = get_issues()
-    tasks = preprocess_issues(issues)
-    write_to_csv(tasks, output_csv_path)
-    print(f"Data written to {output_csv_path}")
 
-    metrics = generate_metrics(tasks)
+def write_columnar_outputs(tasks):
+    """
+    Typed table, vectorized breakdowns, the milestone timeline and Parquet next to the CSV;
+    skipped without pandas.
+    """
+    try:
+        from src.table import build_table, table_metrics, write_breakdowns, write_parquet
+        from src import timeline
+    except ImportError:
+        logger.warning("pandas is not installed, skipping the columnar table")
+        return None
+    frame = build_table(tasks)
+    metrics, breakdowns = table_metrics(frame)
+    write_breakdowns(metrics, breakdowns, output_breakdowns_path)
+    print(f"Breakdowns written to {output_breakdowns_path}")
+
+    milestones = timeline.milestone_frame(tasks)
+    weekly = timeline.weekly_timeline(milestones)
+    timeline.write_timeline(weekly, output_timeline_path)
+    timeline.write_summary(timeline.timeline_summary(milestones, weekly), output_timeline_summary_path)
+    print(f"Timeline written to {output_timeline_path} and {output_timeline_summary_path}")
+    try:
+        write_parquet(frame, output_parquet_path)
+        write_parquet(milestones, output_milestones_parquet_path)
+        print(f"Tables written to {output_parquet_path} and {output_milestones_parquet_path}")
+    except ImportError as e:
+        logger.warning("Parquet export needs pyarrow: %s", e)
+    return frame
+
+def export_run_metrics(metrics):
+    for key, value in metrics.items():
+        # exported as tracker_<key>, the prefix is added by instrumentation
+        instrumentation.set_gauge(instrumentation.metric_name(key), value)
+    for name, stats in (("http_cache", http_cache.stats()), ("parse_cache", get_parse_cache().stats()),
+                        ("rate_limiter", rate_limiter.stats())):
+        for key, value in stats.items():
+            instrumentation.set_gauge(f"{name}_{key}", value)
+    instrumentation.export(run_metrics_json_path, run_metrics_prometheus_path)
+
+def run(offline=False, workers=parse_workers):
+    instrumentation.reset()
+    issues = iter_issues(offline)
+    events = parallel_events(issues, workers) if workers > 1 else stream_issues(issues)
+    failures = []
+    tasks, metrics = consume_events(events, failures)
+    write_quarantine(failures, output_quarantine_path)
+    if failures:
+        print(f"{len(failures)} issues could not be parsed, see {output_quarantine_path}")
+    enrich_proposals(tasks, offline)
+    get_parse_cache().flush()
+    logger.info(f"Parse cache: {get_parse_cache().stats()}")
+    changes = update_csv(tasks, output_csv_path, output_changelog_path)
+    print(
+        f"Data written to {output_csv_path}: {len(changes['added'])} rows added, "
+        f"{len(changes['changed'])} changed, {len(changes['removed'])} removed"
+    )
+    write_columnar_outputs(tasks)
+    # titles and bodies are read back from the stores, which this run already brought up to date
+    build_index(tasks, iter_issues(offline=True), tracker_index_path)
+    print(f"Query index written to {tracker_index_path} (python -m src.query)")
+
     print("Metrics:")
     for key, value in metrics.items():
         print(f"{key}: {value}")
+    if len(tracked_repos) > 1:
+        repo_metrics = metrics_by_repo(tasks)
+        for repo, values in repo_metrics.items():
+            print(f"{repo}: " + ", ".join(f"{key}: {value}" for key, value in values.items()))
+        instrumentation.set_gauge("by_repo", repo_metrics)
+
+    export_run_metrics(metrics)
+    print(f"Run metrics written to {run_metrics_json_path} and {run_metrics_prometheus_path}")
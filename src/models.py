@@ -0,0 +1,89 @@
+"""
+Typed records for the tracker: a task, the proposals linked to it and their milestones.
+
+Missing or unparseable values are None instead of the "error" / "NONE" strings of the CSV;
+csv_writer renders them.
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class Milestone:
+    number: int
+    duration: int | float | None = None
+    unit: str | None = None
+    fte: int | float | None = None
+    hours: float | None = None
+    rate: float | None = None
+    cost: float | None = None
+    start_date: datetime | None = None
+    end_date: datetime | None = None
+
+    def to_dict(self):
+        data = asdict(self)
+        for name in ("start_date", "end_date"):
+            if data[name] is not None:
+                data[name] = data[name].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        for name in ("start_date", "end_date"):
+            if data[name] is not None:
+                data[name] = datetime.fromisoformat(data[name])
+        return cls(**data)
+
+
+@dataclass(slots=True)
+class Proposal:
+    link: str
+    creator: str
+    assignee: str
+    linked_task: str
+    project_complexity: str | None
+    repo: str | None = None
+    total_duration: int | None = None
+    total_duration_unit: str | None = None
+    total_fte: int | float | None = None
+    total_working_hours: float | None = None
+    total_cost: float = 0
+    milestones: list[Milestone] = field(default_factory=list)
+    number: int | None = None
+    comment_count: int = 0
+    # from the issue comments; None until summarized
+    deliverable_repos: list[str] | None = None
+    last_reviewer: str | None = None
+    last_reviewed_at: datetime | None = None
+
+    def update(self, fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+
+@dataclass(slots=True)
+class Task:
+    task_link: str
+    title: str
+    type: str
+    creator: str
+    assignee: str
+    project_complexity: str | None
+    pricing_per_hours: int | float | None
+    repo: str | None = None
+    proposals: list[Proposal] = field(default_factory=list)
+
+
+def to_number(text):
+    """
+    "2" -> 2, "2.5" -> 2.5; None when the text is not a number.
+    """
+    if text is None:
+        return None
+    if text.isdigit():
+        return int(text)
+    try:
+        return float(text)
+    except ValueError:
+        return None
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from src.logger import get_project_root
+
+DEFAULT_CACHE_PATH = os.path.join(get_project_root(), ".cache", "parse.sqlite3")
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class ParseCache:
+    """
+    On-disk memo of structured parse results.
+
+    The key folds in the issue number, the parser version and a hash of the inputs the
+    result depends on. Proposals are cached by body alone: rates and complexity are applied
+    after the lookup, so only an edited body or a parser change misses. The least recently
+    used entries beyond max_entries are evicted on flush.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parse_results (
+                key TEXT PRIMARY KEY,
+                last_used REAL NOT NULL,
+                result TEXT NOT NULL
+            )
+            """
+        )
+
+    @staticmethod
+    def key(number, version, *inputs):
+        digest = hashlib.sha256(json.dumps(inputs, default=str).encode()).hexdigest()
+        return f"{number}:{version}:{digest}"
+
+    def get(self, key):
+        row = self.conn.execute("SELECT result FROM parse_results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE parse_results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO parse_results (key, last_used, result) VALUES (?, ?, ?)",
+            (key, time.time(), json.dumps(result)),
+        )
+
+    def flush(self):
+        """
+        Evict down to max_entries and commit; writes are batched until here.
+        """
+        self.conn.execute(
+            "DELETE FROM parse_results WHERE key NOT IN "
+            "(SELECT key FROM parse_results ORDER BY last_used DESC, rowid DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self.conn.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
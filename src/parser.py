@@ -1,25 +1,51 @@
 import re
 import os
+from bisect import bisect_left
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from src.decorator import instrumented
 from src.logger import logger
+from src.models import Milestone, to_number
 
 load_dotenv()
 
+# Bump whenever parsing output changes, so cached parse results are invalidated.
+PARSER_VERSION = 5
+
 easy_cost = os.getenv("EASY")
 medium_cost = os.getenv("MEDIUM")
 hard_cost = os.getenv("HARD")
 
+DEFAULT_REPOS = "privacy-scaling-explorations/acceleration-program"
+# "owner/name" of every tracked repository; a proposal may link a task in any of them
+tracked_repos = [repo.strip() for repo in os.getenv("TRACKED_REPOS", DEFAULT_REPOS).split(",") if repo.strip()]
+
+
+def issue_link_pattern(repos):
+    return re.compile(
+        r"https://github\.com/(?:" + "|".join(re.escape(repo) for repo in repos) + r")/issues/\d+"
+    )
+
+
+ISSUE_LINK_PATTERN = issue_link_pattern(tracked_repos)
+REPO_FROM_LINK_PATTERN = re.compile(r"https://github\.com/([^/]+/[^/]+)/")
+
+
+def repo_from_link(link):
+    """
+    "owner/name" of an issue html_url.
+    """
+    match = REPO_FROM_LINK_PATTERN.match(link or "")
+    return match.group(1) if match else None
+
+
 def parse_issue_link_from_body(body, issue_title):
     """  
     A parser for proposal
     """
 
     # Adjust the regex if the link format in the body varies
-    links = re.findall(
-        r"https://github\.com/privacy-scaling-explorations/acceleration-program/issues/\d+",
-        body,
-    )
+    links = ISSUE_LINK_PATTERN.findall(body)
     if len(links) == 1:
         links = links[0]
     else:
@@ -36,102 +62,185 @@ def parse_issue_meta_data(title, issue, tasks):
     creator = issue.get("user", {}).get("login", "")
     linked_tasks = parse_issue_link_from_body(body, title)
     try:
-        project_complexity = tasks[linked_tasks]["project_complexity"]
+        project_complexity = tasks[linked_tasks].project_complexity
     except KeyError:
         raise ValueError(f"Error: {title} linked task not found.")
     return body,issue_link,assignee,creator,linked_tasks,project_complexity
 
-def parse_milestone(body, issue_title, project_complexity):
-    print("Parsing Milestone", issue_title)
-    body = clean_body(body)
-    
-    total_duration_value, total_duration_unit = extract_total_duration(body)
-    total_fte = extract_total_fte(body)
-    total_working_hours = extract_total_working_hours(body)
-
-    milestones_duration, milestone_fte = extract_milestone_data(body, issue_title)
+DURATION_UNITS = ("hours", "weeks", "months", "week", "month", "hour")
+
+# One alternation per field a proposal body can carry; each outer group names the token kind.
+# The leading lookahead on the first letters lets the regex engine skip ahead instead of
+# trying every alternative at every position. Whitespace gaps are bounded so a pathological
+# body cannot make a single match attempt scan the rest of it.
+PROPOSAL_TOKEN_PATTERN = re.compile(
+    r"(?=[MEFTS])(?:"
+    r"(?P<milestone>Milestone:? (?P<milestone_index>\d+)\s*)"
+    r"|(?P<duration>Estimated Duration:(?P<duration_gap>\s{0,64})(?P<duration_value>\d+(?:\.\d+)?)"
+    r"(?P<unit_gap>\s{0,64})(?P<duration_unit>hours|weeks|months|week|month|hour|days|day))"
+    r"|(?P<total_fte>Full-time equivalent \(FTE\):\s{0,64}(?P<total_fte_value>[\d.]+))"
+    r"|(?P<fte>FTE:\s{0,64}(?P<fte_value>[\d.]+))"
+    r"|(?P<total_hours>Total Estimated Working Hours: (?P<total_hours_value>\d+) (?:hours|hrs))"
+    r"|(?P<start_date>Starting Date: (?P<start_month>\w+) (?P<start_day>\d+)(?:th|rd|st|nd)?,? (?P<start_year>\d{4}))"
+    r"|(?P<delivery_date>Estimated delivery date: (?P<delivery_month>\w+) (?P<delivery_day>\d+)(?:th|rd|st|nd)?,? (?P<delivery_year>\d{4}))"
+    r")"
+)
+
+
+def normalize_body(body):
+    """
+    Drop bold markers and literal "\\r\\n" escapes; CRLF line breaks become a single newline.
+    """
+    return re.sub(r"\*\*|\\r\\n", "", body).replace("\r\n", "\n")
 
-    formatted_equation_components, format_cost_per_milestone_components, total_working_hours_calculated = process_milestones(
-        milestones_duration, milestone_fte, project_complexity
-    )
 
-    formatted_equation = format_equation(formatted_equation_components)
-    format_cost_per_milestone = format_cost_components(format_cost_per_milestone_components)
+def first_at_or_after(positions, items, pos):
+    i = bisect_left(positions, pos)
+    return items[i] if i < len(items) else None
 
-    validate_total_working_hours(total_working_hours, total_working_hours_calculated, issue_title)
 
-    total_cost = calculate_total_cost(format_cost_per_milestone_components)
+@instrumented("scan_proposal", per_item=True)
+def scan_proposal(body):
+    """
+    Split a proposal body into its fields in one pass.
 
-    return {
-        "total_duration_value": total_duration_value,
-        "total_duration_unit": total_duration_unit,
-        "total_fte": total_fte,
-        "formatted_equation": formatted_equation,
-        "format_cost_per_milestone": format_cost_per_milestone,
-        "total_cost": total_cost,
-        "total_working_hours": total_working_hours_calculated if total_working_hours_calculated else "error",
+    Totals take the first occurrence in the body and are None when absent. `durations`
+    and `ftes` are every per-milestone value in body order, used for the cost. Each entry
+    of `milestones` is one "Milestone N" header with the first start date, delivery date
+    and duration that follow it, used for the schedule.
+    """
+    body = normalize_body(body)
+    scan = {
+        "total_duration": None,
+        "total_fte": None,
+        "total_working_hours": None,
+        "durations": [],
+        "ftes": [],
+        "milestones": [],
     }
+    headers = []
+    found = {"start_date": ([], []), "delivery_date": ([], []), "duration": ([], [])}
+
+    for match in PROPOSAL_TOKEN_PATTERN.finditer(body):
+        kind = match.lastgroup
+        start = match.start()
+        if kind == "milestone":
+            headers.append((int(match.group("milestone_index")), match.end()))
+        elif kind == "duration":
+            value, unit = match.group("duration_value"), match.group("duration_unit")
+            exact = (
+                match.group("duration_gap") == " "
+                and match.group("unit_gap") == " "
+                and value.isdigit()
+                and unit in DURATION_UNITS
+            )
+            after_total = body[max(start - 6, 0):start] == "Total "
+            if after_total and exact and scan["total_duration"] is None:
+                scan["total_duration"] = (int(value), unit)
+            if not after_total:
+                scan["durations"].append((to_number(value), unit))
+            # milestone schedule durations are whole numbers preceded by whitespace
+            if exact and start > 0 and body[start - 1].isspace():
+                found["duration"][0].append(start - 1)
+                found["duration"][1].append((int(value), unit))
+        elif kind == "total_fte":
+            if scan["total_fte"] is None:
+                scan["total_fte"] = to_number(match.group("total_fte_value"))
+        elif kind == "fte":
+            scan["ftes"].append(to_number(match.group("fte_value")))
+        elif kind == "total_hours":
+            if scan["total_working_hours"] is None:
+                scan["total_working_hours"] = int(match.group("total_hours_value"))
+        else:
+            prefix = kind.split("_")[0]
+            found[kind][0].append(start)
+            found[kind][1].append(
+                (match.group(f"{prefix}_month"), match.group(f"{prefix}_day"), match.group(f"{prefix}_year"))
+            )
 
-def clean_body(body):
-    return re.sub(r"\*\*|\r\n", "", body)
+    for index, section_start in headers:
+        scan["milestones"].append({
+            "index": index,
+            "start_date": first_at_or_after(*found["start_date"], section_start),
+            "delivery_date": first_at_or_after(*found["delivery_date"], section_start),
+            "duration": first_at_or_after(*found["duration"], section_start),
+        })
+    return scan
 
-def extract_total_duration(body):
-    pattern = r"Total Estimated Duration: (\d+) (hours|weeks|months|week|month|hour)"
-    match = re.search(pattern, body)
-    if match:
-        return int(match.group(1)), match.group(2)
-    return "error", "error"
 
-def extract_total_fte(body):
-    pattern = r"Full-time equivalent \(FTE\):[\s]*([\d.]+)"
-    match = re.search(pattern, body)
-    return "error" if not match else match.group(1)
+def parse_milestone(body, issue_title, project_complexity, scan=None):
+    """
+    parse_effort, priced at the rate of the project complexity.
+    """
+    return price_proposal(parse_effort(body, issue_title, scan), project_complexity)
 
-def extract_total_working_hours(body):
-    pattern = r"Total Estimated Working Hours: (\d+) (hours|hrs)"
-    match = re.search(pattern, body)
-    return "error" if not match else match.group(1)
 
-def extract_milestone_data(body, issue_title):
-    try:
-        duration_pattern = r"(?<!Total )Estimated Duration:[\s]*(\d+(?:\.\d+)?)[\s]*(hours|weeks|months|week|month|hour|days|day)"
-        fte_pattern = r"FTE:[\s]*([\d.]+)"
-        milestones_duration = re.findall(duration_pattern, body)
-        milestone_fte = re.findall(fte_pattern, body)
-        return milestones_duration, milestone_fte
-    except re.error:
-        logger.error(f"{issue_title}, Error processing milestones in the issue body.")
-
-def process_milestones(milestones_duration, milestone_fte, project_complexity):
-    formatted_equation_components = []
-    format_cost_per_milestone_components = []
-    total_working_hours_calculated = 0
+@instrumented("parse_milestone", per_item=True, label_arg=1)
+def parse_effort(body, issue_title, scan=None):
+    """
+    Totals and Milestone records of a proposal, without prices: hours from the per-milestone
+    durations and FTEs, start and end dates from the schedule. Nothing here depends on the
+    rates, so a parsed proposal can be priced again at any rate card.
+    """
+    logger.debug("Parsing Milestone %s", issue_title)
+    scan = scan or scan_proposal(body)
 
-    cost_factors = {
-        "Easy": float(easy_cost),
-        "Medium": float(medium_cost),
-        "Hard": float(hard_cost),
-    }
+    total_duration_value, total_duration_unit = scan["total_duration"] or (None, None)
+    milestones, total_working_hours_calculated = process_milestones(scan["durations"], scan["ftes"])
+    validate_total_working_hours(scan["total_working_hours"], total_working_hours_calculated, issue_title)
 
-    for (duration, unit), fte in zip(milestones_duration, milestone_fte):
-        milestone_hours = calculate_milestone_hours(duration, unit)
-        total_working_hours_calculated += milestone_hours * float(fte)
+    for number, (start_date, end_date) in parse_schedule(body, scan).items():
+        while len(milestones) < number:
+            milestones.append(Milestone(len(milestones) + 1))
+        milestones[number - 1].start_date = start_date
+        milestones[number - 1].end_date = end_date
 
-        try:
-            milestone_cost = milestone_hours * float(fte) * cost_factors.get(project_complexity, "error")
-            format_cost_per_milestone_components.append(milestone_cost)
-        except TypeError:
-            logger.error(f"Error: Invalid project complexity '{project_complexity}'")
-        except UnboundLocalError:
-            logger.error(f"Error: local variable 'milestone_cost' where it is not associated with a value, make sure you have assigned a value to it")
+    return {
+        "total_duration": total_duration_value,
+        "total_duration_unit": total_duration_unit,
+        "total_fte": scan["total_fte"],
+        "total_working_hours": total_working_hours_calculated or None,
+        "milestones": milestones,
+    }
 
-        formatted_equation_components.append(
-            f"({duration} {unit} * {fte} FTE) * ${cost_factors.get(project_complexity, 'ERROR')}"
-        )
+def price_proposal(parsed, project_complexity):
+    """
+    parse_effort output with every milestone priced and the total cost.
+    """
+    rate = parse_pricing(project_complexity)
+    if rate is None:
+        logger.error("Error: Invalid project complexity '%s'", project_complexity)
+    milestones = price_milestones(parsed["milestones"], rate)
+    return {**parsed, "total_cost": calculate_total_cost(milestones)}
+
+def price_milestones(milestones, rate):
+    rate = float(rate) if rate is not None else None
+    for milestone in milestones:
+        # milestones known only from the schedule have no effort to price
+        if milestone.unit is None:
+            continue
+        milestone.rate = rate
+        milestone.cost = None
+        if rate is not None and milestone.hours is not None and milestone.fte is not None:
+            milestone.cost = milestone.hours * milestone.fte * rate
+    return milestones
+
+def process_milestones(milestones_duration, milestone_fte):
+    milestones = []
+    total_working_hours_calculated = 0
+
+    for number, ((duration, unit), fte) in enumerate(zip(milestones_duration, milestone_fte), 1):
+        milestone = Milestone(number, duration, unit, fte)
+        milestone.hours = calculate_milestone_hours(duration, unit)
+        if milestone.hours is not None and fte is not None:
+            total_working_hours_calculated += milestone.hours * fte
+        milestones.append(milestone)
 
-    return formatted_equation_components, format_cost_per_milestone_components, total_working_hours_calculated
+    return milestones, total_working_hours_calculated
 
 def calculate_milestone_hours(duration, unit):
+    if duration is None:
+        return None
     duration = float(duration)
     if unit in ["hours", "hour"]:
         return duration
@@ -141,25 +250,19 @@ def calculate_milestone_hours(duration, unit):
         return duration * 4 * 5 * 8  # Assuming 4 weeks per month, 5 days per week, and 8 hours per day
     elif unit in ["days", "day"]:
         return duration * 8
-    return "error"
-
-def format_equation(components):
-    return " + ".join(components) if components else "error"
-
-def format_cost_components(components):
-    return "".join(f"m{i+1} = ${num}; " for i, num in enumerate(components))
+    return None
 
 def validate_total_working_hours(provided_hours, calculated_hours, issue_title):
-    if provided_hours != "error" and calculated_hours != int(provided_hours):
+    if provided_hours is not None and calculated_hours != provided_hours:
         raise ValueError(
             f"Issue '{issue_title}': Total working hours calculated ({calculated_hours}) do not match the provided value ({provided_hours})."
         )
 
-def calculate_total_cost(cost_components):
+def calculate_total_cost(milestones):
     total_cost = 0
-    for cost in cost_components:
-        if cost != "error":
-            total_cost += cost
+    for milestone in milestones:
+        if milestone.cost is not None:
+            total_cost += milestone.cost
     return total_cost
 
 
@@ -167,120 +270,61 @@ def parse_project_complexity(body):
     # Regex patterns to find project complexity
     project_complexity_pattern = r"Project Complexity:\s*(\w+)"
     project_complexity_match = re.search(project_complexity_pattern, body)
-    return project_complexity_match.group(1) if project_complexity_match else "error"
+    return project_complexity_match.group(1) if project_complexity_match else None
 
 
-def parse_dates_and_format(body):
-    body = re.sub(r"\*\*|\\r\\n", "", body)  # Remove unnecessary patterns
+def parse_date(month, day, year):
+    try:
+        return datetime.strptime(f"{day} {month} {year}", "%d %b %Y")
+    except ValueError:
+        return datetime.strptime(f"{day} {month} {year}", "%d %B %Y")
 
-    # Patterns to find the starting date, estimated delivery date, and duration for each milestone
-    starting_date_pattern = r"Starting Date: (\w+) (\d+)(?:th|rd|st|nd)?,? (\d{4})"
-    delivery_date_pattern = (
-        r"Estimated delivery date: (\w+) (\d+)(?:th|rd|st|nd)?,? (\d{4})"
-    )
-    duration_pattern = (
-        r"(?!Total)\sEstimated Duration: (\d+) (hours|weeks|months|week|month|hour)"
-    )
-    milestone_pattern = r"Milestone:? (\d+)\s*"
+
+def duration_delta(value, unit):
+    if unit == "hours" or unit == "hour":
+        return timedelta(hours=value)
+    elif unit == "weeks" or unit == "week":
+        return timedelta(weeks=value)
+    elif unit == "months" or unit == "month":
+        return timedelta(weeks=value * 4)
+    raise ValueError(f"Invalid duration unit {unit}")
+
+
+@instrumented("parse_schedule", per_item=True)
+def parse_schedule(body, scan=None):
+    """
+    Milestone number -> (start date, end date) for every milestone with a start or delivery date
+    and a duration. Milestone N takes the dates of the N-th header in the body.
+    """
+    scan = scan or scan_proposal(body)
 
     start_dates = []
     delivery_dates = []
     durations = []
     milestones_count = 0
 
-    for milestone_match in re.finditer(milestone_pattern, body):
-        milestone_index = int(milestone_match.group(1))
-        milestone_start = milestone_match.end()
-        if milestone_index > milestones_count:
-            milestones_count = milestone_index
-
-        # Extract start date, delivery date, and duration for the current milestone
-        start_date_match = re.search(starting_date_pattern, body[milestone_start:])
-        delivery_date_match = re.search(delivery_date_pattern, body[milestone_start:])
-        duration_match = re.search(duration_pattern, body[milestone_start:])
-
-        if start_date_match:
-            try:
-                start_date = datetime.strptime(
-                    f"{start_date_match.group(2)} {start_date_match.group(1)} {start_date_match.group(3)}",
-                    "%d %b %Y",
-                )
-            except ValueError:
-                start_date = datetime.strptime(
-                    f"{start_date_match.group(2)} {start_date_match.group(1)} {start_date_match.group(3)}",
-                    "%d %B %Y",
-                )
-            start_dates.append(start_date)
-        else:
-            start_dates.append(None)
-
-        if delivery_date_match:
-            try:
-                delivery_date = datetime.strptime(
-                    f"{delivery_date_match.group(2)} {delivery_date_match.group(1)} {delivery_date_match.group(3)}",
-                    "%d %b %Y",
-                )
-            except ValueError:
-                delivery_date = datetime.strptime(
-                    f"{delivery_date_match.group(2)} {delivery_date_match.group(1)} {delivery_date_match.group(3)}",
-                    "%d %B %Y",
-                )
-            except ValueError:
-                ValueError(f"Error: Invalid delivery date format.")
-            delivery_dates.append(delivery_date)
-        else:
-            delivery_dates.append(None)
+    for milestone in scan["milestones"]:
+        if milestone["index"] > milestones_count:
+            milestones_count = milestone["index"]
 
-        if duration_match:
-            duration_value = int(duration_match.group(1))
-            duration_unit = duration_match.group(2)
-            durations.append((duration_value, duration_unit))
-        else:
-            durations.append(None)
+        start_date = milestone["start_date"]
+        start_dates.append(parse_date(*start_date) if start_date else None)
+        delivery_date = milestone["delivery_date"]
+        delivery_dates.append(parse_date(*delivery_date) if delivery_date else None)
+        durations.append(milestone["duration"])
 
-    # Calculate and format end dates for each milestone
-    formatted_dates = ""
-    for i in range(milestones_count):
+    schedule = {}
+    # a gap in the numbering leaves fewer headers than the highest milestone number
+    for i in range(min(milestones_count, len(start_dates))):
         start_date = start_dates[i]
         delivery_date = delivery_dates[i]
         duration_value, duration_unit = durations[i] or (None, None)
 
         if start_date and duration_value and duration_unit:
-            if duration_unit == "hours" or duration_unit == "hour":
-                end_date = start_date + timedelta(hours=duration_value)
-            elif duration_unit == "weeks" or duration_unit == "week":
-                end_date = start_date + timedelta(weeks=duration_value)
-            elif duration_unit == "months" or duration_unit == "month":
-                end_date = start_date + timedelta(weeks=duration_value * 4)
-            else:
-                return "Error: Invalid duration unit."
-            formatted_dates += (
-                f"Start Date for Milestone {i+1}: {start_date.strftime('%Y %b %d')}, "
-            )
-            formatted_dates += (
-                f"End Date for Milestone {i+1}: {end_date.strftime('%B %d, %Y')}; "
-            )
+            schedule[i + 1] = (start_date, start_date + duration_delta(duration_value, duration_unit))
         elif delivery_date and duration_value and duration_unit:
-            if duration_unit == "hours" or duration_unit == "hour":
-                start_date = delivery_date - timedelta(hours=duration_value)
-            elif duration_unit == "weeks" or duration_unit == "week":
-                start_date = delivery_date - timedelta(weeks=duration_value)
-            elif duration_unit == "months" or duration_unit == "month":
-                start_date = delivery_date - timedelta(weeks=duration_value * 4)
-            else:
-                return "Error: Invalid duration unit."
-            formatted_dates += (
-                f"Start Date for Milestone {i+1}: {start_date.strftime('%Y %b %d')}, "
-            )
-            formatted_dates += (
-                f"End Date for Milestone {i+1}: {delivery_date.strftime('%B %d, %Y')}; "
-            )
-        else:
-            continue
-
-    if formatted_dates == "":
-        return "NONE"
-    return formatted_dates
+            schedule[i + 1] = (delivery_date - duration_delta(duration_value, duration_unit), delivery_date)
+    return schedule
 
 
 def parse_pricing(project_complexity):
@@ -291,5 +335,5 @@ def parse_pricing(project_complexity):
     elif project_complexity == "Hard":
         pricing_per_hours = hard_cost
     else:
-        pricing_per_hours = "error"
-    return pricing_per_hours
+        pricing_per_hours = None
+    return to_number(pricing_per_hours)
@@ -0,0 +1,48 @@
+"""
+Compact issue records at ingest.
+
+A REST issue has some thirty fields, plus a nested user with a dozen URL templates, reactions
+and full label objects. The tracker reads about ten of them. Every issue is cut down to that
+subset (the same shape the GraphQL backend builds) as soon as it is decoded, so raw objects
+never outlive their page. Logins, label names and states are interned, so the thousands of
+repeats share one string.
+"""
+import sys
+
+# top-level fields the tracker reads; "pull_request" only marks pull requests, which are skipped
+ISSUE_FIELDS = ("number", "url", "html_url", "title", "body", "state", "updated_at", "comments")
+
+
+def intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def project_user(user):
+    return {"login": intern(user.get("login", ""))} if user else None
+
+
+def project_issue(issue):
+    """
+    Keep the fields in ISSUE_FIELDS that are present, plus user, assignee, labels and the
+    pull request marker. Projecting a projected issue returns an equal one.
+    """
+    projected = {name: issue[name] for name in ISSUE_FIELDS if name in issue}
+    if "state" in projected:
+        projected["state"] = intern(projected["state"])
+    if "user" in issue:
+        projected["user"] = project_user(issue["user"]) or {}
+    if "assignee" in issue:
+        projected["assignee"] = project_user(issue["assignee"])
+    if "labels" in issue:
+        projected["labels"] = [{"name": intern(label["name"])} for label in issue["labels"]]
+    if "pull_request" in issue:
+        projected["pull_request"] = True
+    return projected
+
+
+def project_comment(comment):
+    return {
+        "user": project_user(comment.get("user")) or {},
+        "body": comment.get("body"),
+        "created_at": comment.get("created_at"),
+    }
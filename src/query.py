@@ -0,0 +1,366 @@
+"""
+Persistent, indexed copy of the tracker for ad-hoc questions, rebuilt whenever the outputs are
+published (updated task by task in watch mode) and queried without fetching or parsing anything.
+
+Tasks and proposals are rows with secondary indexes on assignee, creator, complexity,
+type/state and linked task. Titles and bodies go into an FTS5 inverted index.
+
+    poetry run python -m src.query tasks --state open --complexity Hard --min-proposals 2
+    poetry run python -m src.query proposals --text plonk --creator alice --format json
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from src.decorator import instrumented
+from src.logger import get_project_root
+
+DEFAULT_INDEX_PATH = os.path.join(get_project_root(), ".cache", "tracker.sqlite3")
+
+SCHEMA = """
+CREATE TABLE tasks (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    repo TEXT,
+    number INTEGER,
+    title TEXT,
+    type TEXT NOT NULL COLLATE NOCASE,
+    state TEXT NOT NULL,
+    creator TEXT COLLATE NOCASE,
+    assignee TEXT COLLATE NOCASE,
+    complexity TEXT COLLATE NOCASE,
+    pricing_per_hours NUMERIC,
+    proposals INTEGER NOT NULL
+);
+CREATE TABLE proposals (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    repo TEXT,
+    number INTEGER,
+    title TEXT,
+    state TEXT,
+    creator TEXT COLLATE NOCASE,
+    assignee TEXT COLLATE NOCASE,
+    complexity TEXT COLLATE NOCASE,
+    task_link TEXT NOT NULL,
+    total_duration INTEGER,
+    total_duration_unit TEXT,
+    total_fte NUMERIC,
+    total_working_hours NUMERIC,
+    total_cost NUMERIC,
+    milestones INTEGER NOT NULL
+);
+CREATE INDEX tasks_by_assignee ON tasks (assignee);
+CREATE INDEX tasks_by_creator ON tasks (creator);
+CREATE INDEX tasks_by_complexity ON tasks (complexity);
+CREATE INDEX tasks_by_state ON tasks (state, type);
+CREATE INDEX proposals_by_assignee ON proposals (assignee);
+CREATE INDEX proposals_by_creator ON proposals (creator);
+CREATE INDEX proposals_by_complexity ON proposals (complexity);
+CREATE INDEX proposals_by_state ON proposals (state);
+CREATE INDEX proposals_by_task ON proposals (task_link);
+-- rowid is the id of the task or proposal; the text is kept so that update_index can delete rows
+CREATE VIRTUAL TABLE documents USING fts5 (title, body, tokenize = "porter unicode61");
+"""
+# stored as user_version; update_index rebuilds an index written with another schema
+INDEX_VERSION = 1
+
+TASK_COLUMNS = [
+    "link", "repo", "number", "title", "type", "state", "creator", "assignee",
+    "complexity", "pricing_per_hours", "proposals",
+]
+PROPOSAL_COLUMNS = [
+    "link", "repo", "number", "title", "state", "creator", "assignee", "complexity",
+    "task_link", "task_type", "task_state", "total_duration", "total_duration_unit",
+    "total_fte", "total_working_hours", "total_cost", "milestones",
+]
+
+
+def issue_number(link):
+    tail = (link or "").rsplit("/", 1)[-1]
+    return int(tail) if tail.isdigit() else None
+
+
+def task_state(task_type):
+    return "closed" if task_type.startswith("Closed") else "open"
+
+
+@instrumented("index_build")
+def build_index(tasks, issues, path=DEFAULT_INDEX_PATH):
+    """
+    Write the index of `tasks` to a temp file and rename it over `path`, so a running query
+    sees either the old index or the new one. `issues` supplies the titles, bodies and
+    states; only those of tracked tasks and proposals are indexed.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".index-", suffix=".tmp")
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(temp_path)
+        try:
+            with conn:
+                conn.executescript(SCHEMA)
+                conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+                insert_tracker(conn, tasks, issues)
+        finally:
+            conn.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def insert_tracker(conn, tasks, issues):
+    # tasks and proposals share one id space, the rowids of their documents
+    ids = {}
+    for task in tasks.values():
+        ids[task.task_link] = len(ids) + 1
+    for task in tasks.values():
+        for proposal in task.proposals:
+            ids[proposal.link] = len(ids) + 1
+    conn.executemany(INSERT_TASK, (task_values(ids[task.task_link], task) for task in tasks.values()))
+    conn.executemany(
+        INSERT_PROPOSAL,
+        (proposal_values(ids[p.link], task, p) for task in tasks.values() for p in task.proposals),
+    )
+    for issue in issues:
+        link = issue.get("html_url")
+        if link not in ids:
+            continue
+        if link not in tasks:
+            conn.execute(
+                "UPDATE proposals SET title = ?, state = ? WHERE id = ?",
+                (issue.get("title", "").strip(), issue.get("state"), ids[link]),
+            )
+        conn.execute(INSERT_DOCUMENT, document_values(ids[link], issue))
+
+
+INSERT_TASK = "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_PROPOSAL = "INSERT INTO proposals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_DOCUMENT = "INSERT INTO documents (rowid, title, body) VALUES (?, ?, ?)"
+
+
+def task_values(row_id, task):
+    return (row_id, task.task_link, task.repo, issue_number(task.task_link), task.title, task.type,
+            task_state(task.type), task.creator, task.assignee, task.project_complexity,
+            task.pricing_per_hours, len(task.proposals))
+
+
+def proposal_values(row_id, task, p, issue=None):
+    # without its issue, the title and state of the proposal are filled in afterwards
+    title, state = (issue.get("title", "").strip(), issue.get("state")) if issue else (None, None)
+    return (row_id, p.link, p.repo, p.number, title, state, p.creator, p.assignee, p.project_complexity,
+            task.task_link, p.total_duration, p.total_duration_unit, p.total_fte, p.total_working_hours,
+            p.total_cost, len(p.milestones))
+
+
+def document_values(row_id, issue):
+    return row_id, issue.get("title", ""), issue.get("body") or ""
+
+
+@instrumented("index_update")
+def update_index(tasks, links, issues, path=DEFAULT_INDEX_PATH):
+    """
+    Bring the index at `path` up to date after the tasks in `links` were added, edited or removed,
+    in place and in one transaction. Only the rows and documents of those tasks and of their
+    proposals are replaced, so the cost follows the changed tasks, not the tracker. `issues` maps
+    links to issues. Without an index of the current schema, build_index writes one.
+    """
+    if os.path.exists(path):
+        conn = sqlite3.connect(path)
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] == INDEX_VERSION:
+                with conn:
+                    next_id = conn.execute(
+                        "SELECT MAX(id) FROM (SELECT MAX(id) AS id FROM tasks UNION ALL SELECT MAX(id) FROM proposals)"
+                    ).fetchone()[0] or 0
+                    for link in links:
+                        next_id = replace_task(conn, link, tasks.get(link), issues, next_id)
+                return
+        finally:
+            conn.close()
+    build_index(tasks, issues.values(), path)
+
+
+def replace_task(conn, link, task, issues, next_id):
+    """
+    Replace the rows of the task at `link` (None once it is gone) and of its proposals. Rows that
+    stay keep their ids, and so their place in tracker order; new ones are numbered after
+    `next_id`. Returns the last id given out.
+    """
+    kept = dict(conn.execute(
+        "SELECT link, id FROM tasks WHERE link = ? UNION ALL SELECT link, id FROM proposals WHERE task_link = ?",
+        (link, link),
+    ))
+    stale = list(kept.values())
+    for p in task.proposals if task else []:
+        # a proposal that moved here from another task leaves its old row behind
+        if p.link not in kept:
+            row = conn.execute("SELECT id FROM proposals WHERE link = ?", (p.link,)).fetchone()
+            if row:
+                stale.append(row[0])
+    stale_rows = [(row_id,) for row_id in stale]
+    conn.executemany("DELETE FROM tasks WHERE id = ?", stale_rows)
+    conn.executemany("DELETE FROM proposals WHERE id = ?", stale_rows)
+    conn.executemany("DELETE FROM documents WHERE rowid = ?", stale_rows)
+    if task is None:
+        return next_id
+
+    ids = {}
+    for row_link in [link] + [p.link for p in task.proposals]:
+        if row_link in kept:
+            ids[row_link] = kept[row_link]
+        else:
+            next_id += 1
+            ids[row_link] = next_id
+    conn.execute(INSERT_TASK, task_values(ids[link], task))
+    conn.executemany(INSERT_PROPOSAL, (proposal_values(ids[p.link], task, p, issues.get(p.link)) for p in task.proposals))
+    conn.executemany(INSERT_DOCUMENT, (document_values(ids[row_link], issues[row_link]) for row_link in ids if row_link in issues))
+    return next_id
+
+
+class TrackerIndex:
+    """
+    Read-only view of an index written by build_index. Every filter is optional; logins and
+    complexities compare case-insensitively, `text` is an FTS5 query over title and body.
+    Rows come in tracker order, as in issues.csv.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No tracker index at {path}: run index.py first")
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def tasks(self, type=None, state=None, complexity=None, creator=None, assignee=None,
+              repo=None, text=None, min_proposals=None, limit=None):
+        where, args = [], []
+        add_filters(where, args, "t", type=type, state=state, complexity=complexity,
+                    creator=creator, assignee=assignee, repo=repo)
+        if min_proposals is not None:
+            where.append("t.proposals >= ?")
+            args.append(min_proposals)
+        add_text(where, args, "t", text)
+        return self.select(f"SELECT {', '.join('t.' + c for c in TASK_COLUMNS)} FROM tasks t",
+                           where, args, "t.id", limit)
+
+    def proposals(self, task=None, task_type=None, task_state=None, state=None, complexity=None,
+                  creator=None, assignee=None, repo=None, text=None, limit=None):
+        where, args = [], []
+        add_filters(where, args, "p", state=state, complexity=complexity, creator=creator,
+                    assignee=assignee, repo=repo)
+        add_filters(where, args, "t", type=task_type, state=task_state)
+        if task is not None:
+            # a task link, or an issue number in any tracked repository
+            if str(task).isdigit():
+                add_filters(where, args, "t", number=int(task))
+            else:
+                add_filters(where, args, "p", task_link=task)
+        add_text(where, args, "p", text)
+        columns = ", ".join(
+            {"task_type": "t.type AS task_type", "task_state": "t.state AS task_state"}.get(c, "p." + c)
+            for c in PROPOSAL_COLUMNS
+        )
+        return self.select(f"SELECT {columns} FROM proposals p JOIN tasks t ON t.link = p.task_link",
+                           where, args, "t.id, p.id", limit)
+
+    def select(self, query, where, args, order, limit):
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" ORDER BY {order}"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(limit)
+        return [dict(row) for row in self.conn.execute(query, args)]
+
+    def close(self):
+        self.conn.close()
+
+
+def add_filters(where, args, table, **filters):
+    for column, value in filters.items():
+        if value is not None:
+            where.append(f"{table}.{column} = ?")
+            args.append(value)
+
+
+def add_text(where, args, table, text):
+    if text:
+        where.append(f"{table}.id IN (SELECT rowid FROM documents WHERE documents MATCH ?)")
+        args.append(text)
+
+
+def write_rows(rows, columns, output_format, file):
+    if output_format == "json":
+        json.dump(rows, file, indent=2)
+        file.write("\n")
+        return
+    writer = csv.DictWriter(file, fieldnames=columns, quoting=csv.QUOTE_ALL, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Query the tracker index built by the last run.")
+    kinds = parser.add_subparsers(dest="kind", required=True)
+
+    tasks = kinds.add_parser("tasks", help="tasks and their proposal counts")
+    tasks.add_argument("--type", help='e.g. "Task", "WIP", "Closed Umbrella Task"')
+    tasks.add_argument("--state", choices=["open", "closed"])
+    tasks.add_argument("--min-proposals", type=int, help="2 for tasks with competing proposals")
+
+    proposals = kinds.add_parser("proposals", help="proposals with their totals and task")
+    proposals.add_argument("--task", help="linked task, by link or issue number")
+    proposals.add_argument("--task-type")
+    proposals.add_argument("--task-state", choices=["open", "closed"])
+    proposals.add_argument("--state", choices=["open", "closed"], help="state of the proposal issue")
+
+    for sub in (tasks, proposals):
+        sub.add_argument("--complexity", help="Easy, Medium or Hard")
+        sub.add_argument("--creator", help="issue author (the applicant, for proposals)")
+        sub.add_argument("--assignee")
+        sub.add_argument("--repo", help="owner/name")
+        sub.add_argument("--text", help='full-text query over title and body, e.g. plonk, "zk proof", fold*')
+        sub.add_argument("--limit", type=int)
+        sub.add_argument("--format", choices=["csv", "json"], default="csv")
+        sub.add_argument("--output", help="write here instead of stdout")
+        sub.add_argument("--index", default=os.getenv("TRACKER_INDEX_PATH", DEFAULT_INDEX_PATH),
+                         help="index file (default: TRACKER_INDEX_PATH, .cache/tracker.sqlite3)")
+    args = parser.parse_args(argv)
+
+    filters = {
+        name: value for name, value in vars(args).items()
+        if name not in ("index", "format", "output", "kind")
+    }
+    try:
+        index = TrackerIndex(args.index)
+    except FileNotFoundError as e:
+        parser.exit(1, f"{e}\n")
+    start = time.perf_counter()
+    try:
+        if args.kind == "tasks":
+            rows, columns = index.tasks(**filters), TASK_COLUMNS
+        else:
+            rows, columns = index.proposals(**filters), PROPOSAL_COLUMNS
+    except sqlite3.OperationalError as e:
+        parser.exit(2, f"Invalid query: {e}\n")
+    finally:
+        index.close()
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as file:
+            write_rows(rows, columns, args.format, file)
+    else:
+        write_rows(rows, columns, args.format, sys.stdout)
+    print(f"{len(rows)} {args.kind} in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,131 @@
+import random
+import threading
+import time
+from src import instrumentation
+from src.logger import logger
+
+
+class Stopped(Exception):
+    pass
+
+
+class RateLimiter:
+    """
+    One request budget shared by every fetch worker.
+
+    Each response updates the budget from X-RateLimit-Remaining / X-RateLimit-Reset and
+    Retry-After. acquire() blocks while a limit is in force, and once fewer than
+    `pace_below` requests remain it spaces requests evenly until the reset, so the limit
+    is reached at the reset instead of long before it. Waits end early on interrupt(), and the
+    waiting workers raise Stopped instead of sending their request.
+    """
+
+    def __init__(self, reserve=5, pace_below=500, base_delay=1.0, max_delay=60.0,
+                 sleep=None, clock=time.time):
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stopped = threading.Event()
+        self.sleep = sleep or self.stopped.wait
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self.next_slot = 0.0
+        self.sleeps = 0
+        self.slept_seconds = 0.0
+        self.retries = 0
+
+    def interrupt(self):
+        self.stopped.set()
+
+    def resume(self):
+        self.stopped.clear()
+
+    def _wait(self, seconds, reason):
+        if self.stopped.is_set():
+            raise Stopped("interrupted")
+        if seconds <= 0:
+            return
+        with self.lock:
+            self.sleeps += 1
+            self.slept_seconds += seconds
+        instrumentation.count("rate_limit_sleeps")
+        instrumentation.count("rate_limit_sleep_seconds", seconds)
+        logger.info(f"Rate limiter: waiting {seconds:.1f}s ({reason})")
+        self.sleep(seconds)
+        if self.stopped.is_set():
+            raise Stopped(f"interrupted while {reason}")
+
+    def acquire(self):
+        with self.lock:
+            now = self.clock()
+            if now < self.blocked_until:
+                wait, reason = self.blocked_until - now, "limited"
+            elif self.remaining is not None and self.reset_at and self.reset_at > now:
+                budget = self.remaining - self.reserve
+                if budget <= 0:
+                    wait, reason = self.reset_at - now + 1, "budget exhausted"
+                elif budget < self.pace_below:
+                    interval = (self.reset_at - now) / budget
+                    slot = max(now, self.next_slot)
+                    self.next_slot = slot + interval
+                    wait, reason = slot - now, "pacing"
+                else:
+                    wait, reason = 0, ""
+                self.remaining -= 1
+            else:
+                wait, reason = 0, ""
+        self._wait(wait, reason)
+
+    def update(self, response):
+        headers = response.headers
+        now = self.clock()
+        with self.lock:
+            if "X-RateLimit-Remaining" in headers and "X-RateLimit-Reset" in headers:
+                remaining = int(headers["X-RateLimit-Remaining"])
+                reset_at = float(headers["X-RateLimit-Reset"])
+                if reset_at != self.reset_at:
+                    self.remaining, self.reset_at, self.next_slot = remaining, reset_at, 0.0
+                else:
+                    # responses of concurrent workers in the same window arrive out of order
+                    self.remaining = min(self.remaining, remaining)
+            if is_rate_limited(response):
+                if "Retry-After" in headers:
+                    until = now + float(headers["Retry-After"])
+                elif self.reset_at:
+                    until = self.reset_at + 1
+                else:
+                    until = now + self.base_delay
+                self.blocked_until = max(self.blocked_until, until)
+
+    def backoff(self, attempt):
+        """
+        Jittered exponential back-off before retrying a transient failure.
+        """
+        with self.lock:
+            self.retries += 1
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        self._wait(delay, f"retry {attempt + 1}")
+
+    def stats(self):
+        return {
+            "remaining": self.remaining,
+            "sleeps": self.sleeps,
+            "slept_seconds": round(self.slept_seconds, 3),
+            "retries": self.retries,
+        }
+
+
+def is_rate_limited(response):
+    if response.status_code == 429:
+        return True
+    if response.status_code != 403:
+        return False
+    return (
+        response.headers.get("X-RateLimit-Remaining") == "0"
+        or "Retry-After" in response.headers
+        or "rate limit" in response.text.lower()
+    )
@@ -0,0 +1,152 @@
+"""
+What-if pricing (needs pandas): totals under alternative rate cards, from the parsed hours and
+FTE of every milestone, without fetching or parsing again.
+
+A rate card is a JSON file with rates per project complexity, falling back to the current
+EASY/MEDIUM/HARD rates, and optional per-task rates that win over the complexity rate:
+
+    {"name": "raise", "rates": {"Easy": 60, "Medium": 90, "Hard": 120},
+     "tasks": {"https://github.com/privacy-scaling-explorations/acceleration-program/issues/12": 150}}
+
+Every milestone is reduced to its effort (hours * FTE) and the index of its task. The cards
+become a (cards x tasks) rate matrix, so all scenarios are priced with one multiplication and
+one bincount.
+
+    poetry run python -m src.repricing raise.json cut.json
+"""
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from src.parser import parse_pricing
+
+COMPLEXITIES = ["Easy", "Medium", "Hard"]
+UNKNOWN_COMPLEXITY = "unknown"
+
+
+@dataclass(slots=True)
+class Effort:
+    task_links: list[str]
+    task_complexities: list[str | None]
+    # per milestone: index of its task, and hours * FTE (NaN when either is missing)
+    task_of: np.ndarray
+    effort: np.ndarray
+
+
+def milestone_effort(tasks):
+    links, complexities, task_of, effort = [], [], [], []
+    for index, task in enumerate(tasks.values()):
+        links.append(task.task_link)
+        complexities.append(task.project_complexity)
+        for proposal in task.proposals:
+            for milestone in proposal.milestones:
+                # milestones known only from the schedule are never priced
+                if milestone.unit is None:
+                    continue
+                task_of.append(index)
+                if milestone.hours is None or milestone.fte is None:
+                    effort.append(np.nan)
+                else:
+                    effort.append(milestone.hours * milestone.fte)
+    return Effort(links, complexities, np.array(task_of, dtype=np.int64), np.array(effort, dtype=np.float64))
+
+
+def current_card():
+    return {"name": "current", "rates": {c: parse_pricing(c) for c in COMPLEXITIES}, "tasks": {}}
+
+
+def load_card(path):
+    with open(path, encoding="utf-8") as file:
+        card = json.load(file)
+    unknown = set(card.get("rates", {})) - set(COMPLEXITIES)
+    if unknown:
+        raise ValueError(f"{path}: unknown complexities {sorted(unknown)}, expected {COMPLEXITIES}")
+    return {
+        "name": card.get("name") or os.path.splitext(os.path.basename(path))[0],
+        "rates": {**current_card()["rates"], **card.get("rates", {})},
+        "tasks": card.get("tasks", {}),
+    }
+
+
+def task_rates(effort, cards):
+    """
+    (cards x tasks) hourly rate of every task under every card; NaN where there is none.
+    """
+    codes = np.array(
+        [COMPLEXITIES.index(c) if c in COMPLEXITIES else len(COMPLEXITIES) for c in effort.task_complexities],
+        dtype=np.int64,
+    )
+    by_complexity = np.array(
+        [[np.nan if card["rates"].get(c) is None else float(card["rates"][c]) for c in COMPLEXITIES] + [np.nan]
+         for card in cards],
+        dtype=np.float64,
+    ).reshape(len(cards), len(COMPLEXITIES) + 1)
+    rates = by_complexity[:, codes]
+    index = {link: i for i, link in enumerate(effort.task_links)}
+    for k, card in enumerate(cards):
+        for link, rate in card["tasks"].items():
+            if link in index:
+                rates[k, index[link]] = float(rate)
+    return rates
+
+
+def reprice(effort, cards):
+    """
+    (cards x tasks) total cost. A milestone costs hours * FTE * rate, as in the tracker;
+    milestones without effort or rate add nothing.
+    """
+    rates = task_rates(effort, cards)
+    count, size = rates.shape
+    cost = np.nan_to_num(effort.effort * rates[:, effort.task_of])
+    cells = (np.arange(count)[:, None] * size + effort.task_of).ravel()
+    return np.bincount(cells, weights=cost.ravel(), minlength=count * size).reshape(count, size)
+
+
+def compare(effort, cards):
+    """
+    Side-by-side totals, one column per card: per task, per complexity and program-wide.
+    """
+    names = [card["name"] for card in cards]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Rate card names must be unique: {names}")
+    costs = reprice(effort, cards)
+    by_task = pd.DataFrame(costs.T, columns=names)
+    by_task.insert(0, "complexity", [c if c in COMPLEXITIES else UNKNOWN_COMPLEXITY for c in effort.task_complexities])
+    by_task.insert(0, "task_link", effort.task_links)
+    by_complexity = by_task.groupby("complexity")[names].sum()
+    program = by_task[names].sum()
+    return by_task, by_complexity, program
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Price the tracker under alternative rate cards.")
+    parser.add_argument("cards", nargs="+", help="rate card JSON files")
+    parser.add_argument("--output", default="repricing.csv", help="per-task totals, one column per card")
+    args = parser.parse_args()
+
+    from src import main
+    from src.logger import configure_logging
+
+    configure_logging()
+    cards = [current_card()] + [load_card(path) for path in args.cards]
+    tasks, _ = main.consume_events(main.stream_issues(main.iter_issues(offline=True)), [])
+    main.get_parse_cache().flush()
+    effort = milestone_effort(tasks)
+
+    start = time.perf_counter()
+    by_task, by_complexity, program = compare(effort, cards)
+    elapsed = time.perf_counter() - start
+
+    by_task.to_csv(args.output, index=False)
+    print(f"Priced {len(effort.effort)} milestones of {len(effort.task_links)} tasks under "
+          f"{len(cards)} rate cards in {elapsed * 1000:.1f} ms")
+    print(by_complexity.to_string(float_format=lambda value: f"{value:,.2f}"))
+    print("Program: " + ", ".join(f"{name} {total:,.2f}" for name, total in program.items()))
+    print(f"Per-task totals written to {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
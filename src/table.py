@@ -0,0 +1,101 @@
+"""
+Columnar view of the tracker (needs pandas; Parquet export also needs pyarrow).
+
+One row per task and proposal, the same grain as issues.csv, with numeric columns
+as floats (NaN where a value is missing) and repeated strings as categoricals.
+"""
+import json
+import pandas as pd
+from src.csv_writer import get_proposal_type
+from src.decorator import instrumented
+
+CATEGORY_COLUMNS = ["repo", "row_type", "task_type", "base_type", "task_creator", "task_assignee",
+                    "project_complexity", "applicant"]
+NUMERIC_COLUMNS = ["total_duration_value", "total_fte", "total_working_hours", "pricing_per_hours", "total_cost"]
+COLUMNS = ["repo", "task_link", "title", "row_type", "task_type", "base_type", "task_creator", "task_assignee",
+           "project_complexity", "proposal_link", "applicant", "total_duration_unit", *NUMERIC_COLUMNS]
+
+
+def task_rows(task):
+    """
+    The rows of one task and its proposals, as tuples in COLUMNS order.
+    """
+    for proposal in task.proposals or [None]:
+        yield (
+            task.repo,
+            task.task_link,
+            task.title,
+            get_proposal_type(task) if proposal else task.type,
+            task.type,
+            task.type.removeprefix("Closed "),
+            task.creator,
+            task.assignee,
+            task.project_complexity,
+            proposal.link if proposal else None,
+            proposal.creator if proposal else None,
+            proposal.total_duration_unit if proposal else None,
+            proposal.total_duration if proposal else None,
+            proposal.total_fte if proposal else None,
+            proposal.total_working_hours if proposal else None,
+            task.pricing_per_hours,
+            proposal.total_cost if proposal else None,
+        )
+
+
+@instrumented("table_build")
+def build_table(tasks):
+    rows = [row for task in tasks.values() for row in task_rows(task)]
+    values = list(zip(*rows)) or [()] * len(COLUMNS)
+    frame = pd.DataFrame(dict(zip(COLUMNS, map(list, values))), columns=COLUMNS)
+    for column in NUMERIC_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+    for column in CATEGORY_COLUMNS:
+        frame[column] = frame[column].astype("category")
+    frame["is_closed"] = frame["task_type"].astype(str).str.startswith("Closed")
+    return frame
+
+
+@instrumented("table_metrics")
+def table_metrics(frame):
+    """
+    The tracker counters plus breakdowns, all from group-bys over the table.
+    """
+    proposals_per_task = frame.groupby("task_link", sort=False)["proposal_link"].count()
+    tasks = frame.drop_duplicates("task_link").set_index("task_link")
+    task_type = tasks["task_type"].astype(str)
+
+    state = tasks["is_closed"].map({True: "closed", False: "open"})
+    open_closed = pd.crosstab(tasks["base_type"].astype(str), state).reindex(columns=["open", "closed"], fill_value=0)
+
+    metrics = {
+        "WIP Tasks": int((task_type == "WIP").sum()),
+        "Tasks Looking for Reviewer": int((tasks["task_assignee"].astype(str) == "").sum()),
+        "Available Tasks": int(((task_type != "WIP") & (proposals_per_task.reindex(tasks.index) == 0)).sum()),
+        "Proposals": int(proposals_per_task.sum()),
+        "Total Tasks": len(tasks),
+    }
+    breakdowns = {
+        "cost_by_repo": frame.groupby("repo", observed=True)["total_cost"].sum().to_dict(),
+        "cost_by_complexity": frame.groupby("project_complexity", observed=True)["total_cost"].sum().to_dict(),
+        "tasks_by_proposal_count": {
+            str(count): n_tasks for count, n_tasks in proposals_per_task.value_counts().sort_index().items()
+        },
+        "open_closed_by_type": open_closed.to_dict(orient="index"),
+        "cost_per_assignee": frame.groupby("task_assignee", observed=True)["total_cost"].sum().to_dict(),
+        "cost_per_applicant": frame.groupby("applicant", observed=True)["total_cost"].sum().to_dict(),
+    }
+    return metrics, breakdowns
+
+
+def to_native(value):
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def write_breakdowns(metrics, breakdowns, filepath):
+    with open(filepath, "w", encoding="utf-8") as file:
+        json.dump({"metrics": metrics, **breakdowns}, file, indent=2, default=to_native)
+
+
+@instrumented("parquet_write")
+def write_parquet(frame, filepath):
+    frame.to_parquet(filepath, index=False)
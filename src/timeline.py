@@ -0,0 +1,157 @@
+"""
+Program-wide schedule from the milestone intervals (needs pandas; Parquet export also needs pyarrow).
+
+Every scheduled milestone is an interval [start, end) with its FTE, hours and cost. The time
+series are sweeps over arrays of those intervals: +FTE in the week a milestone starts, -FTE
+after the week it ends, then one cumulative sum. Spend is booked in the week and month a
+milestone is delivered.
+"""
+import json
+import numpy as np
+import pandas as pd
+from src.decorator import instrumented
+
+MILESTONE_COLUMNS = ["repo", "task_link", "task_type", "proposal_link", "applicant", "milestone",
+                     "start", "end", "fte", "hours", "cost"]
+CATEGORY_COLUMNS = ["repo", "task_type", "applicant"]
+NUMERIC_COLUMNS = ["fte", "hours", "cost"]
+# numpy counts days from 1970-01-01, a Thursday; weeks are counted from the Monday before it
+WEEK_ORIGIN = np.datetime64("1969-12-29", "D")
+UPCOMING_DAYS = 30
+
+
+def milestone_rows(task):
+    """
+    The scheduled milestones of one task's proposals, as tuples in MILESTONE_COLUMNS order.
+    """
+    for proposal in task.proposals:
+        for milestone in proposal.milestones:
+            if milestone.start_date is None:
+                continue
+            yield (task.repo, task.task_link, task.type, proposal.link, proposal.creator, milestone.number,
+                   milestone.start_date, milestone.end_date, milestone.fte, milestone.hours, milestone.cost)
+
+
+@instrumented("milestone_frame")
+def milestone_frame(tasks):
+    """
+    One row per milestone with a start and end date.
+    """
+    rows = [row for task in tasks.values() for row in milestone_rows(task)]
+    values = list(zip(*rows)) or [()] * len(MILESTONE_COLUMNS)
+    frame = pd.DataFrame(dict(zip(MILESTONE_COLUMNS, map(list, values))), columns=MILESTONE_COLUMNS)
+    frame["start"] = pd.to_datetime(frame["start"])
+    frame["end"] = pd.to_datetime(frame["end"])
+    for column in NUMERIC_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+    for column in CATEGORY_COLUMNS:
+        frame[column] = frame[column].astype("category")
+    return frame
+
+
+def week_index(days):
+    return (days - WEEK_ORIGIN).astype(np.int64) // 7
+
+
+@instrumented("weekly_timeline")
+def weekly_timeline(frame):
+    """
+    Per week (starting Monday): committed FTE and active milestones, and the milestones
+    delivered that week with their cost.
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=["week", "committed_fte", "active_milestones", "deliveries", "delivered_cost"])
+    start = frame["start"].to_numpy()
+    end = frame["end"].to_numpy()
+    # a milestone is active up to the week of its last instant; zero-length ones count in their start week
+    last = np.where(end > start, end - np.timedelta64(1, "ns"), start)
+    first_week = week_index(start.astype("datetime64[D]"))
+    last_week = week_index(last.astype("datetime64[D]"))
+    delivery_week = week_index(end.astype("datetime64[D]"))
+
+    origin = first_week.min()
+    size = max(last_week.max(), delivery_week.max()) - origin + 1
+    fte = np.nan_to_num(frame["fte"].to_numpy())
+    cost = np.nan_to_num(frame["cost"].to_numpy())
+
+    fte_delta = np.zeros(size + 1)
+    np.add.at(fte_delta, first_week - origin, fte)
+    np.add.at(fte_delta, last_week - origin + 1, -fte)
+    active_delta = np.zeros(size + 1, dtype=np.int64)
+    np.add.at(active_delta, first_week - origin, 1)
+    np.add.at(active_delta, last_week - origin + 1, -1)
+    deliveries = np.bincount(delivery_week - origin, minlength=size)
+    delivered_cost = np.bincount(delivery_week - origin, weights=cost, minlength=size)
+
+    weeks = WEEK_ORIGIN + (origin + np.arange(size)) * np.timedelta64(7, "D")
+    return pd.DataFrame({
+        "week": weeks,
+        "committed_fte": np.cumsum(fte_delta)[:size].round(6),
+        "active_milestones": np.cumsum(active_delta)[:size],
+        "deliveries": deliveries,
+        "delivered_cost": delivered_cost,
+    })
+
+
+def monthly_spend(frame):
+    return frame.groupby(frame["end"].dt.to_period("M"))["cost"].sum()
+
+
+def max_concurrent_milestones(frame, key="applicant"):
+    """
+    Largest number of milestones of each `key` running at the same instant.
+    """
+    running = frame[frame["end"] > frame["start"]]
+    count = len(running)
+    events = pd.DataFrame({
+        key: pd.concat([running[key], running[key]], ignore_index=True),
+        "time": pd.concat([running["start"], running["end"]], ignore_index=True),
+        # at the same instant an end sorts before a start, so back-to-back milestones do not overlap
+        "delta": np.concatenate([np.ones(count, dtype=np.int64), -np.ones(count, dtype=np.int64)]),
+    })
+    events = events.sort_values([key, "time", "delta"], kind="stable")
+    events["running"] = events.groupby(key, observed=True)["delta"].cumsum()
+    return events.groupby(key, observed=True)["running"].max()
+
+
+def upcoming_deliveries(frame, now, days=UPCOMING_DAYS):
+    due = frame[(frame["end"] >= now) & (frame["end"] < now + pd.Timedelta(days=days))]
+    return due.sort_values("end")[["end", "proposal_link", "applicant", "milestone", "cost"]]
+
+
+@instrumented("timeline_summary")
+def timeline_summary(frame, weekly, now=None):
+    now = pd.Timestamp.now().normalize() if now is None else pd.Timestamp(now)
+    this_week = WEEK_ORIGIN + week_index(np.datetime64(now.date(), "D")) * np.timedelta64(7, "D")
+    current = weekly[weekly["week"] == this_week]
+    peak = weekly.loc[weekly["committed_fte"].idxmax()] if not weekly.empty else None
+    overlaps = max_concurrent_milestones(frame)
+    return {
+        "scheduled_milestones": len(frame),
+        "peak_committed_fte": float(peak["committed_fte"]) if peak is not None else 0.0,
+        "peak_week": str(peak["week"].date()) if peak is not None else None,
+        "committed_fte_this_week": float(current["committed_fte"].sum()),
+        "spend_by_month": {str(month): float(cost) for month, cost in monthly_spend(frame).items()},
+        "overlapping_applicants": {
+            applicant: int(running) for applicant, running in overlaps[overlaps > 1].sort_values(ascending=False).items()
+        },
+        "upcoming_deliveries": [
+            {
+                "date": str(row.end.date()),
+                "proposal_link": row.proposal_link,
+                "applicant": row.applicant,
+                "milestone": int(row.milestone),
+                "cost": None if pd.isna(row.cost) else float(row.cost),
+            }
+            for row in upcoming_deliveries(frame, now).itertuples()
+        ],
+    }
+
+
+def write_timeline(weekly, filepath):
+    weekly.to_csv(filepath, index=False, date_format="%Y-%m-%d")
+
+
+def write_summary(summary, filepath):
+    with open(filepath, "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
@@ -0,0 +1,53 @@
+import pytest
+from src import parser
+
+REPO = "https://github.com/privacy-scaling-explorations/acceleration-program/issues"
+
+
+def make_task(number, complexity="Medium", labels=()):
+    return {
+        "number": number,
+        "title": f"Task {number}",
+        "body": f"Project Complexity: {complexity}",
+        "state": "open",
+        "html_url": f"{REPO}/{number}",
+        "assignee": None,
+        "user": {"login": "maintainer"},
+        "labels": [{"name": label} for label in labels],
+    }
+
+
+def make_proposal(number, task_number):
+    return {
+        "number": number,
+        "title": f"Proposal: for task {task_number}",
+        "body": (
+            f"Link: {REPO}/{task_number}\r\n"
+            "Total Estimated Duration: 2 weeks\r\n"
+            "Full-time equivalent (FTE): 1\r\n"
+            "Total Estimated Working Hours: 80 hours\r\n"
+            "Milestone 1\r\nEstimated Duration: 2 weeks\r\nFTE: 1\r\n"
+        ),
+        "state": "open",
+        "html_url": f"{REPO}/{number}",
+        "assignee": None,
+        "user": {"login": "applicant"},
+        "labels": [],
+    }
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    monkeypatch.setattr(parser, "easy_cost", "10")
+    monkeypatch.setattr(parser, "medium_cost", "20")
+    monkeypatch.setattr(parser, "hard_cost", "30")
+
+
+@pytest.fixture
+def parse_cache(tmp_path, monkeypatch):
+    from src import main
+    from src.parse_cache import ParseCache
+
+    cache = ParseCache(str(tmp_path / "parse.sqlite3"))
+    monkeypatch.setattr(main, "parse_cache", cache)
+    return cache
@@ -0,0 +1,65 @@
+from src import main
+from src.comments import apply_summary, find_repo_links, summarize_comments
+from src.models import Proposal, Task
+
+REPO = "privacy-scaling-explorations/acceleration-program"
+
+
+def test_summary_finds_deliverables_and_last_reviewer():
+    comments = [
+        {"user": {"login": "reviewer"}, "body": f"See https://github.com/{REPO}/issues/3", "created_at": "2024-02-01T00:00:00Z"},
+        {"user": {"login": "alice"}, "body": "Done: https://github.com/alice/zk-lib/tree/main and https://github.com/orgs/pse",
+         "created_at": "2024-02-02T00:00:00Z"},
+        {"user": {"login": "github-actions[bot]"}, "body": "stale", "created_at": "2024-02-03T00:00:00Z"},
+    ]
+
+    summary = summarize_comments(comments, "alice", excluded_repos=[REPO])
+
+    assert summary == {
+        "deliverable_repos": ["alice/zk-lib"],
+        "last_reviewer": "reviewer",
+        "last_reviewed_at": "2024-02-01T00:00:00Z",
+    }
+    assert find_repo_links("https://github.com/alice/zk-lib.git.") == ["alice/zk-lib"]
+
+
+def test_non_repository_links_are_not_deliverables():
+    body = (
+        "![screenshot](https://github.com/user-attachments/assets/0f6c1d7e-8a4b-4c1e-9f5e-2d3b4a5c6d7e) "
+        "https://github.com/login/oauth https://github.com/notifications/beta https://github.com/bob/halo2-gadgets"
+    )
+    assert find_repo_links(body) == ["bob/halo2-gadgets"]
+
+    proposal = Proposal(f"https://github.com/{REPO}/issues/3", "alice", "", "", "Easy", REPO)
+    apply_summary(proposal, {"deliverable_repos": ["user-attachments/assets", "bob/halo2-gadgets"],
+                             "last_reviewer": None, "last_reviewed_at": None})
+    assert proposal.deliverable_repos == ["bob/halo2-gadgets"]
+
+
+def make_tracker(comment_counts):
+    task = Task(f"https://github.com/{REPO}/issues/1", "Task 1", "Task", "maintainer", "", "Easy", 10, REPO)
+    for number, count in comment_counts.items():
+        task.proposals.append(Proposal(
+            f"https://github.com/{REPO}/issues/{number}", "alice", "", task.task_link, "Easy", REPO,
+            number=number, comment_count=count,
+        ))
+    return {task.task_link: task}
+
+
+def test_only_changed_comment_counts_are_fetched(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "tracked_repos", [REPO])
+    monkeypatch.setattr(main, "issue_store_path", str(tmp_path / "issues.sqlite3"))
+    fetched = []
+
+    def fetch(jobs, session, excluded_repos):
+        fetched.append(sorted(number for _, number, _ in jobs))
+        return {(repo, number): summarize_comments([], applicant) for repo, number, applicant in jobs}
+
+    monkeypatch.setattr(main, "fetch_comment_summaries", fetch)
+
+    main.enrich_proposals(make_tracker({2: 1, 3: 0, 4: 2}))
+    tasks = make_tracker({2: 1, 3: 0, 4: 3})
+    main.enrich_proposals(tasks)
+
+    assert fetched == [[2, 4], [4]]
+    assert all(p.deliverable_repos == [] for p in tasks[f"https://github.com/{REPO}/issues/1"].proposals)
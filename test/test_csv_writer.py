@@ -0,0 +1,48 @@
+import json
+from src.csv_writer import update_csv
+from src.models import Proposal, Task
+
+REPO = "https://github.com/privacy-scaling-explorations/acceleration-program/issues"
+
+
+def make_tracker(*task_numbers, cost=100.0):
+    tasks = {}
+    for number in task_numbers:
+        task = Task(f"{REPO}/{number}", f"Task {number}", "Task", "maintainer", "", "Easy", 10)
+        task.proposals.append(
+            Proposal(f"{REPO}/{number + 100}", "applicant", "", task.task_link, "Easy", total_cost=cost)
+        )
+        tasks[task.task_link] = task
+    return tasks
+
+
+def test_update_csv_reports_and_logs_changes(tmp_path):
+    path = tmp_path / "issues.csv"
+    changelog = tmp_path / "changes.jsonl"
+
+    first = update_csv(make_tracker(1, 2), str(path), str(changelog))
+    assert len(first["added"]) == 2
+
+    second = update_csv(make_tracker(1, 3, cost=200.0), str(path), str(changelog))
+    assert second["added"] == [(f"{REPO}/3", f"{REPO}/103")]
+    assert second["changed"] == [(f"{REPO}/1", f"{REPO}/101")]
+    assert second["removed"] == [(f"{REPO}/2", f"{REPO}/102")]
+    assert "200.0" in path.read_text()
+
+    entries = [json.loads(line) for line in changelog.read_text().splitlines()]
+    assert len(entries) == 2
+    assert entries[1]["removed"] == [{"task_link": f"{REPO}/2", "proposal_link": f"{REPO}/102"}]
+
+
+def test_unchanged_tracker_leaves_file_alone(tmp_path, monkeypatch):
+    path = tmp_path / "issues.csv"
+    update_csv(make_tracker(1, 2), str(path))
+
+    def no_replace(*args):
+        raise AssertionError("file rewritten")
+
+    monkeypatch.setattr("os.replace", no_replace)
+    changes = update_csv(make_tracker(1, 2), str(path))
+
+    assert changes == {"added": [], "changed": [], "removed": []}
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,136 @@
+import hashlib
+import hmac
+import json
+import queue
+import pytest
+import requests
+from src import daemon, main
+from src.csv_writer import read_row_hashes
+from src.query import TrackerIndex
+from test.conftest import REPO, make_proposal, make_task
+
+pytestmark = pytest.mark.usefixtures("rates", "parse_cache")
+
+
+def test_edited_proposal_is_reparsed_alone(monkeypatch):
+    tracker = daemon.Tracker()
+    tracker.load([make_proposal(4, 1), make_task(1), make_proposal(3, 1)])
+    assert [p.link for p in tracker.tasks[f"{REPO}/1"].proposals] == [f"{REPO}/4", f"{REPO}/3"]
+
+    parsed = []
+    process_proposal = main.process_proposal
+    monkeypatch.setattr(main, "process_proposal", lambda *args: parsed.append(args[0]) or process_proposal(*args))
+    edited = make_proposal(4, 1)
+    edited["body"] = edited["body"].replace("2 weeks", "1 week").replace("80 hours", "40 hours")
+    tracker.apply(edited)
+
+    assert parsed == [edited["title"]]
+    proposals = tracker.tasks[f"{REPO}/1"].proposals
+    assert [(p.link, p.total_cost) for p in proposals] == [(f"{REPO}/4", 40 * 20), (f"{REPO}/3", 80 * 20)]
+
+
+def test_task_complexity_change_reprices_its_proposals():
+    tracker = daemon.Tracker()
+    tracker.load([make_task(1), make_proposal(3, 1)])
+
+    tracker.apply(make_task(1, complexity="Hard"))
+
+    assert tracker.tasks[f"{REPO}/1"].proposals[0].total_cost == 80 * 30
+
+
+def test_removed_issues_leave_the_tracker():
+    tracker = daemon.Tracker()
+    tracker.load([make_task(1), make_proposal(3, 1)])
+
+    tracker.apply(make_task(1), removed=True)
+    assert tracker.tasks == {}
+    assert list(tracker.pending[f"{REPO}/1"]) == [f"{REPO}/3"]
+
+    tracker.apply(make_task(1))
+    tracker.apply(make_proposal(3, 1), removed=True)
+    assert tracker.tasks[f"{REPO}/1"].proposals == []
+    assert main.generate_metrics(tracker.tasks)["Proposals"] == 0
+
+
+def test_deleted_issues_leave_the_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "issue_store_path", str(tmp_path / "issues.sqlite3"))
+    tracker = daemon.Tracker()
+    daemon.apply_deliveries(tracker, [("opened", make_task(1)), ("opened", make_proposal(3, 1))])
+
+    daemon.apply_deliveries(tracker, [("deleted", make_proposal(3, 1))])
+
+    reloaded = daemon.Tracker()
+    reloaded.load(main.iter_issues(offline=True))
+    assert list(reloaded.issues) == [f"{REPO}/1"]
+    assert reloaded.tasks[f"{REPO}/1"].proposals == []
+
+
+def test_unparseable_issues_are_quarantined_until_fixed():
+    tracker = daemon.Tracker()
+    broken = make_proposal(3, 1)
+    broken["body"] += f"Related: {REPO}/2\r\n"
+    tracker.load([make_task(1), broken, make_proposal(4, 2)])
+
+    assert [(f.link, f.stage) for f in tracker.quarantined()] == [(f"{REPO}/3", "link"), (f"{REPO}/4", "link")]
+    assert tracker.tasks[f"{REPO}/1"].proposals == []
+
+    tracker.apply(make_proposal(3, 1))
+    assert [f.link for f in tracker.quarantined()] == [f"{REPO}/4"]
+    assert [p.link for p in tracker.tasks[f"{REPO}/1"].proposals] == [f"{REPO}/3"]
+
+
+def test_webhook_requires_a_valid_signature():
+    updates = queue.Queue()
+    server = daemon.start_webhook_server(updates, port=0, secret="s3cret")
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    body = json.dumps({"action": "edited", "issue": make_task(1)}).encode()
+    signature = "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    try:
+        unsigned = requests.post(url, data=body, headers={"X-GitHub-Event": "issues"})
+        signed = requests.post(url, data=body, headers={"X-GitHub-Event": "issues", "X-Hub-Signature-256": signature})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert unsigned.status_code == 401
+    assert signed.status_code == 202
+    action, issue = updates.get_nowait()
+    assert (action, issue["number"]) == ("edited", 1)
+    assert updates.empty()
+
+
+def test_publish_updates_only_what_the_changed_tasks_affect(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "tracker_index_path", str(tmp_path / "tracker.sqlite3"))
+    monkeypatch.setattr(main, "issue_store_path", str(tmp_path / "issues.sqlite3"))
+    monkeypatch.setattr(main, "fetch_comment_summaries", lambda *args, **kwargs: {})
+    rebuilds = []
+    monkeypatch.setattr(main, "write_columnar_outputs", lambda tasks: rebuilds.append(len(tasks)))
+    tracker = daemon.Tracker()
+    tracker.load([make_task(1), make_task(2), make_proposal(3, 1), make_proposal(4, 2)])
+    publisher = daemon.Publisher()
+    publisher.publish(tracker)
+
+    edited = make_proposal(3, 1)
+    edited["title"] = "Proposal: folding prover"
+    daemon.apply_deliveries(tracker, [("edited", edited)])
+    changes = publisher.publish(tracker)
+
+    assert changes == {"added": [], "changed": [], "removed": []}
+    assert rebuilds == [2]
+    index = TrackerIndex(main.tracker_index_path)
+    assert [row["number"] for row in index.proposals(text="folding")] == [3]
+    assert [row["number"] for row in index.proposals(task="2")] == [4]
+
+    daemon.apply_deliveries(tracker, [("edited", make_task(1, complexity="Hard")), ("deleted", make_proposal(4, 2))])
+    changes = publisher.publish(tracker)
+
+    assert changes == {
+        "added": [(f"{REPO}/2", "NONE")],
+        "changed": [(f"{REPO}/1", f"{REPO}/3")],
+        "removed": [(f"{REPO}/2", f"{REPO}/4")],
+    }
+    assert rebuilds == [2, 2]
+    assert [row["total_cost"] for row in index.proposals(task="1")] == [80 * 30]
+    assert index.proposals(task="2") == []
+    assert list(read_row_hashes("issues.csv")) == [(f"{REPO}/1", f"{REPO}/3"), (f"{REPO}/2", "NONE")]
@@ -0,0 +1,128 @@
+import json
+import threading
+import requests
+from src import fetcher
+
+
+class PagedSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.seen = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None):
+        with self.lock:
+            self.seen.append(params["page"])
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers["Link"] = f'<{url}?page={len(self.pages)}>; rel="last"'
+        response._content = json.dumps(self.pages[params["page"] - 1]).encode()
+        return response
+
+
+def test_fetch_all_pages_keeps_page_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "http_cache", fetcher.HttpCache(str(tmp_path)))
+    session = PagedSession([[{"number": n}] for n in range(1, 6)])
+
+    items = fetcher.fetch_all_pages("https://example.test/issues", {"state": "all"}, session, workers=4)
+
+    assert [item["number"] for item in items] == [1, 2, 3, 4, 5]
+    assert sorted(session.seen) == [1, 2, 3, 4, 5]
+
+
+def test_pages_start_at_first_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "http_cache", fetcher.HttpCache(str(tmp_path)))
+    session = PagedSession([[{"number": n}] for n in range(1, 6)])
+
+    pages = list(fetcher.iter_pages("https://example.test/issues", {}, session, workers=2, first_page=3))
+
+    assert [item["number"] for items in pages for item in items] == [3, 4, 5]
+    assert sorted(session.seen) == [3, 4, 5]
+
+
+def test_iter_json_array_decodes_like_json_loads():
+    for text in ('[]', ' [ ] ', '[{"a": [1, {"b": null}]}, "x" ,2]', '\n[\n  {"body": "]["}\n]\n'):
+        assert list(fetcher.iter_json_array(text)) == json.loads(text)
+
+
+def test_pages_are_projected_as_they_are_decoded(tmp_path, monkeypatch):
+    from src.projection import project_issue
+
+    monkeypatch.setattr(fetcher, "http_cache", fetcher.HttpCache(str(tmp_path)))
+    raw = {
+        "number": 1,
+        "title": "Task 1",
+        "body": "Project Complexity: Easy",
+        "state": "open",
+        "user": {"login": "".join(["ali", "ce"]), "avatar_url": "https://avatars.test/a", "site_admin": False},
+        "assignee": None,
+        "labels": [{"id": 9, "name": "WIP", "color": "ffffff"}],
+        "reactions": {"total_count": 0},
+        "pull_request": {"url": "https://example.test/pulls/1"},
+    }
+    session = PagedSession([[raw, {**raw, "number": 2}], [{**raw, "number": 3}]])
+
+    items = fetcher.fetch_all_pages("https://example.test/issues", {}, session, workers=2, project=project_issue)
+
+    assert [item["number"] for item in items] == [1, 2, 3]
+    assert items[0] == {
+        "number": 1,
+        "title": "Task 1",
+        "body": "Project Complexity: Easy",
+        "state": "open",
+        "user": {"login": "alice"},
+        "assignee": None,
+        "labels": [{"name": "WIP"}],
+        "pull_request": True,
+    }
+    assert items[0]["user"]["login"] is items[2]["user"]["login"]
+    assert project_issue(items[0]) == items[0]
+
+
+def test_graphql_node_matches_rest_shape():
+    from src.graphql_fetcher import to_rest_shape
+
+    node = {
+        "number": 7,
+        "title": "Proposal: x",
+        "body": "body",
+        "state": "CLOSED",
+        "url": "https://github.com/o/r/issues/7",
+        "updatedAt": "2024-05-01T00:00:00Z",
+        "author": {"login": "alice"},
+        "assignees": {"nodes": []},
+        "labels": {"nodes": [{"name": "WIP"}]},
+        "comments": {"totalCount": 2},
+    }
+
+    issue = to_rest_shape(node, "o", "r")
+
+    assert issue["state"] == "closed"
+    assert issue["html_url"] == "https://github.com/o/r/issues/7"
+    assert issue["user"]["login"] == "alice"
+    assert issue["assignee"] is None
+    assert issue["labels"] == [{"name": "WIP"}]
+    assert issue["comments"] == 2
+    assert "pull_request" not in issue
+
+
+def test_recorded_cassette_replays_through_standin(tmp_path, monkeypatch):
+    from bench.corpus import generate_corpus
+    from bench.gh_standin import Faults, StandIn, start_server
+    from src.cassette import RecordingSession, load_cassette
+
+    monkeypatch.setattr(fetcher, "http_cache", fetcher.HttpCache(str(tmp_path / "http"), enabled=False))
+    cassette = str(tmp_path / "cassette.jsonl")
+    live, live_url = start_server(StandIn(Faults(), corpus=generate_corpus(250)))
+    recorder = RecordingSession(fetcher.create_session(2), cassette)
+    recorded = fetcher.fetch_all_pages(f"{live_url}/repos/o/r/issues", {"state": "all"}, recorder, workers=2)
+    live.shutdown()
+
+    replay, replay_url = start_server(StandIn(Faults(), cassette=load_cassette(cassette)))
+    replayed = fetcher.fetch_all_pages(f"{replay_url}/repos/o/r/issues", {"state": "all"}, fetcher.create_session(2), workers=2)
+    replay.shutdown()
+
+    assert len(recorded) == 250
+    assert replayed == recorded
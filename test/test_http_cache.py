@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import requests
+from src.http_cache import HttpCache
+
+
+class FakeSession:
+    def __init__(self, body, etag='"v1"'):
+        self.body = body
+        self.etag = etag
+        self.calls = []
+
+    def get(self, url, headers=None, params=None):
+        self.calls.append(dict(headers or {}))
+        response = requests.Response()
+        response.url = url
+        response.encoding = "utf-8"
+        if headers and headers.get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = self.etag
+            response._content = json.dumps(self.body).encode()
+        return response
+
+
+def test_revalidated_response_is_served_from_disk(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    session = FakeSession([{"title": "Task"}])
+
+    first = cache.get(session, "https://example.test/issues", params={"page": 1})
+    second = cache.get(session, "https://example.test/issues", params={"page": 1})
+
+    assert first.json() == second.json() == [{"title": "Task"}]
+    assert second.status_code == 200
+    assert session.calls[1]["If-None-Match"] == '"v1"'
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_is_size_bounded(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=1)
+    session = FakeSession([{"title": "x" * 100}])
+
+    cache.get(session, "https://example.test/issues", params={"page": 1})
+    cache.get(session, "https://example.test/issues", params={"page": 2})
+
+    assert cache.evictions == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_stores_evict_without_errors(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=20 * 1024)
+    session = FakeSession([{"title": "x" * 500}])
+
+    def fetch(worker):
+        for page in range(200):
+            assert cache.get(session, "https://example.test/issues", params={"worker": worker, "page": page}).status_code == 200
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(fetch, range(16)))
+
+    assert cache.evictions > 0
+    assert sum(path.stat().st_size for path in tmp_path.iterdir()) <= 20 * 1024
+
+
+def test_cache_hits_are_not_counted_as_bytes_received(tmp_path):
+    from src import instrumentation
+
+    instrumentation.reset()
+    cache = HttpCache(str(tmp_path))
+    session = FakeSession([{"title": "Task"}])
+
+    first = cache.get(session, "https://example.test/issues", params={"page": 1})
+    cache.get(session, "https://example.test/issues", params={"page": 1})
+
+    assert instrumentation.summary()["counters"]["bytes_received"] == len(first.content)
@@ -0,0 +1,41 @@
+import json
+from src import instrumentation
+from src.decorator import instrumented
+
+
+@instrumented("parse", per_item=True, label_arg=0)
+def parse(title):
+    return title
+
+
+def test_stage_counters_and_exports(tmp_path):
+    instrumentation.reset()
+    for title in ["a", "b", "c"]:
+        parse(title)
+    with instrumentation.stage("csv_write"):
+        instrumentation.count("pages_fetched", 2)
+
+    data = instrumentation.export(str(tmp_path / "run.json"), str(tmp_path / "run.prom"))
+
+    assert data["stages"]["parse"]["calls"] == 3
+    assert data["histograms"]["parse"]["count"] == 3
+    assert {item["label"] for item in data["slowest"]["parse"]} == {"a", "b", "c"}
+    assert json.loads((tmp_path / "run.json").read_text())["counters"] == {"pages_fetched": 2}
+    prometheus = (tmp_path / "run.prom").read_text()
+    assert 'tracker_item_seconds_bucket{stage="parse",le="+Inf"} 3' in prometheus
+    assert "tracker_pages_fetched_total 2" in prometheus
+
+
+def test_tracker_gauges_are_prefixed_once_and_repos_are_labels(tmp_path, monkeypatch):
+    from src import main
+
+    instrumentation.reset()
+    monkeypatch.setattr(main, "run_metrics_json_path", str(tmp_path / "run.json"))
+    monkeypatch.setattr(main, "run_metrics_prometheus_path", str(tmp_path / "run.prom"))
+    instrumentation.set_gauge("by_repo", {"org/a": {"WIP Tasks": 1}, "org/b": {"WIP Tasks": 0}})
+    main.export_run_metrics({"WIP Tasks": 1})
+
+    prometheus = (tmp_path / "run.prom").read_text()
+    assert "tracker_wip_tasks 1" in prometheus and "tracker_tracker_" not in prometheus
+    assert 'tracker_repo_wip_tasks{repo="org/a"} 1' in prometheus
+    assert 'tracker_repo_wip_tasks{repo="org/b"} 0' in prometheus
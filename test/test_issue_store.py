@@ -0,0 +1,46 @@
+import pytest
+from src.fetcher import IncompleteFetch
+from src.issue_store import IssueStore
+
+
+def test_upsert_keeps_latest_version_oldest_first(tmp_path):
+    store = IssueStore(str(tmp_path / "issues.sqlite3"))
+    store.upsert_issues([
+        {"number": 2, "updated_at": "2024-05-01T00:00:00Z", "title": "Proposal: b"},
+        {"number": 1, "updated_at": "2024-04-01T00:00:00Z", "title": "Task a"},
+    ])
+    store.upsert_issues([{"number": 2, "updated_at": "2024-05-02T00:00:00Z", "title": "Proposal: b v2"}])
+
+    assert [issue["title"] for issue in store.load_issues()] == ["Task a", "Proposal: b v2"]
+    assert store.count() == 2
+
+
+def test_pages_are_stored_in_one_transaction(tmp_path):
+    store = IssueStore(str(tmp_path / "issues.sqlite3"))
+
+    def failing_pages():
+        yield [{"number": 1, "updated_at": "2024-04-01T00:00:00Z", "title": "Task a"}]
+        raise IncompleteFetch("page 2")
+
+    with pytest.raises(IncompleteFetch):
+        store.upsert_pages(failing_pages())
+    assert store.count() == 0
+
+    pages = [
+        [{"number": 1, "updated_at": "2024-04-01T00:00:00Z", "title": "Task a"}],
+        [{"number": 2, "updated_at": "2024-05-01T00:00:00Z", "title": "Proposal: b", "reactions": {"heart": 1}}],
+    ]
+    assert store.upsert_pages(iter(pages)) == (2, "2024-05-01T00:00:00Z")
+    assert list(store.iter_issues(updated_after="2024-04-01T00:00:00Z")) == [
+        {"number": 2, "updated_at": "2024-05-01T00:00:00Z", "title": "Proposal: b"}
+    ]
+
+
+def test_since_survives_reopen(tmp_path):
+    path = str(tmp_path / "issues.sqlite3")
+    store = IssueStore(path)
+    assert store.get_since() is None
+    store.set_since("2024-05-02T00:00:00Z")
+    store.close()
+
+    assert IssueStore(path).get_since() == "2024-05-02T00:00:00Z"
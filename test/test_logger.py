@@ -0,0 +1,37 @@
+import json
+import logging
+import pytest
+from src.logger import configure_logging, logger, shutdown_logging
+
+
+def test_json_lines_are_written_by_the_listener(tmp_path):
+    path = tmp_path / "app.log"
+    configure_logging(level="INFO", destination=str(path), json_lines=True)
+    logger.debug("dropped %s", "early")
+    logger.info("Parsed %s proposals", 3)
+    shutdown_logging()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["message"] for line in lines] == ["Parsed 3 proposals"]
+    assert lines[0]["level"] == "INFO"
+    # importing src.logger must not have pointed the root logger at app.log
+    assert not any(
+        getattr(handler, "baseFilename", "").endswith("app.log") for handler in logging.getLogger().handlers
+    )
+
+
+@pytest.mark.usefixtures("rates", "parse_cache")
+def test_pool_workers_log_through_the_listener(tmp_path):
+    from src import main
+    from test.conftest import make_proposal, make_task
+
+    path = tmp_path / "app.log"
+    configure_logging(level="INFO", destination=str(path))
+    mismatched = make_proposal(3, 1)
+    mismatched["body"] = mismatched["body"].replace("80 hours", "90 hours")
+
+    events = list(main.parallel_events([make_task(1), mismatched], workers=2))
+    shutdown_logging()
+
+    assert [kind for kind, _ in events] == ["task", "failure"]
+    assert f"Quarantined {mismatched['html_url']} (proposal): ValueError" in path.read_text()
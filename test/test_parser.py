@@ -1,6 +1,9 @@
 import pytest
 from src.main import get_issues, process_tasks
-from src.parser import parse_issue_meta_data, parse_milestone
+from datetime import datetime
+from src import parser
+from src.csv_writer import format_cost_per_milestone, format_schedule
+from src.parser import parse_issue_meta_data, parse_milestone, parse_schedule, scan_proposal
 from src.logger import logger
 
 @pytest.fixture
@@ -26,4 +29,66 @@ def test_parse_milestone(preload_issue) -> None:
     body, issue_link, assignee, creator, linked_tasks, project_complexity , title = preload_issue
     logger.info(f"test_parse_milestone: issue_link: {issue_link} title: {title}")
     working_hour_data = parse_milestone(body, title, project_complexity)
-    logger.info(working_hour_data)
\ No newline at end of file
+    logger.info(working_hour_data)
+
+PROPOSAL_BODY = (
+    "**Total Estimated Duration:** 3 weeks\r\n"
+    "**Full-time equivalent (FTE):** 1\r\n"
+    "**Total Estimated Working Hours:** 120 hours\r\n"
+    "### Milestone 1\r\n"
+    "- **Estimated Duration:** 1 week\r\n"
+    "- **FTE:** 1\r\n"
+    "- **Starting Date:** Jan 1st, 2024\r\n"
+    "### Milestone 2\r\n"
+    "- **Estimated Duration:** 2 weeks\r\n"
+    "- **FTE:** 1\r\n"
+    "- **Starting Date:** January 15, 2024\r\n"
+)
+
+
+def test_scan_proposal_splits_milestones() -> None:
+    scan = scan_proposal(PROPOSAL_BODY)
+
+    assert scan["total_duration"] == (3, "weeks")
+    assert scan["total_working_hours"] == 120
+    assert scan["durations"] == [(1, "week"), (2, "weeks")]
+    assert scan["ftes"] == [1, 1]
+    assert [m["duration"] for m in scan["milestones"]] == [(1, "week"), (2, "weeks")]
+    assert scan["milestones"][0]["start_date"] == ("Jan", "1", "2024")
+    assert scan["milestones"][1]["start_date"] == ("January", "15", "2024")
+
+
+def test_parse_schedule_from_scan() -> None:
+    assert parse_schedule(PROPOSAL_BODY) == {
+        1: (datetime(2024, 1, 1), datetime(2024, 1, 8)),
+        2: (datetime(2024, 1, 15), datetime(2024, 1, 29)),
+    }
+
+
+def test_parse_schedule_skips_missing_milestone_numbers() -> None:
+    body = (
+        "### Milestone 1\r\n- Estimated Duration: 2 weeks\r\n- Starting Date: Jan 1, 2024\r\n"
+        "### Milestone 3\r\n- Estimated Duration: 1 week\r\n- Starting Date: Jan 15, 2024\r\n"
+    )
+
+    assert parse_schedule(body) == {
+        1: (datetime(2024, 1, 1), datetime(2024, 1, 15)),
+        2: (datetime(2024, 1, 15), datetime(2024, 1, 22)),
+    }
+
+
+def test_parse_milestone_builds_records(monkeypatch) -> None:
+    monkeypatch.setattr(parser, "medium_cost", "20")
+
+    parsed = parse_milestone(PROPOSAL_BODY, "Proposal: test", "Medium")
+    milestones = parsed["milestones"]
+
+    assert parsed["total_working_hours"] == 120.0
+    assert parsed["total_cost"] == 120 * 20
+    assert [(m.number, m.hours, m.cost) for m in milestones] == [(1, 40.0, 800.0), (2, 80.0, 1600.0)]
+    assert milestones[1].end_date == datetime(2024, 1, 29)
+    assert format_cost_per_milestone(milestones) == "m1 = $800.0; m2 = $1600.0; "
+    assert format_schedule(milestones) == (
+        "Start Date for Milestone 1: 2024 Jan 01, End Date for Milestone 1: January 08, 2024; "
+        "Start Date for Milestone 2: 2024 Jan 15, End Date for Milestone 2: January 29, 2024; "
+    )
@@ -0,0 +1,333 @@
+import pytest
+from src import main, parser
+from src.parse_cache import ParseCache
+from src.main import (
+    consume_events,
+    generate_metrics,
+    process_proposals,
+    process_tasks,
+    stream_issues,
+)
+from test.conftest import REPO, make_proposal, make_task
+
+pytestmark = pytest.mark.usefixtures("rates", "parse_cache")
+
+
+def test_stream_matches_two_phase_build_in_any_order():
+    issues = [make_task(1), make_task(2, labels=["WIP"]), make_proposal(3, 1), make_proposal(4, 1)]
+    expected = process_proposals(issues, process_tasks(issues))
+
+    tasks, metrics = consume_events(stream_issues(issues[::-1]))
+
+    assert {link: len(task.proposals) for link, task in tasks.items()} == {
+        link: len(task.proposals) for link, task in expected.items()
+    }
+    assert tasks[f"{REPO}/1"].proposals[0].total_cost == 80 * 20
+    assert metrics == generate_metrics(expected)
+
+
+def test_proposal_without_task_is_quarantined():
+    failures = []
+
+    tasks, _ = consume_events(stream_issues([make_task(2), make_proposal(3, 1)]), failures)
+
+    assert list(tasks) == [f"{REPO}/2"]
+    assert [(failure.link, failure.stage, failure.error) for failure in failures] == [(f"{REPO}/3", "link", "ValueError")]
+    assert "linked task not found" in failures[0].message
+
+
+def test_malformed_proposal_is_quarantined_and_the_rest_is_built(tmp_path, monkeypatch):
+    broken = make_proposal(5, 1)
+    broken["body"] += f"Related: {REPO}/2\r\n"
+    issues = [make_task(1), make_task(2), make_proposal(3, 1), broken, make_proposal(4, 2)]
+    expected, expected_metrics = consume_events(stream_issues([issue for issue in issues if issue is not broken]))
+
+    for name, events in (("stream", stream_issues), ("parallel", lambda issues: main.parallel_events(issues, workers=2))):
+        monkeypatch.setattr(main, "parse_cache", ParseCache(str(tmp_path / f"{name}.sqlite3")))
+        failures = []
+        tasks, metrics = consume_events(events(issues), failures)
+
+        assert tasks == expected
+        assert metrics == expected_metrics
+        assert [(failure.link, failure.stage) for failure in failures] == [(f"{REPO}/5", "link")]
+        issues = issues[::-1]
+
+
+def test_slow_parse_is_cut_off_at_the_budget(monkeypatch):
+    import re
+    from src import isolation
+
+    def runaway(title, body):
+        # catastrophic backtracking, interrupted inside the regex engine
+        return re.match(r"(a+)+$", "a" * 64 + "b")
+
+    monkeypatch.setattr(isolation, "PARSE_TIME_BUDGET", 0.2)
+    monkeypatch.setattr(main, "parse_proposal_fields", runaway)
+    failures = []
+
+    tasks, _ = consume_events(stream_issues([make_task(1), make_proposal(3, 1), make_task(2)]), failures)
+
+    assert len(tasks) == 2 and not tasks[f"{REPO}/1"].proposals
+    assert [(failure.stage, failure.error) for failure in failures] == [("proposal", "ParseTimeout")]
+    assert failures[0].seconds < 2
+
+
+def test_unchanged_proposal_is_not_reparsed(parse_cache, monkeypatch):
+    issues = [make_task(1), make_proposal(3, 1)]
+    first, _ = consume_events(stream_issues(issues))
+    monkeypatch.setattr(main, "scan_proposal", None)
+
+    second, _ = consume_events(stream_issues(issues))
+
+    assert second == first
+    assert parse_cache.stats()["hits"] == 1
+
+
+def test_parse_cache_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(str(tmp_path / "parse.sqlite3"), max_entries=1)
+    cache.put("old", {"total_cost": 1})
+    cache.put("new", {"total_cost": 2})
+    cache.flush()
+
+    assert cache.get("old") is None
+    assert cache.get("new") == {"total_cost": 2}
+
+
+def test_parallel_events_match_stream(tmp_path, monkeypatch):
+    issues = [make_task(1), make_proposal(3, 1), make_task(2, complexity="Hard"), make_proposal(4, 2), make_proposal(5, 1)]
+    expected, expected_metrics = consume_events(stream_issues(issues))
+    monkeypatch.setattr(main, "parse_cache", ParseCache(str(tmp_path / "cold.sqlite3")))
+
+    tasks, metrics = consume_events(main.parallel_events(issues, workers=2))
+
+    assert tasks == expected
+    assert metrics == expected_metrics
+
+
+def test_synthetic_corpus_builds_cleanly():
+    from bench.corpus import generate_corpus
+
+    issues = generate_corpus(300, seed=1, adversarial_ratio=0.05)
+
+    tasks, metrics = consume_events(stream_issues(issues))
+
+    assert metrics["Total Tasks"] + metrics["Proposals"] == len(issues)
+    assert all(p.total_cost > 0 for task in tasks.values() for p in task.proposals)
+
+
+def test_table_metrics_match_stream_metrics():
+    pytest.importorskip("pandas")
+    from src.table import build_table, table_metrics
+
+    issues = [make_task(1), make_task(2, labels=["WIP"]), make_task(5, complexity="Hard"),
+              make_proposal(3, 1), make_proposal(4, 1), make_proposal(6, 5)]
+    tasks, metrics = consume_events(stream_issues(issues))
+
+    frame = build_table(tasks)
+    table_counts, breakdowns = table_metrics(frame)
+
+    assert len(frame) == 4
+    assert table_counts == metrics
+    assert breakdowns["cost_by_complexity"]["Medium"] == 2 * 80 * 20
+    assert breakdowns["tasks_by_proposal_count"] == {"0": 1, "1": 1, "2": 1}
+    assert breakdowns["open_closed_by_type"]["Task"] == {"open": 2, "closed": 0}
+
+
+def test_proposal_links_task_in_another_repo(monkeypatch):
+    other = "https://github.com/example-org/other-program/issues"
+    monkeypatch.setattr(parser, "ISSUE_LINK_PATTERN", parser.issue_link_pattern(
+        ["privacy-scaling-explorations/acceleration-program", "example-org/other-program"]
+    ))
+    proposal = make_proposal(7, 1)
+    proposal["html_url"] = f"{other}/7"
+    issues = [make_task(1), make_task(2), proposal]
+    issues[1]["html_url"] = f"{other}/2"
+
+    tasks, _ = consume_events(stream_issues(issues))
+
+    assert tasks[f"{REPO}/1"].proposals[0].repo == "example-org/other-program"
+    assert {repo: m["Proposals"] for repo, m in main.metrics_by_repo(tasks).items()} == {
+        "privacy-scaling-explorations/acceleration-program": 1,
+        "example-org/other-program": 0,
+    }
+
+
+def test_repos_sync_concurrently(tmp_path, monkeypatch):
+    import time
+
+    repos = ["org/a", "org/b", "org/c"]
+    monkeypatch.setattr(main, "tracked_repos", repos)
+    monkeypatch.setattr(main, "issue_store_path", str(tmp_path / "issues.sqlite3"))
+
+    def slow_pages(url, params, session, workers, project, first_page):
+        time.sleep(0.3)
+        repo = url.split("/repos/")[1].removesuffix("/issues")
+        yield [{"number": 1, "updated_at": "2024-01-01T00:00:00Z", "title": repo}]
+
+    monkeypatch.setattr(main, "iter_pages", slow_pages)
+    start = time.perf_counter()
+    assert main.sync_all(repos) == []
+    assert time.perf_counter() - start < 0.3 * len(repos)
+
+    assert [issue["title"] for issue in main.iter_issues(offline=True)] == repos
+
+
+def interrupted_sync(tmp_path, monkeypatch):
+    """
+    Nine issues served two per page; the first sync fails on page 3. Returns the issues and
+    the `since` and first page of every query.
+    """
+    from src.fetcher import IncompleteFetch
+
+    monkeypatch.setattr(main, "tracked_repos", ["org/a"])
+    monkeypatch.setattr(main, "issue_store_path", str(tmp_path / "issues.sqlite3"))
+    issues = [{"number": n, "updated_at": f"2024-01-{n:02d}T00:00:00Z", "title": f"Task {n}"} for n in range(1, 10)]
+    queries = []
+
+    def pages(url, params, session, workers, project, first_page):
+        since = params.get("since")
+        queries.append((since, first_page))
+        changed = [issue for issue in issues if since is None or issue["updated_at"] >= since]
+        for page, start in enumerate(range(0, len(changed), 2), 1):
+            if page < first_page:
+                continue
+            if page == 3 and len(queries) == 1:
+                raise IncompleteFetch("page 3")
+            yield changed[start:start + 2]
+
+    monkeypatch.setattr(main, "iter_pages", pages)
+    assert main.sync_all(["org/a"]) == ["org/a"]
+    return issues, queries
+
+
+def test_interrupted_sync_resumes_after_its_last_committed_page(tmp_path, monkeypatch):
+    from src.issue_store import IssueStore
+
+    issues, queries = interrupted_sync(tmp_path, monkeypatch)
+    store = IssueStore(main.store_path("org/a"))
+    assert (store.count(), store.get_since()) == (4, None)
+    assert store.get_journal()["cursor"] == issues[3]["updated_at"]
+    store.close()
+
+    assert main.sync_all(["org/a"]) == []
+
+    store = IssueStore(main.store_path("org/a"))
+    assert queries == [(None, 1), (None, 3)]
+    assert (store.count(), store.get_since(), store.get_journal()) == (9, issues[-1]["updated_at"], None)
+
+
+def test_sync_starts_over_when_committed_pages_changed(tmp_path, monkeypatch):
+    from src.issue_store import IssueStore
+
+    issues, queries = interrupted_sync(tmp_path, monkeypatch)
+    store = IssueStore(main.store_path("org/a"))
+    store.upsert_issues([{**issues[3], "updated_at": "2024-02-01T00:00:00Z"}])
+    store.close()
+
+    assert main.sync_all(["org/a"]) == []
+    assert queries == [(None, 1), (None, 1)]
+    store = IssueStore(main.store_path("org/a"))
+    assert store.get_updated_at(4) == "2024-02-01T00:00:00Z"
+
+
+class ListingSession:
+    """
+    Issues listed like GitHub's `state=all&sort=...&direction=asc&since=...`, two per page;
+    `on_get` runs after every response, to edit issues mid-sync.
+    """
+
+    def __init__(self, issues, on_get=None):
+        self.issues = issues
+        self.on_get = on_get
+        self.queries = []
+
+    def get(self, url, headers=None, params=None):
+        import json
+        import requests
+
+        self.queries.append((params.get("since"), params["page"]))
+        field = {"created": "created_at", "updated": "updated_at"}[params["sort"]]
+        listed = sorted(
+            (issue for issue in self.issues if params.get("since") is None or issue["updated_at"] >= params["since"]),
+            key=lambda issue: (issue[field], issue["number"]),
+        )
+        page, per_page = params["page"], 2
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers["Link"] = f'<{url}?page={max(1, -(-len(listed) // per_page))}>; rel="last"'
+        response._content = json.dumps(listed[(page - 1) * per_page:page * per_page]).encode()
+        if self.on_get:
+            self.on_get(self)
+        return response
+
+
+def test_issue_edited_mid_sync_hides_no_other_and_is_fetched_again(tmp_path, monkeypatch):
+    from src import fetcher
+    from src.issue_store import IssueStore
+
+    monkeypatch.setattr(fetcher, "http_cache", fetcher.HttpCache(str(tmp_path / "http")))
+    monkeypatch.setattr(main, "tracked_repos", ["org/a"])
+    monkeypatch.setattr(main, "issue_store_path", str(tmp_path / "issues.sqlite3"))
+    issues = [
+        {"number": n, "created_at": f"2024-01-0{n}T00:00:00Z", "updated_at": f"2024-02-0{n}T00:00:00Z"}
+        for n in range(1, 7)
+    ]
+
+    def edit_first_issue(session):
+        # after the first page, issue 1 is edited; in update order it would move to the end
+        if len(session.queries) == 1:
+            issues[0] = {**issues[0], "updated_at": "2099-01-01T00:00:00Z"}
+
+    monkeypatch.setattr(main, "fetch_session", ListingSession(issues, edit_first_issue))
+    assert main.sync_all(["org/a"]) == []
+
+    store = IssueStore(main.store_path("org/a"))
+    assert store.count() == 6
+    assert store.get_updated_at(1) == "2024-02-01T00:00:00Z"
+    assert store.get_since() < "2099-01-01T00:00:00Z"
+    store.close()
+
+    assert main.sync_all(["org/a"]) == []
+    store = IssueStore(main.store_path("org/a"))
+    assert store.get_updated_at(1) == "2099-01-01T00:00:00Z"
+    store.close()
+
+
+def test_incomplete_first_sync_publishes_nothing(tmp_path, monkeypatch):
+    from src.fetcher import IncompleteFetch
+
+    monkeypatch.chdir(tmp_path)
+    issues, _ = interrupted_sync(tmp_path, monkeypatch)
+
+    def failing_pages(url, params, session, workers, project, first_page):
+        raise IncompleteFetch("page 1")
+        yield
+
+    monkeypatch.setattr(main, "iter_pages", failing_pages)
+    with pytest.raises(main.IncompleteSync, match="org/a"):
+        main.run()
+    assert not (tmp_path / main.output_csv_path).exists()
+
+    # once a sync has completed, a failed one builds from that snapshot
+    from src.issue_store import IssueStore
+
+    store = IssueStore(main.store_path("org/a"))
+    store.finish_sync(issues[3]["updated_at"])
+    store.close()
+    assert len(list(main.iter_issues())) == 4
+
+
+def test_importing_main_leaves_the_caches_alone(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    caches = tmp_path / "caches"
+    caches.mkdir()
+    env = {**os.environ, "PARSE_CACHE_PATH": str(caches / "parse.sqlite3"), "HTTP_CACHE_DIR": str(caches / "http")}
+    subprocess.run([sys.executable, "-c", "import src.main, src.daemon, src.query"], env=env, check=True,
+                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    assert list(caches.iterdir()) == []
@@ -0,0 +1,70 @@
+import json
+import pytest
+from src.main import consume_events, stream_issues
+from src.query import TrackerIndex, build_index, main_cli
+from test.conftest import REPO, make_proposal, make_task
+
+pytestmark = pytest.mark.usefixtures("rates", "parse_cache")
+
+
+def proposal_by(number, task_number, login, text=""):
+    issue = make_proposal(number, task_number)
+    issue["user"] = {"login": login}
+    issue["body"] += text
+    return issue
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    closed = make_task(5, complexity="Hard")
+    closed["state"] = "closed"
+    issues = [
+        make_task(1, complexity="Hard"), make_task(2, complexity="Hard"), make_task(3), closed,
+        proposal_by(10, 1, "alice", "We build a PLONK prover."),
+        proposal_by(11, 1, "bob", "Folding schemes."),
+        proposal_by(12, 2, "alice", "Lookup arguments."),
+        proposal_by(13, 5, "carol", "Plonk circuits."),
+        proposal_by(14, 3, "Alice", "plonkish arithmetization"),
+    ]
+    tasks, _ = consume_events(stream_issues(issues))
+    path = str(tmp_path / "tracker.sqlite3")
+    build_index(tasks, issues, path)
+    return path
+
+
+def test_open_hard_tasks_with_competing_proposals(index_path):
+    index = TrackerIndex(index_path)
+
+    rows = index.tasks(state="open", complexity="hard", min_proposals=2)
+
+    assert [(row["link"], row["proposals"]) for row in rows] == [(f"{REPO}/1", 2)]
+    assert [row["number"] for row in index.tasks(state="closed")] == [5]
+
+
+def test_proposals_by_text_and_applicant(index_path):
+    index = TrackerIndex(index_path)
+
+    rows = index.proposals(text="plonk", creator="alice")
+
+    assert [row["link"] for row in rows] == [f"{REPO}/10"]
+    assert rows[0]["title"] == "Proposal: for task 1"
+    assert rows[0]["task_state"] == "open" and rows[0]["total_cost"] == 80 * 30
+    assert [row["number"] for row in index.proposals(text="plonk*")] == [10, 14, 13]
+    assert [row["number"] for row in index.proposals(task="1")] == [10, 11]
+    assert [row["number"] for row in index.proposals(task=f"{REPO}/2", task_state="open")] == [12]
+
+
+def test_cli_writes_json_and_csv(index_path, tmp_path, capsys):
+    main_cli(["proposals", "--index", index_path, "--text", "plonk", "--task-state", "closed", "--format", "json"])
+    assert [row["creator"] for row in json.loads(capsys.readouterr().out)] == ["carol"]
+
+    output = tmp_path / "tasks.csv"
+    main_cli(["tasks", "--index", index_path, "--complexity", "Medium", "--output", str(output)])
+    lines = output.read_text().splitlines()
+    assert lines[0].startswith('"link","repo","number"') and len(lines) == 2
+
+
+def test_rebuild_replaces_the_index(index_path):
+    build_index({}, [], index_path)
+
+    assert TrackerIndex(index_path).tasks() == []
@@ -0,0 +1,107 @@
+import requests
+import threading
+import time
+import pytest
+from src.rate_limiter import RateLimiter, Stopped, is_rate_limited
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def make_response(status, **headers):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b"{}"
+    response.headers.update({k.replace("_", "-"): str(v) for k, v in headers.items()})
+    return response
+
+
+def make_limiter(clock, **kwargs):
+    return RateLimiter(sleep=clock.sleep, clock=clock.time, **kwargs)
+
+
+def test_plenty_of_budget_does_not_wait():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    limiter.update(make_response(200, X_RateLimit_Remaining=4000, X_RateLimit_Reset=4600))
+
+    for _ in range(10):
+        limiter.acquire()
+
+    assert clock.slept == []
+
+
+def test_low_budget_is_spread_until_reset():
+    clock = FakeClock()
+    limiter = make_limiter(clock, reserve=0, pace_below=100)
+    limiter.update(make_response(200, X_RateLimit_Remaining=10, X_RateLimit_Reset=1100))
+
+    for _ in range(3):
+        limiter.acquire()
+
+    assert len(clock.slept) == 2
+    assert clock.slept[0] == 10.0
+    assert clock.now < 1100
+
+
+def test_retry_after_blocks_every_worker():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    response = make_response(403, Retry_After=30, X_RateLimit_Remaining=100, X_RateLimit_Reset=4600)
+    assert is_rate_limited(response)
+
+    limiter.update(response)
+    limiter.acquire()
+
+    assert clock.slept == [30.0]
+
+
+def test_fetch_survives_injected_faults(tmp_path, monkeypatch):
+    from bench.corpus import generate_corpus
+    from bench.gh_standin import Faults, StandIn, start_server
+    from src import fetcher
+
+    monkeypatch.setattr(fetcher, "http_cache", fetcher.HttpCache(str(tmp_path), enabled=False))
+    monkeypatch.setattr(fetcher, "rate_limiter", RateLimiter(base_delay=0.01))
+    faults = Faults(secondary_every=4, retry_after=0, error_rate=0.2, seed=3)
+    standin = StandIn(faults, corpus=generate_corpus(1000))
+    server, base_url = start_server(standin)
+
+    items = fetcher.fetch_all_pages(f"{base_url}/repos/o/r/issues", {}, fetcher.create_session(4), workers=4)
+    server.shutdown()
+
+    assert [item["number"] for item in items] == list(range(1, 1001))
+    assert standin.stats["secondary_limited"] > 0 and standin.stats["errors"] > 0
+
+
+def test_interrupt_ends_a_rate_limit_wait():
+    limiter = RateLimiter()
+    limiter.update(make_response(403, Retry_After=3600))
+    errors = []
+
+    def worker():
+        with pytest.raises(Stopped):
+            limiter.acquire()
+        errors.append(None)
+
+    thread = threading.Thread(target=worker)
+    start = time.perf_counter()
+    thread.start()
+    time.sleep(0.1)
+    limiter.interrupt()
+    thread.join(timeout=5)
+
+    assert errors == [None] and time.perf_counter() - start < 5
+    limiter.resume()
+    limiter.blocked_until = 0.0
+    limiter.acquire()
@@ -0,0 +1,46 @@
+import json
+import pytest
+from src.main import consume_events, stream_issues
+from src.repricing import compare, current_card, load_card, milestone_effort
+from test.conftest import REPO, make_proposal, make_task
+
+pytestmark = pytest.mark.usefixtures("rates", "parse_cache")
+
+
+@pytest.fixture
+def tasks():
+    issues = [
+        make_task(1), make_task(2, complexity="Hard"), make_task(5, complexity="Unknown"),
+        make_proposal(3, 1), make_proposal(4, 1), make_proposal(6, 2), make_proposal(7, 5),
+    ]
+    tasks, _ = consume_events(stream_issues(issues))
+    return tasks
+
+
+def test_current_card_matches_the_tracker(tasks):
+    by_task, by_complexity, program = compare(milestone_effort(tasks), [current_card()])
+
+    assert by_task["current"].tolist() == [sum(p.total_cost for p in task.proposals) for task in tasks.values()]
+    assert by_complexity["current"].to_dict() == {"Hard": 80 * 30, "Medium": 2 * 80 * 20, "unknown": 0}
+    assert program["current"] == 80 * 30 + 2 * 80 * 20
+
+
+def test_cards_are_priced_side_by_side(tasks, tmp_path):
+    path = tmp_path / "raise.json"
+    path.write_text(json.dumps({"rates": {"Medium": 25}, "tasks": {f"{REPO}/5": 40}}))
+
+    by_task, by_complexity, program = compare(milestone_effort(tasks), [current_card(), load_card(str(path))])
+
+    assert by_task.set_index("task_link")["raise"].to_dict() == {
+        f"{REPO}/1": 2 * 80 * 25, f"{REPO}/2": 80 * 30, f"{REPO}/5": 80 * 40,
+    }
+    assert by_complexity.loc["unknown"].tolist() == [0, 80 * 40]
+    assert program.tolist() == [80 * 30 + 2 * 80 * 20, 80 * 30 + 2 * 80 * 25 + 80 * 40]
+
+
+def test_card_with_unknown_complexity_is_refused(tmp_path):
+    path = tmp_path / "typo.json"
+    path.write_text(json.dumps({"rates": {"Meduim": 25}}))
+
+    with pytest.raises(ValueError, match="Meduim"):
+        load_card(str(path))
@@ -0,0 +1,50 @@
+from datetime import datetime
+import pytest
+from src.models import Milestone, Proposal, Task
+
+pd = pytest.importorskip("pandas")
+from src import timeline  # noqa: E402
+
+REPO = "https://github.com/privacy-scaling-explorations/acceleration-program/issues"
+
+
+def make_tracker():
+    task = Task(f"{REPO}/1", "Task 1", "Task", "maintainer", "", "Easy", 10)
+    alice = Proposal(f"{REPO}/2", "alice", "", task.task_link, "Easy", milestones=[
+        # Monday 2024-01-01 for two weeks, then back to back for one week
+        Milestone(1, 2, "weeks", 1, 80.0, 10.0, 800.0, datetime(2024, 1, 1), datetime(2024, 1, 15)),
+        Milestone(2, 1, "week", 0.5, 20.0, 10.0, 200.0, datetime(2024, 1, 15), datetime(2024, 1, 22)),
+    ])
+    bob = Proposal(f"{REPO}/3", "bob", "", task.task_link, "Easy", milestones=[
+        Milestone(1, 1, "week", 1, 40.0, 10.0, 400.0, datetime(2024, 1, 8), datetime(2024, 1, 15)),
+        Milestone(2, 1, "week", 1, 40.0, 10.0, 400.0, datetime(2024, 1, 10), datetime(2024, 1, 17)),
+        Milestone(3),
+    ])
+    task.proposals = [alice, bob]
+    return {task.task_link: task}
+
+
+def test_weekly_timeline_sweeps_milestone_intervals():
+    frame = timeline.milestone_frame(make_tracker())
+    weekly = timeline.weekly_timeline(frame)
+
+    assert len(frame) == 4
+    assert [str(week.date()) for week in weekly["week"]] == ["2024-01-01", "2024-01-08", "2024-01-15", "2024-01-22"]
+    assert weekly["committed_fte"].tolist() == [1.0, 3.0, 1.5, 0.0]
+    assert weekly["active_milestones"].tolist() == [1, 3, 2, 0]
+    assert weekly["delivered_cost"].tolist() == [0.0, 0.0, 1600.0, 200.0]
+
+
+def test_timeline_summary():
+    frame = timeline.milestone_frame(make_tracker())
+    summary = timeline.timeline_summary(frame, timeline.weekly_timeline(frame), now=datetime(2024, 1, 16))
+
+    assert summary["peak_committed_fte"] == 3.0
+    assert summary["peak_week"] == "2024-01-08"
+    assert summary["committed_fte_this_week"] == 1.5
+    assert summary["spend_by_month"] == {"2024-01": 1800.0}
+    # alice's milestones are back to back, bob's overlap
+    assert summary["overlapping_applicants"] == {"bob": 2}
+    assert [(d["date"], d["applicant"]) for d in summary["upcoming_deliveries"]] == [
+        ("2024-01-17", "bob"), ("2024-01-22", "alice"),
+    ]